@@ -0,0 +1,56 @@
+"""CacheManager background and thumbnail lookups"""
+import os
+
+import pytest
+
+from core.cache_manager import CacheManager
+
+
+@pytest.mark.benchmark(group='cache')
+def bench_cached_background_hit(benchmark, image_set, tmp_path):
+    cache = CacheManager(str(tmp_path / 'cache'))
+    cache.get_cached_background(image_set[2], (720, 1280))
+    path = benchmark(cache.get_cached_background, image_set[2], (720, 1280))
+    assert path.endswith('.png')
+
+
+@pytest.mark.benchmark(group='cache')
+def bench_cached_background_miss(benchmark, image_set, tmp_path):
+    sizes = iter((w, w * 2) for w in range(100, 100000))
+
+    def miss():
+        cache = CacheManager(str(tmp_path / 'cache'))
+        return cache.get_cached_background(image_set[0], next(sizes))
+
+    benchmark.pedantic(miss, rounds=5, iterations=1)
+
+
+@pytest.mark.benchmark(group='cache-thumbnails')
+def bench_thumbnail_rows(benchmark, tmp_path):
+    """One search page of icon rows: 50 lookups against 5,000 cached thumbnails"""
+    cache = CacheManager(str(tmp_path / 'cache'))
+    digests = [f'{i:064x}' for i in range(5000)]
+    for digest in digests:
+        open(os.path.join(cache.cache_dir, cache.thumbnail_key(digest, (48, 48))), 'wb').close()
+    cache.add_cached_files({cache.thumbnail_key(digest, (48, 48)): digest for digest in digests})
+    paths = benchmark(cache.get_cached_thumbnails, digests[:50], (48, 48))
+    assert len(paths) == 50
+
+
+@pytest.mark.benchmark(group='cache-thumbnails')
+def bench_fetch_icons(benchmark, tmp_path):
+    """Download and thumbnail 500 item icons that share 5 distinct images"""
+    from core.assets import AssetStore
+    from test.mock_wiki import MockWikiServer
+
+    with MockWikiServer(num_items=500, categories=('A', 'B', 'C', 'D', 'E')) as wiki:
+        urls = [f'{wiki.url}images/Item_{i}.png' for i in range(500)]
+        runs = iter(range(100))
+
+        def fetch():
+            run = next(runs)
+            store = AssetStore(str(tmp_path / f'assets{run}'), CacheManager(str(tmp_path / f'cache{run}')))
+            return store.fetch(urls, concurrency=16)
+
+        stored = benchmark.pedantic(fetch, rounds=3, iterations=1)
+    assert len(set(stored.values())) == 5
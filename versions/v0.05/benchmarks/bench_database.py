@@ -0,0 +1,111 @@
+"""DatabaseManager search and insert cost at increasing table sizes"""
+import sqlite3
+import threading
+
+import pytest
+
+from core.database.manager import DatabaseManager
+from core.database.writer import GroupCommitWriter
+
+
+@pytest.mark.benchmark(group='db-search')
+def bench_search_keyword(benchmark, item_db):
+    rows = benchmark(item_db.search_items, keyword='Item 99')
+    assert rows
+
+
+@pytest.mark.benchmark(group='db-search')
+def bench_search_category(benchmark, item_db):
+    rows = benchmark(item_db.search_items, category='Tools')
+    assert rows
+
+
+@pytest.mark.benchmark(group='db-insert')
+def bench_add_item_1000(benchmark, tmp_path):
+    db = DatabaseManager(str(tmp_path / 'insert.db'))
+    db.initialize_database()
+
+    def insert():
+        for i in range(1000):
+            db.add_item(f'Item {i}', 'Generated description', 'Tools')
+
+    benchmark.pedantic(insert, rounds=3, iterations=1)
+
+
+@pytest.mark.benchmark(group='db-insert')
+def bench_add_items_1000(benchmark, tmp_path):
+    db = DatabaseManager(str(tmp_path / 'insert.db'))
+    db.initialize_database()
+    rows = [(f'Item {i}', 'Generated description', 'Tools') for i in range(1000)]
+    benchmark.pedantic(db.add_items, args=(rows,), rounds=3, iterations=1)
+
+
+def _from_threads(workers, rows_each, write):
+    threads = [threading.Thread(target=lambda n=n: [write(f'Item {n}-{i}') for i in range(rows_each)])
+               for n in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.benchmark(group='db-concurrent-insert')
+@pytest.mark.parametrize('workers', [1, 8])
+def bench_add_item_threads(benchmark, tmp_path, workers):
+    """1,000 rows from scraper-like threads, each add_item committing on its own"""
+    db = DatabaseManager(str(tmp_path / 'insert.db'))
+    db.initialize_database()
+    benchmark.pedantic(_from_threads, args=(workers, 1000 // workers,
+                                            lambda name: db.add_item(name, 'Generated description', 'Tools')),
+                       rounds=3, iterations=1)
+
+
+@pytest.mark.benchmark(group='db-concurrent-insert')
+@pytest.mark.parametrize('workers', [1, 8])
+def bench_group_commit_writer_threads(benchmark, tmp_path, workers):
+    """The same rows through the group-commit writer thread, acknowledged on commit"""
+    db = DatabaseManager(str(tmp_path / 'insert.db'))
+    db.initialize_database()
+
+    def run():
+        with GroupCommitWriter(db.db_path) as writer:
+            _from_threads(workers, 1000 // workers,
+                          lambda name: writer.submit(name, 'Generated description', 'Tools'))
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+
+
+@pytest.mark.benchmark(group='db-upsert')
+@pytest.mark.parametrize('changed', [False, True])
+def bench_recrawl_upsert_10000(benchmark, tmp_path, changed):
+    """Re-saving a crawled domain: unchanged rows are matched by url and hash and skipped"""
+    db = DatabaseManager(str(tmp_path / 'upsert.db'))
+    db.initialize_database()
+    rows = [(f'Item {i}', 'Generated description', 'Tools', None, {'Rarity': 'Common'},
+             f'https://wiki.example.com/wiki/Item_{i}') for i in range(10000)]
+    db.add_items(rows)
+    rounds = iter(range(1, 100))
+
+    def recrawl():
+        description = f'Edited description {next(rounds)}' if changed else 'Generated description'
+        db.add_items([(name, description, *rest) for name, _, *rest in rows])
+
+    benchmark.pedantic(recrawl, rounds=3, iterations=1)
+    assert len(db.search_items()) == 10000
+
+
+@pytest.mark.benchmark(group='db-upsert')
+def bench_dedupe_migration_100000(benchmark, tmp_path):
+    """One-off migration collapsing a legacy table where every item was saved ten times"""
+    db = DatabaseManager(str(tmp_path / 'dedupe.db'))
+    db.initialize_database()
+    rows = [(f'Item {i % 10000}', f'Version {i}', 'Tools') for i in range(100000)]
+
+    def setup():
+        db.add_items(rows)
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute('PRAGMA user_version = 0')
+        return (), {}
+
+    benchmark.pedantic(db.initialize_database, setup=setup, rounds=3, iterations=1)
+    assert len(db.search_items()) == 10000
@@ -0,0 +1,29 @@
+"""XML dump import throughput (target: hundreds of thousands of items per minute)"""
+import pytest
+
+from core.database.manager import DatabaseManager
+from core.dump_importer import import_dump
+from test.mock_wiki import write_xml_dump
+
+DUMP_ITEMS = 50_000
+
+
+@pytest.fixture(scope='module', params=['.xml', '.xml.bz2'])
+def dump_path(request, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('dumps') / f'pages-articles{request.param}')
+    write_xml_dump(path, DUMP_ITEMS)
+    return path
+
+
+@pytest.mark.benchmark(group='dump-import')
+def bench_import_dump(benchmark, dump_path, tmp_path):
+    counter = iter(range(1000))
+
+    def setup():
+        db = DatabaseManager(str(tmp_path / f'import_{next(counter)}.db'))
+        db.initialize_database()
+        return (dump_path, db), {}
+
+    count = benchmark.pedantic(import_dump, setup=setup, rounds=3)
+    assert count == DUMP_ITEMS
+    benchmark.extra_info['items_per_minute'] = DUMP_ITEMS / benchmark.stats.stats.mean * 60
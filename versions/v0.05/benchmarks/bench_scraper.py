@@ -0,0 +1,81 @@
+"""Scraper throughput against the local mock wiki"""
+import pytest
+
+from core.scraper import (extract_item_details, fetch_page_content, parse_item_list, scrape_item_details,
+                          scrape_items)
+
+
+@pytest.mark.benchmark(group='scraper')
+def bench_fetch_page(benchmark, wiki_server):
+    content = benchmark(fetch_page_content, wiki_server.url + 'wiki/Item_1')
+    assert content
+
+
+@pytest.mark.benchmark(group='scraper')
+def bench_parse_item_list(benchmark, wiki_server):
+    items = benchmark(parse_item_list, wiki_server.url)
+    assert len(items) == wiki_server.num_items
+
+
+@pytest.mark.benchmark(group='scraper')
+def bench_scrape_item_details(benchmark, wiki_server):
+    details = benchmark(scrape_item_details, 'Item 1', wiki_server.url + 'wiki/Item_1')
+    assert details['category'] == wiki_server.item_category(1)
+
+
+@pytest.mark.benchmark(group='scraper-extraction')
+def bench_extract_item_details(benchmark, wiki_server):
+    page = fetch_page_content(wiki_server.url + 'wiki/Item_1', raw=True)
+    details = benchmark(extract_item_details, page, url=wiki_server.url + 'wiki/Item_1')
+    assert details['attributes']
+
+
+@pytest.mark.benchmark(group='scraper')
+def bench_scrape_item_details_slow_wiki(benchmark, slow_wiki_server):
+    details = benchmark(scrape_item_details, 'Item 1', slow_wiki_server.url + 'wiki/Item_1')
+    assert details['description']
+
+
+@pytest.mark.benchmark(group='scraper-traversal')
+@pytest.mark.parametrize('concurrency', [1, 8])
+def bench_parse_item_list_categories(benchmark, slow_wiki_server, concurrency):
+    items = benchmark(parse_item_list, slow_wiki_server.url, max_depth=1, concurrency=concurrency)
+    assert len(items) == slow_wiki_server.num_items
+
+
+@pytest.mark.benchmark(group='scraper-backend')
+@pytest.mark.parametrize('backend', ['html', 'api'])
+def bench_scrape_items_backend(benchmark, slow_wiki_server, backend):
+    items = benchmark.pedantic(scrape_items, args=(slow_wiki_server.url,),
+                               kwargs={'backend': backend, 'concurrency': 8}, rounds=1)
+    assert len(items) == slow_wiki_server.num_items
+
+
+@pytest.mark.benchmark(group='scraper-discovery')
+def bench_discover_items_sitemap(benchmark, slow_wiki_server):
+    from core.sitemap import discover_items
+    items = benchmark(discover_items, slow_wiki_server.url)
+    assert len(items) == slow_wiki_server.num_items
+
+
+@pytest.mark.benchmark(group='scraper-large-page')
+def bench_large_page_response_text(benchmark, large_page_wiki_server):
+    """Baseline: requests' response.text, which guesses the charset over the whole body"""
+    import requests
+    url = large_page_wiki_server.url + 'wiki/Item_1'
+    content = benchmark(lambda: requests.get(url, timeout=10).text)
+    assert 'Item 1' in content
+
+
+@pytest.mark.benchmark(group='scraper-large-page')
+@pytest.mark.parametrize('raw', [False, True], ids=['decoded', 'raw'])
+def bench_large_page_fetch(benchmark, large_page_wiki_server, raw):
+    url = large_page_wiki_server.url + 'wiki/Item_1'
+    content = benchmark(fetch_page_content, url, raw=raw)
+    assert content
+
+
+@pytest.mark.benchmark(group='scraper-large-page')
+def bench_large_page_scrape_item_details(benchmark, large_page_wiki_server):
+    details = benchmark(scrape_item_details, 'Item 1', large_page_wiki_server.url + 'wiki/Item_1')
+    assert details['description']
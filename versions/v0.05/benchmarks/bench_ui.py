@@ -0,0 +1,24 @@
+"""Headless widget creation and pooling in UIFactory"""
+import pytest
+
+
+@pytest.mark.benchmark(group='ui')
+def bench_create_100_buttons(benchmark, ui_factory):
+    buttons = benchmark(lambda: [ui_factory.create_button(text=f'Result {i}') for i in range(100)])
+    assert len(buttons) == 100
+
+
+@pytest.mark.benchmark(group='ui')
+def bench_checkout_100_pooled_buttons(benchmark, ui_factory):
+    def cycle():
+        buttons = [ui_factory.checkout('button', text=f'Result {i}') for i in range(100)]
+        for button in buttons:
+            ui_factory.checkin(button)
+
+    benchmark(cycle)
+
+
+@pytest.mark.benchmark(group='ui')
+def bench_ripple_taps(benchmark, ui_factory):
+    button = ui_factory.create_button(text='Tap')
+    benchmark(button._create_ripple, (10, 10))
@@ -0,0 +1,114 @@
+"""Synthetic fixtures shared by the benchmark suite"""
+import os
+import sqlite3
+
+import pytest
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from core.database.manager import DatabaseManager
+from test.mock_wiki import MockWikiServer
+
+DB_SIZES = (10_000, 100_000)
+LARGE_DB_SIZES = (1_000_000,)
+CATEGORIES = ('Resources', 'Tools', 'Creatures', 'Vehicles', 'Food')
+
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.baselines')
+
+
+def pytest_configure(config):
+    # Keep saved runs next to the suite regardless of the working directory
+    if getattr(config.option, 'benchmark_storage', None) == 'file://./.benchmarks':
+        config.option.benchmark_storage = f'file://{BASELINE_DIR}'
+
+
+def pytest_addoption(parser):
+    parser.addoption('--bench-large', action='store_true',
+                     help='Also run 1M-row database benchmarks')
+
+
+def pytest_generate_tests(metafunc):
+    if 'item_db' in metafunc.fixturenames:
+        sizes = DB_SIZES + (LARGE_DB_SIZES if metafunc.config.getoption('--bench-large') else ())
+        metafunc.parametrize('item_db', sizes, indirect=True, ids=lambda n: f'{n}rows')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def _log_dir(tmp_path_factory):
+    """Send the debug log to a temporary directory instead of ./dev/dev-debug"""
+    from core.logger import configure_logging, shutdown_logging
+    shutdown_logging()
+    configure_logging(log_dir=str(tmp_path_factory.mktemp('logs')))
+    yield
+    shutdown_logging()
+
+
+@pytest.fixture(scope='session')
+def wiki_server():
+    """Local wiki with 500 generated item pages"""
+    with MockWikiServer(num_items=500, items_per_page=500) as wiki:
+        yield wiki
+
+
+@pytest.fixture(scope='session')
+def slow_wiki_server():
+    """Local wiki with 5-15 ms of latency and 50 KB item pages"""
+    with MockWikiServer(num_items=500, latency=(0.005, 0.015), payload_bytes=50_000) as wiki:
+        yield wiki
+
+
+@pytest.fixture(scope='session')
+def large_page_wiki_server():
+    """Local wiki with 2 MB item pages and no Content-Type charset"""
+    with MockWikiServer(num_items=10, payload_bytes=2_000_000, content_type=None) as wiki:
+        yield wiki
+
+
+def _build_item_db(path, rows):
+    db = DatabaseManager(path)
+    db.initialize_database()
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            'INSERT INTO items (name, description, category) VALUES (?, ?, ?)',
+            ((f'Item {i}', f'Generated description for item {i} with some filler text',
+              CATEGORIES[i % len(CATEGORIES)]) for i in range(rows))
+        )
+    return db
+
+
+@pytest.fixture(scope='session')
+def _item_dbs(tmp_path_factory):
+    return {}
+
+
+@pytest.fixture
+def item_db(request, _item_dbs, tmp_path_factory):
+    """DatabaseManager over a generated items table of the requested size"""
+    rows = request.param
+    if rows not in _item_dbs:
+        path = str(tmp_path_factory.mktemp('db') / f'items_{rows}.db')
+        _item_dbs[rows] = _build_item_db(path, rows)
+    return _item_dbs[rows]
+
+
+@pytest.fixture(scope='session')
+def image_set(tmp_path_factory):
+    """A handful of generated background images of varying sizes"""
+    from PIL import Image
+    directory = tmp_path_factory.mktemp('images')
+    paths = []
+    for i, size in enumerate([(640, 480), (1280, 720), (1920, 1080), (2560, 1440)]):
+        path = directory / f'bg_{i}.png'
+        Image.new('RGB', size, (i * 40, 80, 160)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture(scope='session')
+def ui_factory():
+    """Headless UIFactory using the project theme"""
+    from core.ui.components import UIFactory
+    from core.ui.theme import Theme
+    return UIFactory(Theme())
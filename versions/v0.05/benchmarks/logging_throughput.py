@@ -0,0 +1,57 @@
+"""Hot-path logging throughput, synchronous vs queued handlers
+
+Usage:
+    python benchmarks/logging_throughput.py --calls 50000
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.logger import configure_logging, setup_logger, shutdown_logging, log_scraping_status
+
+
+def run(calls=50000, use_queue=False):
+    """Return log_scraping_status calls per second on the caller's thread"""
+    with tempfile.TemporaryDirectory() as tmp, \
+            open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stderr(devnull):
+        # Scraping status is DEBUG, which the log file drops by default;
+        # no rotation so every record can be counted afterwards
+        configure_logging(log_dir=tmp, max_bytes=0, use_queue=use_queue, file_level=logging.DEBUG)
+        logger = setup_logger(f'bench.{use_queue}')
+        start = time.perf_counter()
+        for i in range(calls):
+            log_scraping_status(logger, f'Item {i}')
+        elapsed = time.perf_counter() - start
+        # Drain the listener so the next run starts from an idle thread
+        shutdown_logging()
+        written = 0
+        for log_file in Path(tmp).glob('questvault_*.log*'):
+            with open(log_file, encoding='utf-8') as f:
+                written += sum('Scraping status' in line for line in f)
+    if written != calls:
+        raise RuntimeError(f"Only {written} of {calls} records reached the log file")
+    return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=50000)
+    args = parser.parse_args()
+
+    for use_queue in (False, True):
+        mode = 'queued' if use_queue else 'synchronous'
+        print(f"{mode:>12}: {run(args.calls, use_queue):,.0f} calls/sec")
+
+
+if __name__ == '__main__':
+    main()
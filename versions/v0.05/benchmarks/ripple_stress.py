@@ -0,0 +1,65 @@
+"""Frame time of a RippleButton under sustained rapid tapping
+
+Usage:
+    python benchmarks/ripple_stress.py --taps 10000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from kivy.base import EventLoop
+from kivy.core.window import Window
+
+from core.ui.components import UIFactory
+from core.ui.theme import Theme
+
+
+def _frame_ms():
+    start = time.perf_counter()
+    EventLoop.idle()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(taps=10000, taps_per_frame=10, sample_frames=100):
+    """Tap a button `taps` times, rendering a frame every few taps"""
+    EventLoop.ensure_window()
+    button = UIFactory(Theme()).create_button(text='Tap', size_hint=(None, None), size=(200, 60))
+    Window.add_widget(button)
+
+    frames = []
+    for i in range(taps):
+        button._create_ripple((100 + i % 50, 30))
+        if i % taps_per_frame == 0:
+            frames.append(_frame_ms())
+    Window.remove_widget(button)
+
+    return {
+        'first_ms': statistics.mean(frames[:sample_frames]),
+        'last_ms': statistics.mean(frames[-sample_frames:]),
+        'instructions': len(button.canvas.after.children) + len(button.ripple_group.children)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--taps', type=int, default=10000)
+    args = parser.parse_args()
+
+    result = run(args.taps)
+    print(f"mean frame time, first 100 frames: {result['first_ms']:.2f} ms")
+    print(f"mean frame time, last 100 frames:  {result['last_ms']:.2f} ms")
+    print(f"canvas instructions after {args.taps} taps: {result['instructions']}")
+
+
+if __name__ == '__main__':
+    main()
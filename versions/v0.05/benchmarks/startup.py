@@ -0,0 +1,100 @@
+"""Cold-start benchmark: import cost and time to first window
+
+Runs the app in fresh interpreters so nothing is already imported.
+Exits non-zero when time-to-first-window exceeds the budget.
+
+Usage:
+    python benchmarks/startup.py --budget-ms 2500
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+
+# Modules that should not be loaded just to show the main window
+DEFERRED_MODULES = ('requests.models', 'bs4.element', 'core.database.manager', 'core.scraper')
+
+FIRST_FRAME_SCRIPT = '''
+import sys
+import main_gui
+from kivy.clock import Clock
+
+app = main_gui.QuestVaultApp()
+
+def first_frame(dt):
+    loaded = [m for m in {deferred!r} if m in sys.modules]
+    print('FIRST_FRAME', ','.join(loaded), flush=True)
+    app.stop()
+
+Clock.schedule_once(first_frame, 0)
+app.run()
+'''
+
+
+def _env():
+    env = dict(os.environ, KIVY_NO_ARGS='1', KIVY_NO_CONSOLELOG='1')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get('PYTHONPATH')]))
+    return env
+
+
+def import_times(module='main_gui', top=10):
+    """Return (total_ms, [(cumulative_ms, name), ...]) from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, env=_env(), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative) / 1000, name.strip()))
+    total = next(ms for ms, name in rows if name == module)
+    return total, sorted(rows, reverse=True)[:top]
+
+
+def time_to_first_window():
+    """Return (ms until the first frame is drawn, deferred modules loaded)"""
+    script = FIRST_FRAME_SCRIPT.format(deferred=DEFERRED_MODULES)
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-c', script],
+        cwd=PROJECT_ROOT, env=_env(), stdout=subprocess.PIPE, text=True
+    )
+    elapsed, loaded = None, []
+    for line in proc.stdout:
+        if line.startswith('FIRST_FRAME'):
+            elapsed = (time.perf_counter() - start) * 1000
+            loaded = [m for m in line[len('FIRST_FRAME'):].strip().split(',') if m]
+    proc.wait()
+    if elapsed is None:
+        raise RuntimeError("App exited before drawing its first frame")
+    return elapsed, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=2500,
+                        help='Maximum allowed time to first window')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    total, slowest = import_times(top=args.top)
+    print(f"import main_gui: {total:.1f} ms")
+    for ms, name in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    elapsed, loaded = time_to_first_window()
+    print(f"time to first window: {elapsed:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if loaded:
+        print(f"deferred modules loaded before first frame: {', '.join(loaded)}")
+
+    return 0 if elapsed <= args.budget_ms and not loaded else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Widget creation rate benchmark for UIFactory
+
+Usage:
+    python benchmarks/ui_factory.py --count 1000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from core.ui.components import UIFactory
+from core.ui.theme import Theme
+
+
+def run(count=1000):
+    """Create `count` result buttons and return (widgets/sec, stat calls)"""
+    factory = UIFactory(Theme())
+    real_exists = os.path.exists
+    with patch('os.path.exists', side_effect=real_exists) as exists:
+        start = time.perf_counter()
+        for i in range(count):
+            factory.create_button(text=f"Result {i}")
+        elapsed = time.perf_counter() - start
+    return count / elapsed, exists.call_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000)
+    args = parser.parse_args()
+
+    rate, stats = run(args.count)
+    print(f"create_button: {rate:,.0f} widgets/sec ({stats} filesystem stat calls)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,460 @@
+"""Compressed, content-addressed archive of fetched item pages
+
+Keeping the raw HTML of every item page means extraction improvements can
+be replayed offline with ``reparse`` instead of recrawling a wiki:
+
+    python -m core.scraper --archive archive/ ...         # fill while crawling
+    python -m core.archive train --archive archive/        # optional, per domain
+    python -m core.archive reparse --archive archive/ --db questvault.db
+
+Pages are stored once per SHA-256 of their body under objects/, zstd
+compressed. Wiki pages of one site share most of their markup, so a zstd
+dictionary trained on a domain's pages shrinks them several times further;
+one is trained automatically once a domain has ``train_after`` pages.
+Without the zstandard package pages are zlib compressed instead.
+
+Archiving is off unless QUESTVAULT_ARCHIVE_DIR is set or enable() is
+called (e.g. from the --archive CLI flag).
+"""
+import hashlib
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+from core.logger import setup_logger
+from core.metrics import REGISTRY
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+ARCHIVE_BYTES = REGISTRY.counter('questvault_archive_bytes_total', 'Page bytes archived, by stage (raw/stored)')
+
+MAGIC = b'QV'
+ZSTD, ZLIB = b'Z', b'L'
+HEADER = struct.Struct('>2sc x I')  # magic, codec, pad, dictionary id (0 = none)
+
+_active = None
+
+class ReparseIncomplete(Exception):
+    """Some reparsed items could not be written; the rest were"""
+
+    def __init__(self, written, dropped):
+        super().__init__(f"{dropped} items could not be written ({written} reparsed)")
+        self.written = written
+        self.dropped = dropped
+
+def enable(root):
+    """Archive item pages fetched from now on under root"""
+    global _active
+    _active = PageArchive(root)
+    return _active
+
+def disable():
+    global _active
+    _active = False
+
+def active():
+    """The archive in use, or None"""
+    global _active
+    if _active is None:
+        root = os.environ.get('QUESTVAULT_ARCHIVE_DIR')
+        _active = PageArchive(root) if root else False
+    return _active or None
+
+def domain_of(url):
+    return urlsplit(url).netloc
+
+class PageArchive:
+    """Content-addressed page store with a SQLite index"""
+
+    def __init__(self, root, level=10, train_after=200, dictionary_size=112 * 1024):
+        self.root = root
+        self.level = level
+        self.train_after = train_after
+        self.dictionary_size = dictionary_size
+        self.logger = setup_logger('archive')
+        self._index_path = os.path.join(root, 'index.db')
+        self._dictionaries = {}
+        self._domains = {}
+        self._local = threading.local()
+        self._train_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'dictionaries'), exist_ok=True)
+        self._initialize()
+
+    def _connect(self):
+        return sqlite3.connect(self._index_path, timeout=30)
+
+    def _initialize(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    domain TEXT NOT NULL,
+                    name TEXT,
+                    digest TEXT NOT NULL,
+                    encoding TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS objects (
+                    digest TEXT PRIMARY KEY,
+                    raw_size INTEGER NOT NULL,
+                    stored_size INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS dictionaries (
+                    dict_id INTEGER PRIMARY KEY,
+                    domain TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_domain ON pages (domain)')
+
+    # Compression
+
+    def _dictionary(self, dict_id):
+        dictionary = self._dictionaries.get(dict_id)
+        if dictionary is None:
+            with open(os.path.join(self.root, 'dictionaries', f'{dict_id}.dict'), 'rb') as f:
+                dictionary = zstandard.ZstdCompressionDict(f.read())
+            self._dictionaries[dict_id] = dictionary
+        return dictionary
+
+    def _domain_state(self, domain):
+        """
+        A domain's current dictionary id and page count, read from the index
+        once and then kept up to date in memory so put() doesn't query it
+        """
+        state = self._domains.get(domain)
+        if state is None:
+            with self._connect() as conn:
+                # Dictionary ids are derived from content, so only the
+                # creation time says which one is newest
+                row = conn.execute('''
+                    SELECT dict_id FROM dictionaries WHERE domain = ?
+                    ORDER BY created_at DESC LIMIT 1
+                ''', (domain,)).fetchone()
+                pages = conn.execute('SELECT COUNT(*) FROM pages WHERE domain = ?', (domain,)).fetchone()[0]
+            state = {'dict_id': row[0] if row else 0, 'pages': pages, 'train_at': self.train_after}
+            state = self._domains.setdefault(domain, state)
+        return state
+
+    def _domain_dictionary(self, domain):
+        return self._domain_state(domain)['dict_id']
+
+    def _codec(self, dict_id, kind):
+        # zstd (de)compressors aren't thread-safe; keep one per thread and dictionary
+        cache = self._local.__dict__.setdefault(kind, {})
+        codec = cache.get(dict_id)
+        if codec is None:
+            dictionary = self._dictionary(dict_id) if dict_id else None
+            if kind == 'compress':
+                codec = zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+            else:
+                codec = zstandard.ZstdDecompressor(dict_data=dictionary)
+            cache[dict_id] = codec
+        return codec
+
+    def compress(self, body, domain=None):
+        """Compress a page body with the domain's dictionary when there is one"""
+        if zstandard is None:
+            return HEADER.pack(MAGIC, ZLIB, 0) + zlib.compress(body, 6)
+        dict_id = self._domain_dictionary(domain) if domain else 0
+        return HEADER.pack(MAGIC, ZSTD, dict_id) + self._codec(dict_id, 'compress').compress(body)
+
+    def decompress(self, blob):
+        magic, codec, dict_id = HEADER.unpack_from(blob)
+        if magic != MAGIC:
+            raise ValueError("Not an archived page")
+        payload = blob[HEADER.size:]
+        if codec == ZLIB:
+            return zlib.decompress(payload)
+        if zstandard is None:
+            raise RuntimeError("Page was archived with zstd; install the zstandard package to read it")
+        return self._codec(dict_id, 'decompress').decompress(payload)
+
+    # Storage
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest[2:])
+
+    def put(self, url, body, encoding='utf-8', name=None):
+        """
+        Archive a page body
+
+        Args:
+            url (str): Page URL; archiving it again replaces the old entry
+            body (bytes): Raw response body
+            encoding (str): Encoding detected at fetch time
+            name (str): Item name the page was scraped as
+
+        Returns:
+            str: SHA-256 digest the body is stored under
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        domain = domain_of(url)
+        state = self._domain_state(domain)
+        path = self._object_path(digest)
+        stored = None
+        if not os.path.exists(path):
+            blob = self.compress(body, domain)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+            stored = len(blob)
+            ARCHIVE_BYTES.inc(len(body), stage='raw')
+            ARCHIVE_BYTES.inc(stored, stage='stored')
+
+        with self._connect() as conn:
+            if stored is not None:
+                conn.execute('INSERT OR REPLACE INTO objects (digest, raw_size, stored_size) VALUES (?, ?, ?)',
+                             (digest, len(body), stored))
+            conn.execute('''
+                INSERT OR REPLACE INTO pages (url, domain, name, digest, encoding, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (url, domain, name, digest, encoding, time.time()))
+
+        with self._state_lock:
+            # Counts re-archived URLs too; only decides when to train
+            state['pages'] += 1
+        if zstandard is not None and self.train_after:
+            self._maybe_train(domain, state)
+        return digest
+
+    def get(self, url):
+        """Archived page as FetchedPage(body, encoding), or None"""
+        from core.scraper import FetchedPage
+
+        with self._connect() as conn:
+            row = conn.execute('SELECT digest, encoding FROM pages WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        with open(self._object_path(row[0]), 'rb') as f:
+            return FetchedPage(self.decompress(f.read()), row[1])
+
+    def entries(self, domain=None):
+        """(url, name) of every archived page, optionally for one domain"""
+        query = 'SELECT url, name FROM pages'
+        params = ()
+        if domain:
+            query += ' WHERE domain = ?'
+            params = (domain_of(domain) or domain,)
+        with self._connect() as conn:
+            return conn.execute(query + ' ORDER BY url', params).fetchall()
+
+    def stats(self):
+        """Page and object counts with raw and stored byte totals"""
+        with self._connect() as conn:
+            pages, domains = conn.execute('SELECT COUNT(*), COUNT(DISTINCT domain) FROM pages').fetchone()
+            objects, raw, stored = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM objects'
+            ).fetchone()
+            dictionaries = conn.execute('SELECT COUNT(*) FROM dictionaries').fetchone()[0]
+        return {
+            'pages': pages, 'domains': domains, 'objects': objects, 'dictionaries': dictionaries,
+            'raw_bytes': raw, 'stored_bytes': stored, 'ratio': raw / stored if stored else 0.0,
+        }
+
+    # Dictionaries
+
+    def _maybe_train(self, domain, state):
+        if state['dict_id'] or state['pages'] < state['train_at']:
+            return
+        if self._train_lock.acquire(blocking=False):
+            try:
+                if not state['dict_id'] and self.train_dictionary(domain) is None:
+                    # Too little to train on; wait for more pages before retrying
+                    state['train_at'] = state['pages'] + self.train_after
+            finally:
+                self._train_lock.release()
+
+    def train_dictionary(self, domain, max_samples=2000):
+        """
+        Train a zstd dictionary on a domain's archived pages
+
+        Pages archived afterwards use it; existing objects keep the
+        dictionary they were written with.
+
+        Returns:
+            int: New dictionary id, or None if there was too little to train on
+        """
+        if zstandard is None:
+            self.logger.warning("zstandard is not installed; dictionaries are unavailable")
+            return None
+        domain = domain_of(domain) or domain
+        with self._connect() as conn:
+            digests = [row[0] for row in conn.execute(
+                'SELECT DISTINCT digest FROM pages WHERE domain = ? ORDER BY fetched_at DESC LIMIT ?',
+                (domain, max_samples))]
+        samples = []
+        for digest in digests:
+            with open(self._object_path(digest), 'rb') as f:
+                samples.append(self.decompress(f.read()))
+        try:
+            dictionary = zstandard.train_dictionary(self.dictionary_size, samples)
+        except zstandard.ZstdError as e:
+            self.logger.warning("Could not train a dictionary for %s from %d pages: %s", domain, len(samples), e)
+            return None
+
+        dict_id = dictionary.dict_id()
+        path = os.path.join(self.root, 'dictionaries', f'{dict_id}.dict')
+        with open(path, 'wb') as f:
+            f.write(dictionary.as_bytes())
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO dictionaries (dict_id, domain, created_at) VALUES (?, ?, ?)',
+                         (dict_id, domain, time.time()))
+        self._domain_state(domain)['dict_id'] = dict_id
+        self.logger.info("Trained %d byte dictionary %d for %s from %d pages",
+                         len(dictionary.as_bytes()), dict_id, domain, len(samples))
+        return dict_id
+
+# Offline re-extraction
+
+_worker_archive = None
+
+def _reparse_chunk(root, entries, profile=None):
+    """Worker: re-run extraction over archived pages"""
+    global _worker_archive
+    from core.extraction import load_profile
+    from core.mediawiki import title_from_url
+    from core.scraper import extract_item_details
+
+    if _worker_archive is None or _worker_archive.root != root:
+        _worker_archive = PageArchive(root, train_after=0)
+    rows = []
+    for url, name in entries:
+        page = _worker_archive.get(url)
+        if page is None:
+            continue
+        details = extract_item_details(page, load_profile(profile), url)
+        rows.append((name or title_from_url(url), details['description'], details['category'],
+                     details['icon_url'], details['attributes'], url))
+    return rows
+
+def reparse(root, db, domain=None, workers=None, chunk_size=500, callback=None, profile=None):
+    """
+    Re-extract every archived item page and upsert the results
+
+    Args:
+        root (str): Archive directory
+        db (DatabaseManager): Database receiving the items
+        domain (str): Only reparse this domain's pages
+        workers (int): Worker processes; defaults to one per core
+        chunk_size (int): Pages per task handed to a worker
+        callback (function): Optional callback for progress updates
+        profile (str): Extraction profile spec; defaults to each domain's
+            stored profile, or the built-in one for unknown domains
+
+    Returns:
+        int: Number of items written
+
+    Raises:
+        ReparseIncomplete: Some rows failed to write; the other chunks are
+            still written and the shortfall is reported at the end
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from core.extraction import load_profile
+
+    entries = PageArchive(root, train_after=0).entries(domain)
+    groups = {}
+    for entry in entries:
+        groups.setdefault(domain_of(entry[0]), []).append(entry)
+    if profile is None:
+        # The domains table stores site URLs; the archive groups pages by host
+        stored = {domain_of(url) or url: db.get_profile(url) for url in db.get_domains()}
+        profiles = {name: stored.get(name) for name in groups}
+    else:
+        profiles = dict.fromkeys(groups, profile)
+    load_profile(profile)
+    for spec in set(profiles.values()):
+        load_profile(spec)  # Raise on a bad spec before starting workers
+
+    chunks, chunk_profiles = [], []
+    for name, group in groups.items():
+        for i in range(0, len(group), chunk_size):
+            chunks.append(group[i:i + chunk_size])
+            chunk_profiles.append(profiles[name])
+    written = dropped = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rows in pool.map(_reparse_chunk, [root] * len(chunks), chunks, chunk_profiles):
+            saved = db.upsert_items(rows)
+            written += saved
+            if saved < len(rows):
+                dropped += len(rows) - saved
+                setup_logger('archive').error("Failed to write %d reparsed items", len(rows) - saved)
+            if callback:
+                callback(f"Reparsed {written}/{len(entries)} pages")
+    if dropped:
+        raise ReparseIncomplete(written, dropped)
+    return written
+
+def main(argv=None):
+    """Archive maintenance: python -m core.archive {reparse,train,stats} --archive DIR"""
+    import argparse
+    from core.database.manager import DatabaseManager
+    from core.logger import configure_logging
+
+    parser = argparse.ArgumentParser(prog='questvault-archive',
+                                     description='Maintain the raw page archive and re-extract items from it.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, help in (('reparse', 'Re-run extraction over archived pages and upsert into the database'),
+                       ('train', 'Train zstd dictionaries for archived domains'),
+                       ('stats', 'Show archive size and compression ratio')):
+        command = commands.add_parser(name, help=help)
+        command.add_argument('--archive', required=True, metavar='DIR', help='Archive directory')
+        command.add_argument('--domain', help='Only this domain')
+    commands.choices['reparse'].add_argument('--db', default='questvault.db',
+                                             help='Database file (default: %(default)s)')
+    commands.choices['reparse'].add_argument('--workers', type=int, help='Worker processes (default: one per core)')
+    commands.choices['reparse'].add_argument('--extraction-profile', metavar='SPEC',
+                                             help="Built-in profile name or JSON selectors "
+                                                  "(default: the domain's stored profile)")
+    args = parser.parse_args(argv)
+
+    configure_logging(use_queue=True)
+    if not os.path.isdir(args.archive):
+        print(f"No archive at {args.archive}", file=sys.stderr)
+        return 2
+
+    archive = PageArchive(args.archive, train_after=0)
+    if args.command == 'stats':
+        stats = archive.stats()
+        print(f"{stats['pages']} pages from {stats['domains']} domain(s) in {stats['objects']} objects, "
+              f"{stats['raw_bytes'] / 1024:.0f} KB stored as {stats['stored_bytes'] / 1024:.0f} KB "
+              f"({stats['ratio']:.1f}x), {stats['dictionaries']} dictionaries")
+        return 0
+    if args.command == 'train':
+        domains = [args.domain] if args.domain else sorted({domain_of(url) for url, _ in archive.entries()})
+        trained = [domain for domain in domains if archive.train_dictionary(domain)]
+        print(f"Trained dictionaries for {len(trained)} of {len(domains)} domain(s)")
+        return 0 if len(trained) == len(domains) else 1
+
+    db = DatabaseManager(args.db)
+    db.initialize_database()
+    started = time.perf_counter()
+    try:
+        count = reparse(args.archive, db, args.domain, args.workers, profile=args.extraction_profile)
+    except ValueError as e:
+        print(f"Bad extraction profile: {e}", file=sys.stderr)
+        return 2
+    except ReparseIncomplete as e:
+        print(f"Reparse incomplete: {e}", file=sys.stderr)
+        return 1
+    print(f"Reparsed {count} items in {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""Content-addressed store for item icons and their thumbnails
+
+Icons are fetched concurrently and stored once per SHA-256 of their bytes
+under objects/, so an icon shared by hundreds of items (or served from
+several URLs) takes the space of one. index.db maps each icon URL to its
+digest. Thumbnails are rendered in a process pool straight into the
+CacheManager directory, which applies its usual size and age limits, so
+the UI only ever looks up a finished PNG and never decodes an icon itself:
+
+    store = AssetStore('assets/', CacheManager('cache'))
+    store.fetch(icon_urls)                       # while crawling
+    store.thumbnails(icon_urls)                  # {url: png path or None}
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from core.logger import setup_logger
+from core.metrics import REGISTRY
+
+ASSETS_FETCHED = REGISTRY.counter('questvault_assets_fetched_total', 'Icon downloads, by result')
+ASSETS_STORED = REGISTRY.counter('questvault_assets_stored_total', 'Downloaded icons, by new or duplicate content')
+THUMBNAILS_RENDERED = REGISTRY.counter('questvault_thumbnails_rendered_total', 'Icon thumbnails rendered, by result')
+
+# Icons are small; anything bigger is a full-size image, not worth keeping
+MAX_ASSET_BYTES = 2 * 1024 * 1024
+THUMBNAIL_SIZE = (48, 48)
+
+IMAGE_SIGNATURES = (b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'BM')
+
+def is_image(body):
+    """Whether bytes start like a raster image Pillow can decode"""
+    return body.startswith(IMAGE_SIGNATURES) or (body[:4] == b'RIFF' and body[8:12] == b'WEBP')
+
+def render_thumbnail(source_path, target_path, size=THUMBNAIL_SIZE):
+    """
+    Scale an image to fit size, centred on a transparent square
+
+    Runs in worker processes, so it only takes paths.
+
+    Returns:
+        bool: Whether the thumbnail was written
+    """
+    from PIL import Image
+
+    size = tuple(size)
+    try:
+        with Image.open(source_path) as img:
+            # Lets JPEG decode at a fraction of full resolution
+            img.draft('RGB', size)
+            img = img.convert('RGBA')
+            img.thumbnail(size, Image.Resampling.LANCZOS)
+            canvas = Image.new('RGBA', size, (0, 0, 0, 0))
+            canvas.paste(img, ((size[0] - img.width) // 2, (size[1] - img.height) // 2))
+        tmp_path = f'{target_path}.{os.getpid()}.tmp'
+        canvas.save(tmp_path, 'PNG')
+        os.replace(tmp_path, target_path)
+        return True
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return False
+
+class AssetStore:
+    """Icons stored by content hash, with thumbnails kept in a CacheManager"""
+
+    def __init__(self, root, cache=None, thumbnail_size=THUMBNAIL_SIZE):
+        from core.cache_manager import CacheManager
+
+        self.root = root
+        self.cache = cache or CacheManager()
+        self.thumbnail_size = tuple(thumbnail_size)
+        self.logger = setup_logger('assets')
+        self._index_path = os.path.join(root, 'index.db')
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self._initialize()
+
+    def _connect(self):
+        return sqlite3.connect(self._index_path, timeout=30)
+
+    def _initialize(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS assets (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS objects (
+                    digest TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL
+                )
+            ''')
+
+    def path(self, digest):
+        """Where an icon's bytes live"""
+        return os.path.join(self.root, 'objects', digest[:2], digest[2:])
+
+    def digests(self, urls):
+        """{url: digest} for the URLs already stored"""
+        urls = list(urls)
+        found = {}
+        with self._connect() as conn:
+            # Stay under SQLite's bound parameter limit
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                found.update(conn.execute(
+                    f"SELECT url, digest FROM assets WHERE url IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        return found
+
+    def _write_object(self, body):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            ASSETS_STORED.inc(result='duplicate')
+            return digest, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        ASSETS_STORED.inc(result='new')
+        return digest, True
+
+    def put(self, url, body):
+        """Store an icon's bytes under their digest and map url to it"""
+        digest, new = self._write_object(body)
+        with self._connect() as conn:
+            if new:
+                conn.execute('INSERT OR REPLACE INTO objects (digest, size) VALUES (?, ?)', (digest, len(body)))
+            conn.execute('INSERT OR REPLACE INTO assets (url, digest, fetched_at) VALUES (?, ?, ?)',
+                         (url, digest, time.time()))
+        return digest
+
+    def _download(self, url):
+        from core.scraper import fetch_page_content
+
+        # Same timeouts, size cap and per-domain circuit breaker as page fetches
+        page = fetch_page_content(url, raw=True, max_bytes=MAX_ASSET_BYTES)
+        if not page:
+            ASSETS_FETCHED.inc(result='error')
+            return None
+        if not is_image(page.body):
+            ASSETS_FETCHED.inc(result='not_image')
+            self.logger.warning("Skipping %s: not a supported image", url)
+            return None
+        ASSETS_FETCHED.inc(result='ok')
+        return page.body
+
+    def fetch(self, urls, concurrency=8, callback=None, workers=None):
+        """
+        Download icons not stored yet and render their thumbnails
+
+        Args:
+            urls (iterable): Icon URLs; duplicates and None are ignored
+            concurrency (int): Downloads in flight at once
+            callback (function): Optional callback for progress updates
+            workers (int): Thumbnail processes; defaults to one per core
+
+        Returns:
+            dict: {url: digest} for every URL that is now stored
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        stored = self.digests(urls)
+        missing = [url for url in urls if url not in stored]
+        ASSETS_FETCHED.inc(len(urls) - len(missing), result='cached')
+
+        new_objects, rows = {}, []
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for url, body in zip(missing, pool.map(self._download, missing)):
+                if body is None:
+                    continue
+                digest, new = self._write_object(body)
+                if new:
+                    new_objects[digest] = len(body)
+                rows.append((url, digest, time.time()))
+                stored[url] = digest
+
+        if rows:
+            with self._connect() as conn:
+                conn.executemany('INSERT OR REPLACE INTO objects (digest, size) VALUES (?, ?)',
+                                 new_objects.items())
+                conn.executemany('INSERT OR REPLACE INTO assets (url, digest, fetched_at) VALUES (?, ?, ?)', rows)
+        rendered = self.make_thumbnails(set(stored.values()), workers)
+        if callback:
+            callback(f"Stored {len(rows)} new icons ({len(new_objects)} distinct), "
+                     f"rendered {rendered} thumbnails")
+        return stored
+
+    def make_thumbnails(self, digests, workers=None):
+        """
+        Render missing thumbnails into the cache, in parallel processes
+
+        Returns:
+            int: Thumbnails rendered
+        """
+        size = self.thumbnail_size
+        todo = {}
+        for digest in digests:
+            key = self.cache.thumbnail_key(digest, size)
+            if not os.path.exists(os.path.join(self.cache.cache_dir, key)):
+                todo[key] = self.path(digest)
+        if not todo:
+            return 0
+
+        keys = list(todo)
+        sources = [todo[key] for key in keys]
+        targets = [os.path.join(self.cache.cache_dir, key) for key in keys]
+        if len(keys) == 1:
+            results = [render_thumbnail(sources[0], targets[0], size)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(render_thumbnail, sources, targets, [size] * len(keys),
+                                        chunksize=max(1, len(keys) // 32)))
+
+        rendered = {key: source for key, source, ok in zip(keys, sources, results) if ok}
+        THUMBNAILS_RENDERED.inc(len(rendered), result='ok')
+        THUMBNAILS_RENDERED.inc(len(keys) - len(rendered), result='failed')
+        self.cache.add_cached_files(rendered)
+        return len(rendered)
+
+    def thumbnails(self, urls):
+        """
+        Finished thumbnail paths for icon URLs, without rendering anything
+
+        Safe to call from the UI thread: a URL whose icon or thumbnail is
+        not ready maps to None.
+
+        Returns:
+            dict: {url: path or None}
+        """
+        urls = [url for url in dict.fromkeys(urls) if url]
+        digests = self.digests(urls)
+        paths = self.cache.get_cached_thumbnails(set(digests.values()), self.thumbnail_size)
+        return {url: paths.get(digests.get(url)) for url in urls}
@@ -1,9 +1,15 @@
 import os
 import json
 import hashlib
+import threading
 from time import time
-from PIL import Image
-import shutil
+from core.metrics import REGISTRY
+
+CACHE_REQUESTS = REGISTRY.counter('questvault_cache_requests_total', 'Background cache lookups, by result')
+
+# Thumbnail hits only refresh their timestamp this often, so showing a page
+# of icon rows rarely rewrites cache_info.json
+TOUCH_INTERVAL = 60 * 60
 
 class CacheManager:
     """Manages caching of background images and other assets"""
@@ -13,6 +19,8 @@ class CacheManager:
         self.cache_info_file = os.path.join(cache_dir, 'cache_info.json')
         self.max_age = 7 * 24 * 60 * 60  # 7 days in seconds
         self.max_size = 100 * 1024 * 1024  # 100MB in bytes
+        # The UI thread and the asset pipeline both update cache_info.json
+        self._lock = threading.RLock()
         self._init_cache()
     
     def _init_cache(self):
@@ -31,8 +39,11 @@ class CacheManager:
     
     def _save_cache_info(self, info):
         """Save cache information to JSON file"""
-        with open(self.cache_info_file, 'w') as f:
+        # Replace atomically so a crawler and the app never read a half-written file
+        tmp_file = f'{self.cache_info_file}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_file, 'w') as f:
             json.dump(info, f)
+        os.replace(tmp_file, self.cache_info_file)
     
     def _get_file_hash(self, file_path):
         """Generate hash for a file"""
@@ -108,11 +119,13 @@ class CacheManager:
                 # Update access timestamp
                 info[cache_key]['timestamp'] = time()
                 self._save_cache_info(info)
+                CACHE_REQUESTS.inc(result='hit')
                 return cache_path
         
+        CACHE_REQUESTS.inc(result='miss')
+        
         # Create new cached version
-        from core.utils.image_utils import resize_background
-        resize_background(original_path, cache_path, size)
+        self._resize_image(original_path, cache_path, size)
         
         # Update cache info
         info[cache_key] = {
@@ -127,6 +140,94 @@ class CacheManager:
         
         return cache_path 
     
+    def thumbnail_key(self, digest, size):
+        """Cache file name for an asset thumbnail"""
+        return f"thumb_{digest}_{size[0]}x{size[1]}.png"
+    
+    def get_cached_thumbnail(self, digest, size, source_path=None):
+        """
+        Get an asset thumbnail, rendering it only if a source is given
+        
+        Args:
+            digest (str): Content hash of the source image
+            size (tuple): Target size (width, height)
+            source_path (str): Render from this image on a miss; without it
+                a miss returns None straight away
+            
+        Returns:
+            str: Path to cached thumbnail, or None
+        """
+        path = self.get_cached_thumbnails([digest], size).get(digest)
+        if path is not None or source_path is None:
+            return path
+        
+        from core.assets import render_thumbnail
+        cache_key = self.thumbnail_key(digest, size)
+        if not render_thumbnail(source_path, os.path.join(self.cache_dir, cache_key), size):
+            return None
+        self.add_cached_files({cache_key: source_path})
+        return os.path.join(self.cache_dir, cache_key)
+    
+    def get_cached_thumbnails(self, digests, size):
+        """
+        Look up many thumbnails with one read and write of the cache info
+        
+        Args:
+            digests (iterable): Content hashes of the source images
+            size (tuple): Target size (width, height)
+            
+        Returns:
+            dict: {digest: path} for the thumbnails that are cached
+        """
+        found = {}
+        with self._lock:
+            info = self._load_cache_info()
+            now = time()
+            touched = False
+            for digest in digests:
+                cache_key = self.thumbnail_key(digest, size)
+                cache_path = os.path.join(self.cache_dir, cache_key)
+                if cache_key in info and os.path.exists(cache_path):
+                    if now - info[cache_key]['timestamp'] > TOUCH_INTERVAL:
+                        info[cache_key]['timestamp'] = now
+                        touched = True
+                    found[digest] = cache_path
+                    CACHE_REQUESTS.inc(result='hit')
+                else:
+                    CACHE_REQUESTS.inc(result='miss')
+            if touched:
+                self._save_cache_info(info)
+        return found
+    
+    def add_cached_files(self, entries):
+        """
+        Register files already written into the cache directory
+        
+        Args:
+            entries (dict): {cache key: original path}
+        """
+        if not entries:
+            return
+        with self._lock:
+            info = self._load_cache_info()
+            now = time()
+            for cache_key, original in entries.items():
+                cache_path = os.path.join(self.cache_dir, cache_key)
+                if os.path.exists(cache_path):
+                    info[cache_key] = {
+                        'timestamp': now,
+                        'size': os.path.getsize(cache_path),
+                        'original': original
+                    }
+            self._save_cache_info(info)
+            self._cleanup_cache()
+    
+    def _resize_image(self, source_path, target_path, size):
+        """Resize image to exactly the requested size"""
+        from PIL import Image
+        with Image.open(source_path) as img:
+            img.resize(tuple(size), Image.Resampling.LANCZOS).save(target_path, 'PNG')
+    
     def _file_operation(self, operation_type, file_path, *args, **kwargs):
         """Centralized file operation handler"""
         try:
@@ -0,0 +1,137 @@
+"""Per-domain circuit breakers for the crawler
+
+When a wiki goes down, every queued request to it would otherwise wait out
+its timeout. A breaker opens after ``failure_threshold`` consecutive
+failures, and requests to that domain are refused at once until
+``cooldown`` seconds pass. Then a few half-open probe requests decide
+whether it closes again or reopens for another cool-down.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+from core.logger import setup_logger
+from core.metrics import REGISTRY
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+BREAKER_OPEN = REGISTRY.gauge('questvault_circuit_open', 'Whether a domain circuit breaker is open (1) or not (0)')
+BREAKER_TRANSITIONS = REGISTRY.counter('questvault_circuit_transitions_total', 'Circuit breaker state changes, by state')
+BREAKER_REJECTED = REGISTRY.counter('questvault_circuit_rejected_total', 'Requests refused by an open circuit breaker')
+
+class CircuitOpenError(Exception):
+    """Request refused because the domain's circuit breaker is open"""
+
+class CircuitBreaker:
+    """Failure tracking for one domain"""
+
+    def __init__(self, name, failure_threshold=5, cooldown=30.0, half_open_max=1, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.half_open_max = half_open_max
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.logger = setup_logger('circuit_breaker')
+
+    def _transition(self, state):
+        # Caller holds the lock
+        self._state = state
+        BREAKER_TRANSITIONS.inc(state=state)
+        BREAKER_OPEN.set(1 if state == OPEN else 0, domain=self.name)
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self.logger.warning("Circuit for %s opened after %d failures; retrying in %.0fs",
+                                self.name, self._failures, self.cooldown)
+        elif state == HALF_OPEN:
+            self._probes = 0
+        else:
+            self.logger.info("Circuit for %s closed", self.name)
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self._transition(HALF_OPEN)
+            return self._state
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a probe through"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (self._clock() - self._opened_at))
+
+    def allow(self):
+        """Whether a request may go out now"""
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_max:
+                self._probes += 1
+                return True
+        BREAKER_REJECTED.inc()
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._transition(OPEN)
+
+    def record_response(self, status):
+        """Record an HTTP answer; only overload and server errors count against the host"""
+        if status >= 500 or status == 429:
+            self.record_failure()
+        else:
+            self.record_success()
+
+class BreakerRegistry:
+    """One breaker per host, created on first use with shared settings"""
+
+    def __init__(self, failure_threshold=5, cooldown=30.0, half_open_max=1):
+        self._settings = dict(failure_threshold=failure_threshold, cooldown=cooldown,
+                              half_open_max=half_open_max)
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **settings):
+        """Change settings for breakers created from now on and reset existing ones"""
+        unknown = set(settings) - set(self._settings)
+        if unknown:
+            raise ValueError(f"Unknown circuit breaker settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            self._settings.update({k: v for k, v in settings.items() if v is not None})
+            self._breakers.clear()
+
+    def for_url(self, url):
+        host = urlsplit(url).netloc or url
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(host, **self._settings)
+            return breaker
+
+    def open_domains(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [breaker.name for breaker in breakers if breaker.state == OPEN]
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+# Shared by every fetch in the process
+BREAKERS = BreakerRegistry()
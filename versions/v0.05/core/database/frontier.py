@@ -0,0 +1,249 @@
+"""Persistent crawl frontier shared by crawler processes"""
+import sqlite3
+import time
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..error_handler import ErrorHandler
+from ..logger import setup_logger
+from ..metrics import REGISTRY
+
+FRONTIER_CLAIMED = REGISTRY.counter('questvault_frontier_claimed_total', 'Frontier URLs handed to workers')
+FRONTIER_RETRIES = REGISTRY.counter('questvault_frontier_retries_total', 'Frontier URLs scheduled for retry, by outcome')
+
+FrontierEntry = namedtuple('FrontierEntry', 'id domain name url attempts')
+
+PENDING = 'pending'
+CLAIMED = 'claimed'
+DONE = 'done'
+FAILED = 'failed'
+
+class CrawlFrontier:
+    """Queue of item URLs to scrape, stored in SQLite so crawls can resume
+
+    Every URL moves pending -> claimed -> done. A failed fetch goes back to
+    pending with an exponential backoff until ``max_attempts`` is reached,
+    after which it is parked as failed; permanent errors are parked at once. Claims are a single UPDATE inside an
+    IMMEDIATE transaction, so any number of worker processes can share one
+    frontier file without scraping the same URL twice. Claims held longer
+    than ``claim_timeout`` (a worker that died) are handed out again.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 5, base_delay: float = 30.0,
+                 max_delay: float = 3600.0, claim_timeout: float = 600.0):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.claim_timeout = claim_timeout
+        self.error_handler = ErrorHandler()
+        self.logger = setup_logger('frontier')
+
+    def _connect(self):
+        # Autocommit mode so transactions are only the ones begun explicitly
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA busy_timeout = 30000')
+        return conn
+
+    def initialize(self):
+        """Create the frontier table"""
+        conn = self._connect()
+        try:
+            # WAL lets workers read counts while another one holds the write lock
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS frontier (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT UNIQUE NOT NULL,
+                    domain TEXT NOT NULL,
+                    name TEXT,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    claimed_by TEXT,
+                    claimed_at REAL
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_frontier_ready
+                ON frontier (domain, state, next_attempt_at)
+            ''')
+        except Exception as e:
+            self.error_handler.handle_error('database', e)
+            raise
+        finally:
+            conn.close()
+
+    def add(self, domain: str, links: Iterable[Tuple[str, str]]) -> int:
+        """Queue (name, url) links for a domain; already known URLs are ignored"""
+        rows = [(url, domain, name) for name, url in links]
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO frontier (url, domain, name) VALUES (?, ?, ?)', rows)
+            added = conn.total_changes - before
+            conn.execute('COMMIT')
+            return added
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            self.error_handler.handle_error('database', e)
+            raise
+        finally:
+            conn.close()
+
+    def has_domain(self, domain: str) -> bool:
+        """Whether the domain has been seeded already"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT 1 FROM frontier WHERE domain = ? LIMIT 1', (domain,)).fetchone()
+            return row is not None
+        finally:
+            conn.close()
+
+    def claim(self, worker_id: str, limit: int = 1, domain: Optional[str] = None) -> List[FrontierEntry]:
+        """Atomically take up to ``limit`` ready URLs for a worker"""
+        query = '''
+            UPDATE frontier
+            SET state = 'claimed', claimed_by = ?, claimed_at = ?, attempts = attempts + 1
+            WHERE id IN (
+                SELECT id FROM frontier
+                WHERE state = 'pending' AND next_attempt_at <= ? {domain_filter}
+                ORDER BY next_attempt_at, id
+                LIMIT ?
+            )
+            RETURNING id, domain, name, url, attempts
+        '''.format(domain_filter='AND domain = ?' if domain else '')
+        now = time.time()
+        params = [worker_id, now, now] + ([domain] if domain else []) + [limit]
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            entries = [FrontierEntry(*row) for row in conn.execute(query, params).fetchall()]
+            conn.execute('COMMIT')
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            self.error_handler.handle_error('database', e)
+            self.logger.error("Claim failed for %s: %s", worker_id, e)
+            return []
+        finally:
+            conn.close()
+        FRONTIER_CLAIMED.inc(len(entries))
+        return sorted(entries)
+
+    def complete(self, *entry_ids: int):
+        """Mark claimed URLs as scraped"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                "UPDATE frontier SET state = 'done', last_error = NULL, claimed_by = NULL WHERE id = ?",
+                [(entry_id,) for entry_id in entry_ids]
+            )
+            conn.execute('COMMIT')
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            self.error_handler.handle_error('database', e)
+            self.logger.error("Frontier update failed: %s", e)
+        finally:
+            conn.close()
+
+    def release(self, entry: FrontierEntry):
+        """Hand a claim back untried, without using up an attempt"""
+        self._execute(
+            "UPDATE frontier SET state = 'pending', attempts = MAX(0, attempts - 1), claimed_by = NULL WHERE id = ?",
+            (entry.id,)
+        )
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds to wait before retry number ``attempts``"""
+        return min(self.max_delay, self.base_delay * 2 ** max(0, attempts - 1))
+
+    def fail(self, entry: FrontierEntry, error: str, permanent: bool = False):
+        """Record a failed attempt and schedule a retry, or give up
+
+        ``permanent`` failures (a page that is gone) are given up on at once.
+        """
+        if permanent or entry.attempts >= self.max_attempts:
+            FRONTIER_RETRIES.inc(outcome='gave_up')
+            self.logger.warning("Giving up on %s after %d attempts: %s", entry.url, entry.attempts, error)
+            self._execute(
+                "UPDATE frontier SET state = 'failed', last_error = ?, claimed_by = NULL WHERE id = ?",
+                (error, entry.id)
+            )
+            return
+        FRONTIER_RETRIES.inc(outcome='retry')
+        self._execute(
+            '''UPDATE frontier SET state = 'pending', last_error = ?, claimed_by = NULL,
+               next_attempt_at = ? WHERE id = ?''',
+            (error, time.time() + self.backoff(entry.attempts), entry.id)
+        )
+
+    def release_stale(self) -> int:
+        """Return claims from workers that stopped responding to the queue"""
+        cutoff = time.time() - self.claim_timeout
+        released = self._execute(
+            "UPDATE frontier SET state = 'pending', claimed_by = NULL WHERE state = 'claimed' AND claimed_at < ?",
+            (cutoff,)
+        )
+        if released:
+            self.logger.info("Released %d stale frontier claims", released)
+        return released
+
+    def next_due(self, domain: Optional[str] = None) -> Optional[float]:
+        """Seconds until the next pending URL is ready, None if nothing is pending"""
+        query = "SELECT MIN(next_attempt_at) FROM frontier WHERE state = 'pending'"
+        params = ()
+        if domain:
+            query += ' AND domain = ?'
+            params = (domain,)
+        conn = self._connect()
+        try:
+            (due,) = conn.execute(query, params).fetchone()
+        finally:
+            conn.close()
+        return None if due is None else max(0.0, due - time.time())
+
+    def counts(self, domain: Optional[str] = None) -> Dict[str, int]:
+        """Number of URLs in each state"""
+        query = 'SELECT state, COUNT(*) FROM frontier'
+        params = ()
+        if domain:
+            query += ' WHERE domain = ?'
+            params = (domain,)
+        conn = self._connect()
+        try:
+            counts = dict.fromkeys((PENDING, CLAIMED, DONE, FAILED), 0)
+            counts.update(conn.execute(query + ' GROUP BY state', params).fetchall())
+            return counts
+        finally:
+            conn.close()
+
+    def retry_failed(self, domain: Optional[str] = None) -> int:
+        """Give permanently failed URLs a fresh set of attempts"""
+        query = "UPDATE frontier SET state = 'pending', attempts = 0, next_attempt_at = 0 WHERE state = 'failed'"
+        params = ()
+        if domain:
+            query += ' AND domain = ?'
+            params = (domain,)
+        return self._execute(query, params)
+
+    def clear(self, domain: Optional[str] = None) -> int:
+        """Forget a domain's URLs (or everything) so the next crawl starts over"""
+        if domain:
+            return self._execute('DELETE FROM frontier WHERE domain = ?', (domain,))
+        return self._execute('DELETE FROM frontier')
+
+    def _execute(self, query: str, params: tuple = ()) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute(query, params).rowcount
+        except Exception as e:
+            self.error_handler.handle_error('database', e)
+            self.logger.error("Frontier update failed: %s", e)
+            return 0
+        finally:
+            conn.close()
@@ -1,8 +1,35 @@
 """Unified database management"""
+import hashlib
+import json
 import sqlite3
 from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
 from ..error_handler import ErrorHandler
-from ..logger import setup_logger
+from ..logger import setup_logger, span
+from ..metrics import REGISTRY
+from ..profiling import profiled
+from ..urls import canonical_url
+
+DB_ROWS_WRITTEN = REGISTRY.counter('questvault_db_rows_written_total', 'Rows inserted, by table')
+DB_ROWS_READ = REGISTRY.counter('questvault_db_rows_read_total', 'Rows returned by queries, by table')
+DB_QUERY_SECONDS = REGISTRY.histogram('questvault_db_query_seconds', 'DatabaseManager call latency, by operation')
+DB_ROWS_UNCHANGED = REGISTRY.counter('questvault_db_rows_unchanged_total',
+                                     'Upserted rows skipped because their content hash matched, by table')
+
+# Bumped by migrations that must only run once per database
+SCHEMA_VERSION = 1
+
+# Items are identified by (domain, canonical url); rows without a url never
+# conflict and are plain inserts. Unchanged content is not rewritten.
+UPSERT_ITEM = '''
+    INSERT INTO items (name, description, category, icon_url, attributes, url, domain, content_hash, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT (domain, url) DO UPDATE SET
+        name = excluded.name, description = excluded.description, category = excluded.category,
+        icon_url = excluded.icon_url, attributes = excluded.attributes,
+        content_hash = excluded.content_hash, updated_at = excluded.updated_at
+    WHERE items.content_hash IS NOT excluded.content_hash
+'''
 
 class DatabaseManager:
     """Centralized database operations"""
@@ -23,7 +50,9 @@ class DatabaseManager:
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         url TEXT UNIQUE NOT NULL,
                         target_db TEXT NOT NULL DEFAULT 'main',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_crawled_at TEXT,
+                        profile TEXT
                     )
                 ''')
                 
@@ -34,19 +63,76 @@ class DatabaseManager:
                         name TEXT NOT NULL,
                         description TEXT,
                         category TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        icon_url TEXT,
+                        attributes TEXT,
+                        url TEXT,
+                        domain TEXT,
+                        content_hash TEXT,
+                        updated_at TIMESTAMP
                     )
                 ''')
+                self._add_missing_columns(conn, 'domains', {
+                    'last_crawled_at': 'TEXT',
+                    'profile': 'TEXT',
+                })
+                self._add_missing_columns(conn, 'items', {
+                    'icon_url': 'TEXT',
+                    'attributes': 'TEXT',
+                    'url': 'TEXT',
+                    'domain': 'TEXT',
+                    'content_hash': 'TEXT',
+                    'updated_at': 'TIMESTAMP',
+                })
+                # Upserts and reparses look items up by name
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_name ON items (name)')
+                cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_items_identity ON items (domain, url)')
+                
+                version = conn.execute('PRAGMA user_version').fetchone()[0]
+                if version < 1:
+                    removed = self._dedupe_legacy_items(conn)
+                    if removed:
+                        self.logger.info("Removed %d duplicate items", removed)
+                if version < SCHEMA_VERSION:
+                    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
                 conn.commit()
         except Exception as e:
             self.error_handler.handle_error('database', e)
             raise
     
+    def _add_missing_columns(self, conn, table: str, columns: dict) -> None:
+        """Bring tables created by older versions up to date"""
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        for name, definition in columns.items():
+            if name not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+                self.logger.info("Added column %s.%s", table, name)
+    
+    def _dedupe_legacy_items(self, conn) -> int:
+        """One-off migration: delete repeated items in bulk, keeping the newest copy of each"""
+        before = conn.total_changes
+        # Rows from before items had a url: one per domain, name and category
+        conn.execute('''
+            DELETE FROM items WHERE url IS NULL AND id NOT IN (
+                SELECT MAX(id) FROM items WHERE url IS NULL GROUP BY domain, name, category
+            )
+        ''')
+        # ...and none where the same domain has since stored the item with its
+        # url; rows with no domain can't be matched for sure and are kept
+        conn.execute('''
+            DELETE FROM items WHERE url IS NULL AND domain IS NOT NULL AND EXISTS (
+                SELECT 1 FROM items AS stored
+                WHERE stored.url IS NOT NULL AND stored.domain = items.domain AND stored.name = items.name
+            )
+        ''')
+        return conn.total_changes - before
+    
     def add_domain(self, url: str) -> bool:
         """Add domain to database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with DB_QUERY_SECONDS.time(op='add_domain'), sqlite3.connect(self.db_path) as conn:
                 conn.execute('INSERT INTO domains (url) VALUES (?)', (url,))
+            DB_ROWS_WRITTEN.inc(table='domains')
             return True
         except sqlite3.IntegrityError:
             return False
@@ -57,27 +143,133 @@ class DatabaseManager:
     def get_domains(self) -> List[str]:
         """Get all domains"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with DB_QUERY_SECONDS.time(op='get_domains'), sqlite3.connect(self.db_path) as conn:
                 cursor = conn.execute('SELECT url FROM domains ORDER BY created_at DESC')
-                return [row[0] for row in cursor.fetchall()]
+                domains = [row[0] for row in cursor.fetchall()]
+            DB_ROWS_READ.inc(len(domains), table='domains')
+            return domains
         except Exception as e:
             self.error_handler.handle_error('database', e)
             return []
     
-    def add_item(self, name: str, description: str, category: str) -> bool:
-        """Add item to database"""
-        query = '''
-            INSERT INTO items (name, description, category)
-            VALUES (?, ?, ?)
-        '''
+    def get_last_crawled(self, url: str) -> Optional[str]:
+        """Timestamp of the domain's last complete crawl, if any"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute('SELECT last_crawled_at FROM domains WHERE url = ?', (url,)).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            self.error_handler.handle_error('database', e)
+            return None
+    
+    def set_last_crawled(self, url: str, timestamp: str) -> None:
+        """Record when the domain was last crawled completely"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('UPDATE domains SET last_crawled_at = ? WHERE url = ?', (timestamp, url))
+        except Exception as e:
+            self.error_handler.handle_error('database', e)
+    
+    def get_profile(self, url: str) -> Optional[str]:
+        """The domain's extraction profile spec, None for the default"""
         try:
             with sqlite3.connect(self.db_path) as conn:
-                conn.execute(query, (name, description, category))
+                row = conn.execute('SELECT profile FROM domains WHERE url = ?', (url,)).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            self.error_handler.handle_error('database', e)
+            return None
+    
+    def set_profile(self, url: str, profile: Optional[str]) -> bool:
+        """Store a built-in profile name or JSON selectors for the domain"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute('UPDATE domains SET profile = ? WHERE url = ?', (profile, url))
+            return cursor.rowcount > 0
+        except Exception as e:
+            self.error_handler.handle_error('database', e)
+            return False
+    
+    @staticmethod
+    def _item_row(item: tuple) -> tuple:
+        """
+        (name, description, category[, icon_url, attributes, url]) as the
+        UPSERT_ITEM parameters: attributes as JSON, the canonical url, its
+        domain and a hash of the content
+        """
+        name, description, category, icon_url, attributes, url = (tuple(item) + (None,) * 3)[:6]
+        attributes = json.dumps(attributes, sort_keys=True) if attributes else None
+        url = canonical_url(url)
+        domain = urlsplit(url).netloc if url else None
+        content = json.dumps([name, description, category, icon_url, attributes])
+        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        return name, description, category, icon_url, attributes, url, domain, content_hash
+    
+    def add_item(self, name: str, description: str, category: str, icon_url: Optional[str] = None,
+                 attributes: Optional[dict] = None, url: Optional[str] = None) -> bool:
+        """Add item to database, or update the stored copy of the same url"""
+        try:
+            with span('db-write', count=1), DB_QUERY_SECONDS.time(op='add_item'), \
+                    sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute(UPSERT_ITEM, self._item_row(
+                    (name, description, category, icon_url, attributes, url)))
+            if cursor.rowcount:
+                DB_ROWS_WRITTEN.inc(table='items')
+            else:
+                DB_ROWS_UNCHANGED.inc(table='items')
             return True
         except Exception as e:
             self.error_handler.handle_error('database', e)
             return False
     
+    def add_items(self, items: List[tuple]) -> int:
+        """Upsert many (name, description, category[, icon_url, attributes, url]) rows in one transaction"""
+        try:
+            with DB_QUERY_SECONDS.time(op='add_items'), sqlite3.connect(self.db_path) as conn:
+                before = conn.total_changes
+                conn.executemany(UPSERT_ITEM, map(self._item_row, items))
+                written = conn.total_changes - before
+            DB_ROWS_WRITTEN.inc(written, table='items')
+            DB_ROWS_UNCHANGED.inc(len(items) - written, table='items')
+            return len(items)
+        except Exception as e:
+            self.error_handler.handle_error('database', e)
+            return 0
+    
+    def upsert_items(self, items: List[tuple]) -> int:
+        """
+        Update items by url, inserting those not stored yet, in one transaction
+        
+        A row with a url that is not stored yet takes over the newest
+        url-less item of the same name from its domain (or from no known
+        domain), so reparsing gives items saved before they had a url their
+        identity instead of adding copies. Rows without a url are inserted.
+        """
+        try:
+            with DB_QUERY_SECONDS.time(op='upsert_items'), sqlite3.connect(self.db_path) as conn:
+                written = 0
+                for row in map(self._item_row, items):
+                    name, url, domain = row[0], row[5], row[6]
+                    if url is not None and not conn.execute(
+                            'SELECT 1 FROM items WHERE domain = ? AND url = ?', (domain, url)).fetchone():
+                        cursor = conn.execute(
+                            '''UPDATE items SET description = ?, category = ?, icon_url = ?, attributes = ?,
+                                   url = ?, domain = ?, content_hash = ?, updated_at = CURRENT_TIMESTAMP
+                               WHERE id = (SELECT MAX(id) FROM items WHERE url IS NULL AND name = ?
+                                           AND (domain IS NULL OR domain = ?))''',
+                            row[1:] + (name, domain)
+                        )
+                        if cursor.rowcount:
+                            written += 1
+                            continue
+                    written += conn.execute(UPSERT_ITEM, row).rowcount
+            DB_ROWS_WRITTEN.inc(written, table='items')
+            return len(items)
+        except Exception as e:
+            self.error_handler.handle_error('database', e)
+            return 0
+    
+    @profiled('search_items')
     def search_items(self, keyword: str = None, category: str = None) -> List[Tuple]:
         """Search items with optional filters"""
         query = 'SELECT name, description, category FROM items WHERE 1=1'
@@ -92,9 +284,11 @@ class DatabaseManager:
             params.append(category)
             
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with DB_QUERY_SECONDS.time(op='search_items'), sqlite3.connect(self.db_path) as conn:
                 cursor = conn.execute(query, tuple(params))
-                return cursor.fetchall()
+                rows = cursor.fetchall()
+            DB_ROWS_READ.inc(len(rows), table='items')
+            return rows
         except Exception as e:
             self.error_handler.handle_error('database', e)
             return []
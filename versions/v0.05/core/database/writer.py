@@ -0,0 +1,206 @@
+"""Group-commit writer thread for item inserts"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+from ..error_handler import ErrorHandler
+from ..logger import setup_logger
+from ..metrics import REGISTRY
+from .manager import DB_QUERY_SECONDS, DB_ROWS_UNCHANGED, DB_ROWS_WRITTEN, UPSERT_ITEM, DatabaseManager
+
+DB_GROUP_ROWS = REGISTRY.histogram('questvault_db_group_commit_rows', 'Rows per group commit',
+                                   buckets=(1, 10, 50, 100, 250, 500, 1000, 5000))
+DB_WRITER_QUEUE = REGISTRY.gauge('questvault_db_writer_queue', 'Rows waiting for the writer thread')
+
+_FLUSH = object()
+_CLOSE = object()
+
+class WriterClosed(Exception):
+    """Item submitted to a writer that has been closed"""
+
+class GroupCommitWriter:
+    """Single thread that owns the write connection and commits in groups
+
+    Any number of producer threads submit() rows into a bounded queue and
+    get back a Future. The writer inserts everything waiting, up to
+    ``batch_size`` rows or ``max_delay`` seconds after the first one, in one
+    transaction, and only then resolves the Futures, so a result of True
+    means the row is committed (and, with ``synchronous='FULL'``, on disk).
+    If a group fails, its rows are retried one by one so only the rows at
+    fault raise.
+    Producers block once ``queue_size`` rows are waiting, which keeps a fast
+    crawl from outrunning the disk.
+
+    Usage:
+        with GroupCommitWriter('questvault.db') as writer:
+            future = writer.submit('Item', 'Description', 'Category')
+        future.result()  # True once committed
+    """
+
+    def __init__(self, db_path: str, batch_size: int = 500, max_delay: float = 0.05,
+                 queue_size: int = 10000, synchronous: str = 'FULL'):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.synchronous = synchronous
+        self.error_handler = ErrorHandler()
+        self.logger = setup_logger('database')
+        self.rows_written = 0
+        self.commits = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._putting = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, name: str, description: str, category: str, icon_url: Optional[str] = None,
+               attributes: Optional[dict] = None, url: Optional[str] = None,
+               timeout: Optional[float] = None) -> Future:
+        """
+        Queue an item upsert
+
+        Args:
+            url (str): Item page; rows with the same canonical url update
+                one item, and are skipped when their content is unchanged
+            timeout (float): Seconds to wait for room in the queue before
+                raising queue.Full; None waits as long as it takes
+
+        Returns:
+            Future: Resolves to True once the row is committed, or raises
+                the database error that rolled its group back
+        """
+        future = Future()
+        row = DatabaseManager._item_row((name, description, category, icon_url, attributes, url))
+        self._put(row, future, timeout)
+        DB_WRITER_QUEUE.set(self._queue.qsize())
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until every row submitted so far is committed"""
+        future = Future()
+        try:
+            self._put(_FLUSH, future)
+        except WriterClosed:
+            return
+        future.result(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Commit what is queued, then stop the writer thread"""
+        future = Future()
+        try:
+            self._put(_CLOSE, future)
+        except WriterClosed:
+            return
+        future.result(timeout)
+        self._thread.join(timeout)
+
+    def _put(self, row, future, timeout=None):
+        # Only the closed check is locked: a put blocked on a full queue
+        # must not hold up other producers' timeouts. The writer thread
+        # keeps draining after the close marker until no put is in flight.
+        with self._lock:
+            if self._closed:
+                raise WriterClosed("Writer is closed")
+            self._closed = row is _CLOSE
+            self._putting += 1
+        try:
+            self._queue.put((row, future), timeout=timeout)
+        finally:
+            with self._lock:
+                self._putting -= 1
+
+    def _drained(self):
+        with self._lock:
+            return not self._putting and self._queue.empty()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        # WAL lets the app keep searching while the crawl writes
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute(f'PRAGMA synchronous = {self.synchronous}')
+        return conn
+
+    def _next_group(self):
+        """Block for the first entry, then gather more until the group is full or due"""
+        group = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(group) < self.batch_size and group[-1][0] not in (_FLUSH, _CLOSE):
+            remaining = deadline - time.monotonic()
+            try:
+                group.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        DB_WRITER_QUEUE.set(self._queue.qsize())
+        return group
+
+    def _commit(self, conn, rows):
+        with DB_QUERY_SECONDS.time(op='group_commit'):
+            conn.execute('BEGIN')
+            try:
+                before = conn.total_changes
+                conn.executemany(UPSERT_ITEM, rows)
+                written = conn.total_changes - before
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        self.rows_written += written
+        self.commits += 1
+        DB_ROWS_WRITTEN.inc(written, table='items')
+        DB_ROWS_UNCHANGED.inc(len(rows) - written, table='items')
+        DB_GROUP_ROWS.observe(len(rows))
+
+    def _write(self, conn, inserts):
+        """Commit a group, falling back to one row per commit if it fails"""
+        try:
+            self._commit(conn, [row for row, _ in inserts])
+        except Exception as e:
+            if len(inserts) > 1:
+                self.logger.warning("Group commit of %d rows failed, retrying rows one by one: %s",
+                                    len(inserts), e)
+                for insert in inserts:
+                    self._write(conn, [insert])
+                return
+            self._fail(inserts, e)
+        else:
+            for _, future in inserts:
+                future.set_result(True)
+
+    def _fail(self, inserts, error):
+        self.error_handler.handle_error('database', error)
+        self.logger.error("Commit of %d rows failed: %s", len(inserts), error)
+        for _, future in inserts:
+            future.set_exception(error)
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self.error_handler.handle_error('database', e)
+            conn = None
+            error = e
+        closing = None
+        while closing is None or not self._drained():
+            group = self._next_group()
+            inserts = [(row, future) for row, future in group if row is not _FLUSH and row is not _CLOSE]
+            if inserts and conn is None:
+                self._fail(inserts, error)
+            elif inserts:
+                self._write(conn, inserts)
+            for row, future in group:
+                if row is _CLOSE:
+                    closing = future
+                elif row is _FLUSH:
+                    future.set_result(None)
+        if conn is not None:
+            conn.close()
+        closing.set_result(None)
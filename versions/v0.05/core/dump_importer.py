@@ -0,0 +1,245 @@
+"""Streaming importer for MediaWiki XML dumps
+
+Large wikis publish full XML dumps (pages-articles.xml.bz2), which are far
+cheaper to read than crawling. Pages are streamed with iterparse and each
+element is cleared once read, so memory stays flat no matter the dump
+size. Rows go to the database in large batches, one transaction each.
+
+    python -m core.dump_importer enwiki-pages-articles.xml.bz2 --db questvault.db
+"""
+import bz2
+import gzip
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import quote, urljoin
+from core.logger import setup_logger, span
+from core.metrics import REGISTRY
+
+PAGES_READ = REGISTRY.counter('questvault_dump_pages_total', 'Dump pages read, by result')
+
+CATEGORY_LINK = re.compile(r"\[\[\s*Category\s*:\s*([^\]|]+)", re.IGNORECASE)
+TEMPLATE = re.compile(r"\{\{[^{}]*\}\}")
+TABLE = re.compile(r"\{\|.*?\|\}", re.DOTALL)
+COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+REF = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.DOTALL | re.IGNORECASE)
+TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+FILE_LINK = re.compile(r"\[\[\s*(?:File|Image|Category)\s*:[^\[\]]*(?:\[\[[^\]]*\]\][^\[\]]*)*\]\]", re.IGNORECASE)
+WIKI_LINK = re.compile(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]")
+EXTERNAL_LINK = re.compile(r"\[https?://[^\s\]]+\s*([^\]]*)\]")
+EMPHASIS = re.compile(r"'{2,}")
+
+class ImportIncomplete(Exception):
+    """Some batches failed to write; the rest of the dump was imported"""
+
+    def __init__(self, written, dropped):
+        super().__init__(f"{dropped} items could not be written ({written} imported)")
+        self.written = written
+        self.dropped = dropped
+
+def open_dump(path):
+    """Open a plain, .bz2 or .gz dump for binary reading"""
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def iter_pages(source, namespaces=(0,), siteinfo=None):
+    """
+    Stream pages from a dump
+
+    Args:
+        source: Path or binary file object
+        namespaces (tuple): Namespace numbers to keep; 0 is articles
+        siteinfo (dict): Filled with the dump's <siteinfo> fields (sitename,
+            base, ...) before the first page is yielded
+
+    Yields:
+        tuple: (title, wikitext) of each non-redirect page
+    """
+    context = ET.iterparse(source, events=('start', 'end'))
+    _, root = next(context)
+    # Tags carry the export schema namespace, which changes between versions
+    ns = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+    page_tag, title_tag, ns_tag = f'{ns}page', f'{ns}title', f'{ns}ns'
+    redirect_tag, revision_tag, text_tag = f'{ns}redirect', f'{ns}revision', f'{ns}text'
+    siteinfo_tag = f'{ns}siteinfo'
+
+    for event, elem in context:
+        if event == 'end' and elem.tag == siteinfo_tag:
+            if siteinfo is not None:
+                siteinfo.update((_local(child.tag), child.text.strip()) for child in elem if child.text)
+            elem.clear()
+            continue
+        if event != 'end' or elem.tag != page_tag:
+            continue
+        namespace = elem.findtext(ns_tag)
+        if namespace is not None and int(namespace) not in namespaces:
+            PAGES_READ.inc(result='skipped')
+        elif elem.find(redirect_tag) is not None:
+            PAGES_READ.inc(result='redirect')
+        else:
+            revision = elem.findall(revision_tag)
+            text = revision[-1].findtext(text_tag) if revision else None
+            PAGES_READ.inc(result='ok')
+            yield elem.findtext(title_tag), text or ''
+        # Drop everything parsed so far so memory stays flat
+        elem.clear()
+        root.clear()
+
+def _strip_templates(text):
+    # Innermost first, so nested templates come out in a few passes
+    while '{{' in text:
+        text, count = TEMPLATE.subn('', text)
+        if not count:
+            break
+    return text
+
+def parse_wikitext(text):
+    """
+    Description and category from wikitext
+
+    Mirrors scrape_item_details: the description is the first paragraph of
+    body text and the category is the first category link.
+
+    Returns:
+        tuple: (description, category); either may be None
+    """
+    match = CATEGORY_LINK.search(text)
+    category = match.group(1).strip() if match else None
+
+    text = _strip_templates(COMMENT.sub('', text))
+    text = REF.sub('', TABLE.sub('', text))
+    text = FILE_LINK.sub('', text)
+
+    description = None
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line or line[0] in '=*#:;|!{}_' or line.startswith('__'):
+            continue
+        line = WIKI_LINK.sub(r'\1', line)
+        line = EXTERNAL_LINK.sub(r'\1', line)
+        line = TAG.sub('', EMPHASIS.sub('', line)).strip()
+        if line:
+            description = line
+            break
+    return description, category
+
+def page_url(title, base_url=None, main_page=None):
+    """
+    Page URL of a title, the same one the crawler finds
+
+    Args:
+        title (str): Page title
+        base_url (str): Wiki root; pages live under /wiki/
+        main_page (str): The dump's <siteinfo><base>, the main page URL,
+            used when base_url is not given
+
+    Returns:
+        str: URL, or None when neither is known
+    """
+    path = quote(title.replace(' ', '_'))
+    if base_url:
+        return urljoin(base_url, '/wiki/' + path)
+    if main_page:
+        # Articles share the main page's path, whatever the wiki calls it
+        return urljoin(main_page, path)
+    return None
+
+def import_dump(path, db, batch_size=10000, namespaces=(0,), callback=None, base_url=None):
+    """
+    Import every article of a dump into the items table
+
+    Args:
+        path (str): Dump file, optionally .bz2 or .gz compressed
+        db (DatabaseManager): Database receiving the items
+        batch_size (int): Rows per insert transaction
+        namespaces (tuple): Namespace numbers to import
+        callback (function): Optional callback for progress updates
+        base_url (str): Wiki the dump came from; gives each item its page
+            URL, so a re-import or later crawl updates the same rows.
+            Defaults to the main page URL in the dump's <siteinfo>
+
+    Returns:
+        int: Number of items written
+
+    Raises:
+        ImportIncomplete: A batch failed to write; the import carries on
+            and reports the shortfall at the end
+    """
+    logger = setup_logger('dump_importer')
+    written = dropped = 0
+    batch = []
+    siteinfo = {}
+
+    def flush():
+        nonlocal written, dropped
+        with span('db-write', count=len(batch)):
+            saved = db.add_items(batch)
+        written += saved
+        if saved < len(batch):
+            dropped += len(batch) - saved
+            logger.error("Failed to write %d items ending at %s", len(batch) - saved, batch[-1][0])
+        batch.clear()
+        if callback:
+            callback(f"Imported {written} items")
+
+    with open_dump(path) as source:
+        for title, text in iter_pages(source, namespaces, siteinfo):
+            description, category = parse_wikitext(text)
+            url = page_url(title, base_url, siteinfo.get('base'))
+            batch.append((title, description, category, None, None, url))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    logger.info("Imported %d items from %s", written, path)
+    if dropped:
+        raise ImportIncomplete(written, dropped)
+    return written
+
+def main(argv=None):
+    """Import a dump: python -m core.dump_importer DUMP [--db PATH]"""
+    import argparse
+    from core.database.manager import DatabaseManager
+    from core.logger import configure_logging
+
+    parser = argparse.ArgumentParser(prog='questvault-import-dump',
+                                     description='Import a MediaWiki XML dump into a QuestVault database.')
+    parser.add_argument('dump', help='pages-articles XML dump, optionally .bz2 or .gz')
+    parser.add_argument('--db', default='questvault.db', help='Database file (default: %(default)s)')
+    parser.add_argument('--batch-size', type=int, default=10000,
+                        help='Rows per insert transaction (default: %(default)s)')
+    parser.add_argument('--namespace', type=int, action='append', dest='namespaces',
+                        help='Namespace to import (repeatable; default: 0)')
+    parser.add_argument('--base-url', help='Wiki the dump came from, e.g. https://wiki.example.com/ '
+                                           '(default: taken from the dump\'s siteinfo)')
+    args = parser.parse_args(argv)
+
+    configure_logging(use_queue=True)
+    db = DatabaseManager(args.db)
+    db.initialize_database()
+
+    started = time.perf_counter()
+    try:
+        count = import_dump(args.dump, db, args.batch_size, tuple(args.namespaces or (0,)),
+                            base_url=args.base_url)
+    except (OSError, ET.ParseError, EOFError) as e:
+        print(f"Failed to import {args.dump}: {e}", file=sys.stderr)
+        return 1
+    except ImportIncomplete as e:
+        print(f"Import of {args.dump} incomplete: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed * 60 if elapsed else 0.0
+    print(f"Imported {count} items in {elapsed:.1f}s ({rate:,.0f}/min)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Deferred imports for heavy optional modules"""
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """Placeholder that imports the real module on first attribute access
+
+    importlib's LazyLoader is not thread-safe before Python 3.12: a second
+    thread touching the module mid-load sees it empty. The real import here
+    runs under the import lock, so concurrent first uses just wait for it.
+    """
+
+    def __getattr__(self, attr):
+        module = self.__dict__.get('_lazy_module')
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_module'] = module
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """
+    Import a module on first attribute access instead of now
+
+    Args:
+        name (str): Absolute module name, e.g. 'PIL.Image'
+
+    Returns:
+        module: Module object that finishes loading when first used
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    if importlib.util.find_spec(name) is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
+
+
+def lazy_attributes(package, exports):
+    """
+    Build a module-level __getattr__ that imports exports on demand
+
+    Args:
+        package (str): Name of the package defining __getattr__
+        exports (dict): Attribute name -> relative submodule name
+    """
+    def __getattr__(attr):
+        submodule = exports.get(attr)
+        if submodule is None:
+            raise AttributeError(f"module '{package}' has no attribute '{attr}'")
+        value = getattr(importlib.import_module(submodule, package), attr)
+        setattr(sys.modules[package], attr, value)
+        return value
+    return __getattr__
@@ -1,11 +1,25 @@
+import atexit
+import json
 import logging
+import math
 import os
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from colorama import init, Fore, Style
-from logging.handlers import RotatingFileHandler
+from time import perf_counter
+from colorama import Fore, Style
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-# Initialize colorama for cross-platform color support
-init()
+_colorama_ready = False
+
+def _init_colorama():
+    """Initialize colorama once, when the first console handler is made"""
+    global _colorama_ready
+    if not _colorama_ready:
+        from colorama import init
+        init()
+        _colorama_ready = True
 
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors"""
@@ -18,73 +32,271 @@ class ColoredFormatter(logging.Formatter):
         'ERROR': Style.DIM + Fore.WHITE,  # Readable Grey
         'CRITICAL': Fore.RED + Style.BRIGHT  # Keep Critical as bright red for emphasis
     }
+    
+    is_file_handler = False
+    
+    # Coloured level names are built once rather than per record
+    COLORED_LEVELS = {
+        level: f'{color}{level}{Style.RESET_ALL}' for level, color in COLORS.items()
+    }
 
     def format(self, record):
         # Add colors only if it's not a file handler
-        if hasattr(self, 'is_file_handler') and self.is_file_handler:
+        if self.is_file_handler:
             return super().format(record)
         
-        # Color the level name and message
-        color = self.COLORS.get(record.levelname, '')
-        record.levelname = f'{color}{record.levelname}{Style.RESET_ALL}'
-        record.msg = f'{color}{record.msg}{Style.RESET_ALL}'
-        
-        return super().format(record)
+        # Color the level name and message, restoring the record afterwards
+        # so other handlers sharing it still see plain text
+        levelname, msg = record.levelname, record.msg
+        color = self.COLORS.get(levelname, '')
+        record.levelname = self.COLORED_LEVELS.get(levelname, levelname)
+        record.msg = f'{color}{msg}{Style.RESET_ALL}'
+        try:
+            return super().format(record)
+        finally:
+            record.levelname, record.msg = levelname, msg
 
-def setup_logger(name='questvault', max_bytes=1024*1024, backup_count=5):
-    """Configure and return a logger that writes to both console and file"""
-    
-    # Create logs directory if it doesn't exist
-    log_dir = os.path.join('dev', 'dev-debug')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Create a unique log file name with timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    log_file = os.path.join(log_dir, f'questvault_{timestamp}.log')
-    
-    # Create logger
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object, merging in span fields"""
     
-    # Clear any existing handlers
-    logger.handlers = []
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        span_fields = getattr(record, 'span', None)
+        if span_fields:
+            entry.update(span_fields)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves all formatting to the listener thread
     
-    # Create handlers
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=max_bytes,
-        backupCount=backup_count
-    )
-    console_handler = logging.StreamHandler()
+    The stock QueueHandler merges args into the message on the calling
+    thread so records can be pickled; records here never leave the
+    process, so they are queued untouched.
+    """
     
-    # Set levels
-    file_handler.setLevel(logging.DEBUG)
-    console_handler.setLevel(logging.INFO)
+    def prepare(self, record):
+        return record
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that creates its directory and file on first emit"""
     
-    # Create formatters
-    file_formatter = ColoredFormatter(
-        '%(asctime)s | %(levelname)-8s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_formatter.is_file_handler = True
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
     
-    console_formatter = ColoredFormatter(
-        '%(asctime)s | %(levelname)-8s | %(message)s',
-        datefmt='%H:%M:%S'
-    )
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+ROOT_LOGGER = 'questvault'
+_config_lock = threading.Lock()
+_listener = None
+_configured = False
+
+def configure_logging(log_dir=None, max_bytes=1024*1024, backup_count=5,
+                      use_queue=False, file_level=logging.INFO,
+                      console_level=logging.INFO, jsonl_path=None):
+    """Configure the process-wide questvault handlers
     
-    file_handler.setFormatter(file_formatter)
-    console_handler.setFormatter(console_formatter)
+    Runs once per process; later calls return the already configured
+    root logger. One timestamped log file is shared by every subsystem
+    and is only created when the first record is written. With
+    use_queue=True, callers only enqueue records; formatting and
+    file/console I/O run on a background QueueListener thread.
     
-    # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    jsonl_path (or the QUESTVAULT_LOG_JSONL environment variable) adds a
+    structured sink writing one JSON object per record, which is where
+    span() timings are meant to be collected from. Spans and other DEBUG
+    records are off unless that sink is set or file_level is lowered.
+    """
+    global _listener, _configured
+    root = logging.getLogger(ROOT_LOGGER)
+    with _config_lock:
+        if _configured:
+            return root
+        _init_colorama()
+        
+        # Create a unique log file name with timestamp
+        log_dir = log_dir or os.path.join('dev', 'dev-debug')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        log_file = os.path.join(log_dir, f'questvault_{timestamp}.log')
+        
+        # Create handlers
+        file_handler = LazyRotatingFileHandler(
+            os.path.abspath(log_file),
+            maxBytes=max_bytes,
+            backupCount=backup_count
+        )
+        console_handler = logging.StreamHandler()
+        
+        # Set levels; the logger itself drops anything no handler wants
+        # so disabled calls return before building a record
+        file_handler.setLevel(file_level)
+        console_handler.setLevel(console_level)
+        root.setLevel(min(file_level, console_level))
+        root.propagate = False
+        
+        # Create formatters
+        file_formatter = ColoredFormatter(
+            '%(asctime)s | %(levelname)-8s | %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        file_formatter.is_file_handler = True
+        
+        console_formatter = ColoredFormatter(
+            '%(asctime)s | %(levelname)-8s | %(message)s',
+            datefmt='%H:%M:%S'
+        )
+        
+        file_handler.setFormatter(file_formatter)
+        console_handler.setFormatter(console_formatter)
+        handlers = [file_handler, console_handler]
+        
+        # Optional structured sink for aggregation
+        jsonl_path = jsonl_path or os.environ.get('QUESTVAULT_LOG_JSONL')
+        if jsonl_path:
+            jsonl_handler = LazyRotatingFileHandler(
+                os.path.abspath(jsonl_path),
+                maxBytes=max_bytes,
+                backupCount=backup_count
+            )
+            jsonl_handler.setLevel(logging.DEBUG)
+            jsonl_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(jsonl_handler)
+            root.setLevel(logging.DEBUG)
+        
+        if use_queue:
+            # Hand records to a listener thread that owns the real handlers
+            log_queue = queue.SimpleQueue()
+            _listener = QueueListener(
+                log_queue, *handlers,
+                respect_handler_level=True
+            )
+            _listener.start()
+            root.addHandler(DeferredQueueHandler(log_queue))
+        else:
+            for handler in handlers:
+                root.addHandler(handler)
+        
+        _configured = True
+        return root
+
+def setup_logger(name='questvault', max_bytes=1024*1024, backup_count=5, use_queue=False):
+    """Return a subsystem logger that shares the process-wide handlers
     
-    return logger
+    The first call configures logging (see configure_logging); later
+    calls only look up a child logger such as 'questvault.database'.
+    """
+    root = configure_logging(max_bytes=max_bytes, backup_count=backup_count, use_queue=use_queue)
+    if name == ROOT_LOGGER or name.startswith(ROOT_LOGGER + '.'):
+        return logging.getLogger(name)
+    return root.getChild(name)
+
+@atexit.register
+def shutdown_logging():
+    """Drain queued records, close handlers and allow reconfiguring"""
+    global _listener, _configured
+    with _config_lock:
+        if _listener:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+        root = logging.getLogger(ROOT_LOGGER)
+        for handler in root.handlers:
+            handler.close()
+        root.handlers = []
+        root.setLevel(logging.NOTSET)
+        _configured = False
 
 def log_scraping_status(logger, item_name, success=True):
     """Standardized scraping status logger"""
     if success:
-        logger.debug(f"Scraping status: Found item: {item_name}")
+        logger.debug("Scraping status: Found item: %s", item_name)
     else:
-        logger.debug(f"Scraping status: Failed to fetch details for {item_name}")
\ No newline at end of file
+        logger.debug("Scraping status: Failed to fetch details for %s", item_name)
+
+@contextmanager
+def span(stage, logger=None, **fields):
+    """Time a block and log it as a structured span record
+    
+    Yields a dict of extra fields that the block may update, e.g. with a
+    ``count`` of items processed. Spans are logged at DEBUG to the
+    'questvault.spans' logger and cost only a level check when disabled.
+    
+    Example:
+        with span('parse', url=url) as s:
+            items = parse(page)
+            s['count'] = len(items)
+    """
+    logger = logger or logging.getLogger(ROOT_LOGGER + '.spans')
+    if not logger.isEnabledFor(logging.DEBUG):
+        yield fields
+        return
+    
+    status = 'ok'
+    start = perf_counter()
+    try:
+        yield fields
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        duration_ms = (perf_counter() - start) * 1000
+        logger.debug(
+            "span %s took %.1f ms", stage, duration_ms,
+            extra={'span': {'stage': stage, 'duration_ms': round(duration_ms, 3),
+                            'status': status, **fields}}
+        )
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def summarize_spans(jsonl_path):
+    """
+    Aggregate span records from a JSONL log
+    
+    Returns:
+        dict: stage -> {'spans', 'count', 'total_ms', 'p50_ms', 'p95_ms'}
+    """
+    durations, counts = {}, {}
+    with open(jsonl_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            stage = entry.get('stage')
+            if stage is None or 'duration_ms' not in entry:
+                continue
+            durations.setdefault(stage, []).append(entry['duration_ms'])
+            counts[stage] = counts.get(stage, 0) + entry.get('count', 1)
+    
+    summary = {}
+    for stage, values in durations.items():
+        values.sort()
+        summary[stage] = {
+            'spans': len(values),
+            'count': counts[stage],
+            'total_ms': round(sum(values), 3),
+            'p50_ms': _percentile(values, 50),
+            'p95_ms': _percentile(values, 95)
+        }
+    return summary
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m core.logger <spans.jsonl>")
+    print(f"{'stage':<12}{'spans':>8}{'count':>8}{'total ms':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for stage, row in sorted(summarize_spans(sys.argv[1]).items()):
+        print(f"{stage:<12}{row['spans']:>8}{row['count']:>8}{row['total_ms']:>12.1f}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}")
@@ -0,0 +1,230 @@
+"""MediaWiki api.php backend for the scraper
+
+Rendering and parsing one HTML page per item is the slow path. MediaWiki
+sites expose api.php, which returns the intro extract and categories of
+up to 50 titles in one query, and can list the pages edited since a given
+time so repeat crawls only refetch what changed.
+"""
+import json
+import time
+from urllib.parse import unquote, urljoin, urlsplit
+from core import network
+from core.circuit_breaker import BREAKERS
+from core.lazy import lazy_import
+from core.logger import setup_logger, span
+from core.metrics import REGISTRY
+
+requests = lazy_import('requests')
+
+API_REQUESTS = REGISTRY.counter('questvault_mediawiki_requests_total', 'api.php requests, by action and result')
+BYTES_DOWNLOADED = REGISTRY.counter('questvault_bytes_downloaded_total', 'Response body bytes downloaded')
+ITEMS_SCRAPED = REGISTRY.counter('questvault_items_scraped_total', 'Item detail pages scraped, by result')
+
+API_PATHS = ('api.php', '/api.php', '/w/api.php')
+MAX_TITLES = 50
+
+_detected = {}
+
+def detect_api(base_url, timeout=None):
+    """
+    Find the api.php endpoint of a MediaWiki site
+
+    Probes go through the scraper's fetch, so they share its (connect,
+    read) timeouts and the domain's circuit breaker.
+
+    Args:
+        base_url (str): Any page URL on the wiki
+        timeout (tuple): (connect, read) seconds for each probe; defaults
+            to network.TIMEOUT
+
+    Returns:
+        str: api.php URL, or None if the site doesn't look like MediaWiki
+    """
+    from core.scraper import CIRCUIT_OPEN, fetch_page_content
+
+    parts = urlsplit(base_url)
+    site = f"{parts.scheme}://{parts.netloc}"
+    if site in _detected:
+        return _detected[site]
+
+    api_url = None
+    for candidate in dict.fromkeys(urljoin(base_url, path) for path in API_PATHS):
+        body = fetch_page_content(candidate, timeout=timeout, params={
+            'action': 'query', 'meta': 'siteinfo', 'format': 'json'
+        })
+        if body is CIRCUIT_OPEN:
+            # The site is down, not known to lack an API; ask again next time
+            return None
+        try:
+            if body and 'general' in json.loads(body).get('query', {}):
+                api_url = candidate
+                break
+        except (ValueError, AttributeError):
+            continue
+    _detected[site] = api_url
+    return api_url
+
+def title_from_url(url):
+    """Page title for a /wiki/Title URL, MediaWiki style"""
+    path = urlsplit(url).path
+    _, _, title = path.partition('/wiki/')
+    return unquote(title or path.rsplit('/', 1)[-1]).replace('_', ' ')
+
+def first_paragraph(extract):
+    """First non-empty line of a plain text extract"""
+    for line in (extract or '').splitlines():
+        if line.strip():
+            return line.strip()
+    return None
+
+class MediaWikiClient:
+    """Batched api.php queries over one keep-alive session"""
+
+    def __init__(self, api_url, batch_size=MAX_TITLES, timeout=None, session=None):
+        self.api_url = api_url
+        self.batch_size = min(batch_size, MAX_TITLES)
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.logger = setup_logger('mediawiki')
+
+    def _get(self, params, action):
+        params = dict(params, action='query', format='json', formatversion=2)
+        # Same per-domain breaker and timeouts as page fetches
+        breaker = BREAKERS.for_url(self.api_url)
+        if not breaker.allow():
+            API_REQUESTS.inc(action=action, result='circuit_open')
+            self.logger.warning("Skipping MediaWiki %s query: %s is paused", action, breaker.name)
+            return None
+        try:
+            with span('api', action=action) as s:
+                response = self.session.get(self.api_url, params=params,
+                                            timeout=self.timeout or network.TIMEOUT)
+                breaker.record_response(response.status_code)
+                response.raise_for_status()
+                s['bytes'] = len(response.content)
+                data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if isinstance(e, requests.exceptions.RequestException) and getattr(e, 'response', None) is None:
+                # No answer at all: connection refused, timed out or cut off
+                breaker.record_failure()
+            API_REQUESTS.inc(action=action, result='error')
+            self.logger.error("MediaWiki %s query failed: %s", action, e)
+            return None
+        API_REQUESTS.inc(action=action, result='ok')
+        BYTES_DOWNLOADED.inc(s['bytes'])
+        if 'error' in data:
+            self.logger.error("MediaWiki %s query error: %s", action, data['error'])
+            return None
+        return data
+
+    def query(self, params, action='query'):
+        """Yield each response of a query, following continuation"""
+        cont = {}
+        while True:
+            data = self._get({**params, **cont}, action)
+            if data is None:
+                return
+            yield data
+            if 'continue' not in data:
+                return
+            cont = data['continue']
+
+    def page_details(self, titles):
+        """
+        Fetch intro extract and categories for up to batch_size titles
+
+        Args:
+            titles (list): Page titles
+
+        Returns:
+            dict: Requested title -> {"description", "category"}; missing
+                pages are left out
+        """
+        params = {
+            'prop': 'extracts|categories',
+            'titles': '|'.join(titles),
+            'exintro': 1,
+            'explaintext': 1,
+            'exlimit': 'max',
+            'clshow': '!hidden',
+            'cllimit': 'max',
+            'redirects': 1,
+        }
+        # Map normalized/redirected titles back to what was asked for
+        aliases = {title: title for title in titles}
+        pages = {}
+        for data in self.query(params, 'details'):
+            result = data.get('query', {})
+            for mapping in result.get('normalized', []) + result.get('redirects', []):
+                aliases[mapping['to']] = aliases.get(mapping['from'], mapping['from'])
+            for page in result.get('pages', []):
+                if page.get('missing') or page.get('invalid'):
+                    continue
+                entry = pages.setdefault(aliases.get(page['title'], page['title']),
+                                         {'description': None, 'category': None})
+                if page.get('extract'):
+                    entry['description'] = first_paragraph(page['extract'])
+                if page.get('categories') and entry['category'] is None:
+                    entry['category'] = page['categories'][0]['title'].split(':', 1)[-1]
+        return pages
+
+    def scrape(self, links, callback=None, concurrency=4):
+        """
+        Scrape (name, url) links in batched API queries
+
+        Returns:
+            list: (name, description, category) tuples in link order
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        titles = {}
+        for name, url in links:
+            titles.setdefault(title_from_url(url), name)
+        ordered = list(titles)
+        batches = [ordered[i:i + self.batch_size] for i in range(0, len(ordered), self.batch_size)]
+
+        items = []
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for batch, pages in zip(batches, pool.map(self.page_details, batches)):
+                for title in batch:
+                    details = pages.get(title)
+                    if details is None:
+                        ITEMS_SCRAPED.inc(result='failed')
+                        if callback:
+                            callback(f"Failed to fetch details for {titles[title]}")
+                        continue
+                    ITEMS_SCRAPED.inc(result='ok')
+                    items.append((titles[title], details['description'], details['category']))
+                if callback:
+                    callback(f"Scraped details for {len(batch)} items")
+        return items
+
+    def changed_titles(self, since, namespace=0):
+        """
+        Titles edited or created since a timestamp
+
+        Args:
+            since (str): ISO 8601 UTC timestamp, e.g. '2024-01-31T00:00:00Z'
+            namespace (int): Namespace to watch; 0 is articles
+
+        Returns:
+            list: Titles in most recently changed first order, without repeats
+        """
+        params = {
+            'list': 'recentchanges',
+            'rcend': since,
+            'rcdir': 'older',
+            'rcnamespace': namespace,
+            'rctype': 'edit|new',
+            'rcprop': 'title|timestamp',
+            'rclimit': 'max',
+        }
+        titles = {}
+        for data in self.query(params, 'recentchanges'):
+            for change in data.get('query', {}).get('recentchanges', []):
+                titles.setdefault(change['title'], None)
+        return list(titles)
+
+def utc_timestamp(seconds=None):
+    """MediaWiki-style ISO 8601 timestamp"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(seconds))
@@ -0,0 +1,218 @@
+"""In-process metrics: counters, gauges and histograms"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter, time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join(f'{name}="{value}"' for name, value in pairs)
+    return '{' + body + '}'
+
+
+class Metric:
+    """Base class holding one value per label set"""
+    kind = 'untyped'
+
+    def __init__(self, name, help=''):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def total(self):
+        """Sum across all label sets"""
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self):
+        """Yield (suffix, label key, extra labels, value) for exposition"""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield '', key, (), value
+
+    def snapshot(self):
+        with self._lock:
+            return {_format_labels(key) or '': value for key, value in self._values.items()}
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name, help='', buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['counts'][i] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block in seconds"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, **labels)
+
+    def value(self, **labels):
+        entry = self._values.get(_label_key(labels))
+        return entry['count'] if entry else 0
+
+    def total(self):
+        with self._lock:
+            return sum(entry['count'] for entry in self._values.values())
+
+    def samples(self):
+        with self._lock:
+            items = [(key, dict(entry, counts=list(entry['counts']))) for key, entry in self._values.items()]
+        for key, entry in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry['counts']):
+                cumulative += count
+                yield '_bucket', key, (('le', bound),), cumulative
+            yield '_bucket', key, (('le', '+Inf'),), entry['count']
+            yield '_sum', key, (), entry['sum']
+            yield '_count', key, (), entry['count']
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                _format_labels(key) or '': {'count': entry['count'], 'sum': entry['sum']}
+                for key, entry in self._values.items()
+            }
+
+
+class MetricsRegistry:
+    """Named collection of metrics with Prometheus and JSON export"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.started_at = time()
+
+    def _get_or_create(self, cls, name, help, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name, help=''):
+        return self._get_or_create(Counter, name, help)
+
+    def gauge(self, name, help=''):
+        return self._get_or_create(Gauge, name, help)
+
+    def histogram(self, name, help='', buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def uptime(self):
+        return time() - self.started_at
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if metric.help:
+                lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for suffix, key, extra, value in metric.samples():
+                lines.append(f'{name}{suffix}{_format_labels(key, extra)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        """Plain dict of every metric, suitable for JSON"""
+        return {
+            'timestamp': time(),
+            'uptime_seconds': self.uptime(),
+            'metrics': {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+        }
+
+    def _write(self, path, text):
+        # Write to a temp file first so scrapers never see a partial file
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def write_prometheus(self, path):
+        self._write(path, self.to_prometheus())
+
+    def write_json(self, path):
+        self._write(path, json.dumps(self.snapshot(), indent=2))
+
+    def export(self, directory):
+        """Write metrics.prom and metrics.json into a directory"""
+        os.makedirs(directory, exist_ok=True)
+        self.write_prometheus(os.path.join(directory, 'metrics.prom'))
+        self.write_json(os.path.join(directory, 'metrics.json'))
+
+    def reset(self):
+        """Zero every metric; registered metric objects stay valid"""
+        with self._lock:
+            for metric in self._metrics.values():
+                with metric._lock:
+                    metric._values.clear()
+            self.started_at = time()
+
+
+# Process-wide registry used by the instrumented modules
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,24 @@
+"""Network settings shared by every crawler request
+
+``python -m core.scraper`` runs the scraper as ``__main__`` while
+mediawiki, sitemap and assets import ``core.scraper`` as a second module,
+so settings changed on the command line live here where both see them.
+"""
+from core.circuit_breaker import BREAKERS
+
+# (connect, read) seconds: fail fast on dead hosts, allow slow page renders
+TIMEOUT = (3.05, 10)
+
+def configure(connect_timeout=None, read_timeout=None, breaker_threshold=None, breaker_cooldown=None):
+    """
+    Change the request timeouts and circuit breaker settings for the process
+
+    Args:
+        connect_timeout (float): Seconds to wait for a connection
+        read_timeout (float): Seconds to wait for response data
+        breaker_threshold (int): Consecutive failures before a domain is paused
+        breaker_cooldown (float): Seconds a paused domain waits before a probe
+    """
+    global TIMEOUT
+    TIMEOUT = (connect_timeout or TIMEOUT[0], read_timeout or TIMEOUT[1])
+    BREAKERS.configure(failure_threshold=breaker_threshold, cooldown=breaker_cooldown)
@@ -0,0 +1,185 @@
+"""Opt-in profiling of scrape and search runs
+
+Profiling is off unless QUESTVAULT_PROFILE is set (or enable() is
+called, e.g. from a --profile CLI flag):
+
+    QUESTVAULT_PROFILE=cprofile  deterministic cProfile of the calling thread,
+                                 written as a .prof file for pstats/snakeviz
+    QUESTVAULT_PROFILE=sample    statistical sampler across all threads,
+                                 written as collapsed stacks (.folded) for
+                                 flamegraph.pl or speedscope
+
+Output goes to QUESTVAULT_PROFILE_DIR (default dev/profiles) and the top
+hot functions of each run are logged. cProfile can't see worker threads,
+so runs marked ``@profiled(threaded=True)`` are sampled in either mode.
+When disabled, a @profiled call costs one global check.
+"""
+import cProfile
+import functools
+import io
+import itertools
+import logging
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from core.logger import setup_logger
+
+MODES = ('cprofile', 'sample')
+
+
+def _mode_from_env():
+    value = os.environ.get('QUESTVAULT_PROFILE') or None
+    if value is not None and value not in MODES:
+        # Logging isn't configured at import time; this reaches stderr
+        logging.getLogger('questvault.profiling').warning(
+            "Ignoring QUESTVAULT_PROFILE=%r; expected one of: %s", value, ', '.join(MODES))
+        return None
+    return value
+
+
+_mode = _mode_from_env()
+_output_dir = os.environ.get('QUESTVAULT_PROFILE_DIR') or os.path.join('dev', 'profiles')
+_active = threading.local()
+_run_ids = itertools.count()
+
+
+def enable(mode='cprofile', output_dir=None):
+    """Turn profiling on for subsequent @profiled calls"""
+    global _mode, _output_dir
+    if mode not in MODES:
+        raise ValueError(f"Unknown profiling mode: {mode}")
+    _mode = mode
+    if output_dir:
+        _output_dir = output_dir
+
+
+def disable():
+    global _mode
+    _mode = None
+
+
+def is_enabled():
+    return _mode is not None
+
+
+class SamplingProfiler:
+    """Periodically records the stacks of every other thread"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='questvault-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def write_folded(self, path):
+        """Write collapsed stacks, one 'frame;frame;frame count' per line"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def hot_functions(self, limit=10):
+        """Leaf frames with the most samples"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+def _output_path(name, extension):
+    os.makedirs(_output_dir, exist_ok=True)
+    # Microseconds and a per-process counter keep concurrent runs apart
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    return os.path.join(_output_dir, f"{name}_{timestamp}_{os.getpid()}_{next(_run_ids)}.{extension}")
+
+
+@contextmanager
+def profile_run(name, top=10, threaded=False):
+    """
+    Profile a block with the active mode and record where time went
+
+    Args:
+        threaded (bool): The block does its work in other threads, so it
+            is sampled even in cprofile mode
+    """
+    if _mode is None or getattr(_active, 'running', False):
+        # Profilers can't nest; the outermost run already covers this block
+        yield
+        return
+
+    logger = setup_logger('profiling')
+    mode = _mode
+    if mode == 'cprofile' and threaded:
+        logger.warning("%s runs in worker threads, which cProfile can't see; sampling it instead", name)
+        mode = 'sample'
+    _active.running = True
+    try:
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                path = _output_path(name, 'prof')
+                profiler.dump_stats(path)
+                report = io.StringIO()
+                pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(top)
+                logger.info("Profile of %s written to %s\n%s", name, path, report.getvalue())
+        else:
+            sampler = SamplingProfiler()
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                path = _output_path(name, 'folded')
+                sampler.write_folded(path)
+                hot = '\n'.join(f"{count:>8}  {frame}" for frame, count in sampler.hot_functions(top))
+                logger.info("Sampled profile of %s written to %s\n%s", name, path, hot)
+    finally:
+        _active.running = False
+
+
+def profiled(name=None, threaded=False):
+    """Decorator that profiles each call when profiling is enabled
+
+    Pass threaded=True for functions that hand their work to a thread pool.
+    """
+    def decorator(func):
+        run_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _mode is None:
+                return func(*args, **kwargs)
+            with profile_run(run_name, threaded=threaded):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,8 +1,12 @@
 """Centralized resource management"""
 import os
-from PIL import Image
 from core.error_handler import ErrorHandler
-from core.logger import setup_logger
+from core.lazy import lazy_import
+from core.texture_cache import texture_cache
+from core.logger import setup_logger, span
+
+# Only needed when a background has to be resized
+Image = lazy_import('PIL.Image')
 
 class ResourceManager:
     """Manages application resources"""
@@ -41,9 +45,13 @@ class ResourceManager:
             ErrorHandler.handle_error('resource', e)
             return os.path.join(self.resource_dir, 'icons', 'background.png')
     
+    def get_background_texture(self, size_key='mobile'):
+        """Get background as a shared texture, decoding it only once"""
+        return texture_cache.get(self.get_background(size_key))
+    
     def _resize_image(self, source_path, target_path, size):
         """Resize image maintaining aspect ratio"""
-        with Image.open(source_path) as img:
+        with span('resize', source=source_path), Image.open(source_path) as img:
             # Calculate dimensions
             ratio = min(size[0]/img.width, size[1]/img.height)
             new_size = (int(img.width * ratio), int(img.height * ratio))
@@ -1,86 +1,757 @@
-import requests
-from bs4 import BeautifulSoup
+import codecs
+import os
 import re
+import sys
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urldefrag, urljoin
+from core import archive as page_archive
+from core.bloom import BloomFilter
+from core.circuit_breaker import BREAKERS, OPEN
+from core.database.writer import GroupCommitWriter
+from core.extraction import ExtractionProfile, load_profile
+from core.lazy import lazy_import
+from core.logger import setup_logger, span
+from core.metrics import REGISTRY
+from core import network
+from core.profiling import profiled
 
-def fetch_page_content(url):
+# Network and parsing stacks are heavy; load them on first scrape
+requests = lazy_import('requests')
+bs4 = lazy_import('bs4')
+
+PAGES_FETCHED = REGISTRY.counter('questvault_pages_fetched_total', 'Pages fetched, by result')
+BYTES_DOWNLOADED = REGISTRY.counter('questvault_bytes_downloaded_total', 'Response body bytes downloaded')
+FETCH_SECONDS = REGISTRY.histogram('questvault_fetch_seconds', 'Page fetch latency')
+ITEMS_SCRAPED = REGISTRY.counter('questvault_items_scraped_total', 'Item detail pages scraped, by result')
+LISTING_PAGES = REGISTRY.counter('questvault_listing_pages_total', 'Listing and category pages crawled')
+
+CATEGORY_HREF = re.compile(r"(?:https?://[^/]+)?/wiki/Category:")
+NEXT_PAGE_TEXT = re.compile(r"\(?next (?:page|\d+)\b", re.IGNORECASE)
+
+FetchedPage = namedtuple('FetchedPage', 'body encoding')
+
+class _FetchOutcome:
+    """Falsy fetch result that callers can tell apart from a failed fetch (None)"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return self.name
+
+# Refused by an open circuit breaker: not attempted
+CIRCUIT_OPEN = _FetchOutcome('CIRCUIT_OPEN')
+# A 4xx other than 408/429: retrying will get the same answer
+PAGE_GONE = _FetchOutcome('PAGE_GONE')
+
+# Client errors worth trying again later
+RETRYABLE_4XX = (408, 429)
+
+class PageTooLarge(Exception):
+    """Response body is over the fetch size limit"""
+
+# Pages beyond this are almost certainly not item pages; stop downloading
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+CHUNK_BYTES = 64 * 1024
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+BOMS = ((codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+
+def _known_encoding(name):
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.text
+        return codecs.lookup(name).name
+    except (LookupError, TypeError):
+        return None
+
+def detect_encoding(content_type, body):
+    """
+    Pick a body's encoding from its header, BOM or <meta> tag
+    
+    Unlike requests' response.text this never runs statistical detection
+    over the whole body; pages that declare nothing are read as UTF-8.
+    """
+    _, _, params = (content_type or '').partition(';')
+    for param in params.split(';'):
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'charset':
+            encoding = _known_encoding(value.strip('"\' '))
+            if encoding:
+                return encoding
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding
+    match = META_CHARSET.search(body[:2048])
+    if match:
+        encoding = _known_encoding(match.group(1).decode('ascii'))
+        if encoding:
+            return encoding
+    return 'utf-8'
+
+def fetch_page_content(url, raw=False, max_bytes=MAX_PAGE_BYTES, timeout=None, params=None, headers=None):
+    """
+    Download a page, streaming it and giving up past max_bytes
+    
+    Requests to a domain whose circuit breaker is open fail immediately
+    instead of waiting out the timeout. Every crawler request (item pages,
+    icons, robots.txt, api.php detection) goes through here.
+    
+    Args:
+        url (str): Page to fetch
+        raw (bool): Return FetchedPage(body bytes, encoding) for the parser
+            to decode instead of a decoded string
+        max_bytes (int): Abort downloads larger than this
+        timeout (tuple): (connect, read) seconds; defaults to network.TIMEOUT
+        params (dict): Query string parameters
+        headers (dict): Extra request headers
+        
+    Returns:
+        str|FetchedPage: Page content, None on failure, CIRCUIT_OPEN (also
+            falsy) when the domain's breaker refused the request, or
+            PAGE_GONE (falsy) for a client error that retrying won't fix
+    """
+    breaker = BREAKERS.for_url(url)
+    if not breaker.allow():
+        PAGES_FETCHED.inc(result='circuit_open')
+        return CIRCUIT_OPEN
+    try:
+        with span('fetch', url=url) as s, FETCH_SECONDS.time():
+            with requests.get(url, timeout=timeout or network.TIMEOUT, stream=True,
+                              params=params, headers=headers) as response:
+                response.raise_for_status()
+                declared = response.headers.get('Content-Length')
+                if declared and declared.isdigit() and int(declared) > max_bytes:
+                    raise PageTooLarge(f"{url} is {declared} bytes, limit is {max_bytes}")
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(CHUNK_BYTES):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise PageTooLarge(f"{url} exceeded {max_bytes} bytes")
+                    chunks.append(chunk)
+                body = b''.join(chunks)
+                encoding = detect_encoding(response.headers.get('Content-Type'), body)
+            s['bytes'] = size
+        breaker.record_success()
+        PAGES_FETCHED.inc(result='ok')
+        BYTES_DOWNLOADED.inc(size)
+        if raw:
+            return FetchedPage(body, encoding)
+        return body.decode(encoding, errors='replace')
+    except PageTooLarge as e:
+        breaker.record_success()
+        PAGES_FETCHED.inc(result='too_large')
+        setup_logger('scraper').warning("Skipping URL %s: %s", url, e)
+        return None
+    except requests.exceptions.HTTPError as e:
+        status = e.response.status_code if e.response is not None else 0
+        # A 404 means the host is up
+        breaker.record_response(status)
+        PAGES_FETCHED.inc(result='error')
+        setup_logger('scraper').warning("Error fetching URL %s: %s", url, e)
+        if 400 <= status < 500 and status not in RETRYABLE_4XX:
+            return PAGE_GONE
+        return None
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching URL {url}: {e}")
+        breaker.record_failure()
+        PAGES_FETCHED.inc(result='timeout' if isinstance(e, requests.exceptions.Timeout) else 'error')
+        setup_logger('scraper').warning("Error fetching URL %s: %s", url, e)
         return None
 
-def parse_item_list(base_url, callback=None):
-    content = fetch_page_content(base_url)
-    if not content:
-        if callback:
-            callback("Failed to fetch page content")
-        return []
+def _soup(content):
+    """Parse fetched content, handing raw bytes and their encoding straight to the parser"""
+    if isinstance(content, FetchedPage):
+        return bs4.BeautifulSoup(content.body, "html.parser", from_encoding=content.encoding)
+    return bs4.BeautifulSoup(content, "html.parser")
+
+def _extract_links(page_url, content):
+    """Split a listing page into item links, category links and its next page"""
+    soup = _soup(content)
+    items, categories, next_page = [], [], None
 
-    soup = BeautifulSoup(content, "html.parser")
+    for link in soup.find_all("a", href=True):
+        href = link["href"]
+        text = link.text.strip()
+        if next_page is None and NEXT_PAGE_TEXT.match(text):
+            next_page = urldefrag(urljoin(page_url, href))[0]
+        elif CATEGORY_HREF.match(href):
+            categories.append(urldefrag(urljoin(page_url, href))[0])
+        elif href.startswith("/wiki/") and "#" not in href:
+            items.append((text, urljoin(page_url, href)))
+    return items, categories, next_page
+
+def parse_item_list(base_url, callback=None, max_depth=0, max_pages=None, concurrency=4, visited=None):
+    """
+    Collect item links from a listing page, its pagination and subcategories
+    
+    Listing pages are crawled breadth first: every "next page" link is
+    followed at the same depth, category links one level deeper up to
+    max_depth. Each level's pages are fetched concurrently.
+    
+    Args:
+        base_url (str): Listing page to start from
+        callback (function): Optional callback for progress updates
+        max_depth (int): Category levels to descend; 0 stays on base_url's listing
+        max_pages (int): Stop after fetching this many listing pages
+        concurrency (int): Listing pages fetched in parallel
+        visited: Set-like with add()/in for seen URLs; defaults to a BloomFilter
+            so memory stays bounded on very large wikis
+        
+    Returns:
+        list: (name, url) tuples in discovery order
+    """
+    visited = BloomFilter() if visited is None else visited
+    visited.add(base_url)
+    level = [(base_url, 0)]
     items = []
+    pages = 0
 
-    links = soup.select('a[href^="/wiki/"]')
-    for link in links:
-        item_name = link.text.strip()
-        item_url = link.get("href")
-        if not item_url or "Category:" in item_url or re.search(r"#.*", item_url):
-            continue
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        while level:
+            if max_pages is not None:
+                level = level[:max(0, max_pages - pages)]
+            pages += len(level)
+            contents = pool.map(lambda entry: fetch_page_content(entry[0], raw=True), level)
 
-        items.append((item_name, base_url + item_url.lstrip('/')))
-        if callback:
-            callback(f"Found item: {item_name}")
+            next_level = []
+            for (page_url, depth), content in zip(level, contents):
+                if not content:
+                    if callback:
+                        callback(f"Failed to fetch page content for {page_url}")
+                    continue
+
+                with span('parse', url=page_url) as s:
+                    found, categories, next_page = _extract_links(page_url, content)
+                    s['count'] = len(found)
+
+                for item_name, item_url in found:
+                    if item_url in visited:
+                        continue
+                    visited.add(item_url)
+                    items.append((item_name, item_url))
+                    if callback:
+                        callback(f"Found item: {item_name}")
 
+                if next_page and next_page not in visited:
+                    visited.add(next_page)
+                    next_level.append((next_page, depth))
+                if depth < max_depth:
+                    for category_url in categories:
+                        if category_url not in visited:
+                            visited.add(category_url)
+                            next_level.append((category_url, depth + 1))
+            level = next_level
+
+    LISTING_PAGES.inc(pages)
     return items
 
-def scrape_item_details(item_name, item_url, callback=None):
-    content = fetch_page_content(item_url)
+def extract_item_details(content, profile=None, url=None):
+    """
+    Pull the description, category, icon and infobox out of an item page
+    
+    Args:
+        content (str|FetchedPage): Page HTML
+        profile: ExtractionProfile or stored profile spec; defaults to the
+            built-in profile (first paragraph, first category link)
+        url (str): Page URL, to resolve relative icon links
+        
+    Returns:
+        dict: description, category and icon_url (each may be None) and
+            attributes
+    """
+    if not isinstance(profile, ExtractionProfile):
+        profile = load_profile(profile)
+    return profile.extract(_soup(content), url)
+
+def scrape_item_details(item_name, item_url, callback=None, profile=None):
+    content = fetch_page_content(item_url, raw=True)
+    if content is CIRCUIT_OPEN:
+        # Not attempted: the caller can leave it queued rather than count a failure
+        ITEMS_SCRAPED.inc(result='circuit_open')
+        return CIRCUIT_OPEN
     if not content:
+        ITEMS_SCRAPED.inc(result='failed')
         if callback:
             callback(f"Failed to fetch details for {item_name}")
-        return None
+        return PAGE_GONE if content is PAGE_GONE else None
 
-    soup = BeautifulSoup(content, "html.parser")
-    description = None
-    category = None
+    archive = page_archive.active()
+    if archive is not None and isinstance(content, FetchedPage):
+        archive.put(item_url, content.body, content.encoding, item_name)
 
-    description_element = soup.find("p")
-    if description_element:
-        description = description_element.text.strip()
-
-    category_element = soup.find("a", href=re.compile("/wiki/Category:"))
-    if category_element:
-        category = category_element.text.strip()
+    with span('parse', url=item_url):
+        details = extract_item_details(content, profile, item_url)
 
+    ITEMS_SCRAPED.inc(result='ok')
     if callback:
         callback(f"Scraped details for {item_name}")
 
-    return {
-        "name": item_name,
-        "description": description,
-        "category": category,
-    }
+    return {"name": item_name, "url": item_url, **details}
+
+def domain_profile(db, domain, callback=None):
+    """A domain's stored extraction profile, or the default if it is unusable"""
+    spec = db.get_profile(domain)
+    try:
+        return load_profile(spec)
+    except ValueError as e:
+        setup_logger('scraper').warning("Bad extraction profile for %s: %s", domain, e)
+        if callback:
+            callback(f"Bad extraction profile for {domain}, using the default")
+        return load_profile()
+
+BACKENDS = ('html', 'api', 'auto')
+DISCOVERY = ('links', 'sitemap')
+
+def discover_links(url, callback=None, concurrency=4, max_depth=0, max_pages=None,
+                   discovery='links', changed_since=None):
+    """
+    Find item links on a site by walking listings or reading its sitemaps
+    
+    Returns:
+        tuple: ((name, url) list, RobotsRules or None)
+    """
+    if discovery not in DISCOVERY:
+        raise ValueError(f"Unknown discovery method: {discovery}")
+    if discovery == 'sitemap':
+        from core.sitemap import RobotsRules, discover_items
+        robots = RobotsRules.fetch(url)
+        links = discover_items(url, changed_since, concurrency, callback, robots)
+        if links or changed_since:
+            return links, robots
+        if callback:
+            callback(f"No sitemap entries for {url}, walking listing pages")
+    return parse_item_list(url, callback, max_depth, max_pages, concurrency), None
+
 
-def scrape_items(url, callback=None):
+def scrape_items(url, callback=None, concurrency=4, max_depth=0, max_pages=None,
+                 backend='html', changed_since=None, discovery='links'):
     """
     Scrape items from the given URL
     
+    Same arguments as scrape_item_records.
+    
+    Returns:
+        list: List of (name, description, category) tuples
+    """
+    records = scrape_item_records(url, callback, concurrency, max_depth, max_pages, backend,
+                                  changed_since, discovery)
+    return [(record["name"], record["description"], record["category"]) for record in records]
+
+@profiled('scrape_items', threaded=True)
+def scrape_item_records(url, callback=None, concurrency=4, max_depth=0, max_pages=None,
+                        backend='html', changed_since=None, discovery='links', profile=None):
+    """
+    Scrape items from the given URL with every field the profile extracts
+    
     Args:
         url (str): URL to scrape
         callback (function): Optional callback for progress updates
+        concurrency (int): Number of pages fetched in parallel
+        max_depth (int): Category levels to descend from url
+        max_pages (int): Limit on listing pages crawled
+        backend (str): 'html' parses each item page, 'api' batches titles
+            through MediaWiki's api.php, 'auto' uses the API when found
+        changed_since (str): Only scrape pages edited since this ISO 8601
+            timestamp, found through recentchanges with the API or from
+            sitemap lastmod dates
+        discovery (str): 'links' walks listing pages, 'sitemap' reads the
+            site's sitemaps and honours robots.txt crawl-delay
+        profile: ExtractionProfile for item pages; the API backend only
+            fills description and category
         
     Returns:
-        list: List of (name, description, category) tuples
+        list: Dicts with name, description, category, icon_url and attributes
     """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown scrape backend: {backend}")
     if callback:
         callback(f"Starting scrape of {url}")
     
-    # Your scraping logic here
-    items = []  # List of (name, description, category) tuples
+    client = None
+    if backend != 'html':
+        from core import mediawiki
+        api_url = mediawiki.detect_api(url)
+        if api_url:
+            client = mediawiki.MediaWikiClient(api_url)
+        elif backend == 'api':
+            if callback:
+                callback(f"No MediaWiki API found for {url}")
+            return []
+    
+    robots = None
+    if client and changed_since:
+        item_links = [(title, urljoin(url, '/wiki/' + quote(title.replace(' ', '_'))))
+                      for title in client.changed_titles(changed_since)]
+    else:
+        item_links, robots = discover_links(url, callback, concurrency, max_depth, max_pages,
+                                            discovery, changed_since)
+    
+    if client:
+        urls = dict(item_links)
+        items = [{"name": name, "url": urls.get(name), "description": description, "category": category,
+                  "icon_url": None, "attributes": {}}
+                 for name, description, category in client.scrape(item_links, callback, concurrency)]
+    else:
+        from core.sitemap import Throttle
+        throttle = robots.throttle if robots else Throttle()
+        if throttle.delay:
+            concurrency = 1
+        
+        profile = profile if isinstance(profile, ExtractionProfile) else load_profile(profile)
+        
+        def fetch(link):
+            throttle.wait()
+            return scrape_item_details(*link, callback, profile)
+        
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            items = [details for details in pool.map(fetch, item_links) if details]
     
     if callback:
         callback(f"Completed scraping {url}")
     
     return items
+
+class CrawlStats:
+    """Totals for one headless crawl run"""
+    
+    def __init__(self):
+        self.domains = 0
+        self.failed_domains = []
+        self.items_saved = 0
+        self.items_failed = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+    
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        return self
+    
+    def summary(self):
+        rate = self.items_saved / self.elapsed if self.elapsed else 0.0
+        return (
+            f"Crawled {self.domains} domain(s) in {self.elapsed:.1f}s: "
+            f"{self.items_saved} items saved ({rate:.1f}/sec), "
+            f"{self.items_failed} failed writes, "
+            f"{int(PAGES_FETCHED.total())} pages, "
+            f"{BYTES_DOWNLOADED.total() / 1024:.0f} KB downloaded, "
+            f"{len(self.failed_domains)} domain(s) failed"
+        )
+
+@profiled('crawl_frontier', threaded=True)
+def crawl_frontier(frontier, db, domain, worker_id, concurrency=4, callback=None, stats=None,
+                   max_depth=0, max_pages=None, discovery='links', profile=None, assets=None,
+                   writer=None):
+    """
+    Scrape a domain through a persistent frontier so the crawl can resume
+    
+    The domain's listing is only parsed the first time; afterwards workers
+    keep claiming URLs until nothing ready is left. Failed fetches are
+    retried with backoff by the frontier: rows whose retry is not yet due
+    stay pending for the next run rather than keeping this one waiting.
+    Pages that answer with a client error (other than 408/429) are marked
+    failed straight away.
+    
+    Args:
+        frontier (CrawlFrontier): Shared queue of item URLs
+        db (DatabaseManager): Database receiving the items
+        domain (str): Domain to crawl
+        worker_id (str): Name recorded on this worker's claims
+        concurrency (int): Item pages fetched in parallel
+        callback (function): Optional callback for progress updates
+        stats (CrawlStats): Totals to add to
+        max_depth (int): Category levels to descend when seeding
+        max_pages (int): Limit on listing pages crawled when seeding
+        discovery (str): How to seed, see scrape_item_records; with
+            'sitemap' the queued URLs also follow robots.txt, on resume too
+        profile (ExtractionProfile): Overrides the domain's stored profile
+        assets (AssetStore): Download the scraped items' icons into this store
+        writer (GroupCommitWriter): Shared writer for the items; one is
+            opened for this domain if not given
+        
+    Returns:
+        CrawlStats: Totals for the run
+    """
+    from core.sitemap import RobotsRules, Throttle
+    
+    stats = stats or CrawlStats()
+    robots = None
+    if not frontier.has_domain(domain):
+        links, robots = discover_links(domain, callback, concurrency, max_depth, max_pages, discovery)
+        frontier.add(domain, links)
+    elif discovery == 'sitemap':
+        # Resuming: the rules still apply to what is left in the queue
+        robots = RobotsRules.fetch(domain)
+    frontier.release_stale()
+    throttle = robots.throttle if robots else Throttle()
+    if throttle.delay:
+        concurrency = 1
+    
+    saved_before = stats.items_saved
+    profile = profile or domain_profile(db, domain, callback)
+    breaker = BREAKERS.for_url(domain)
+    icon_urls = []
+    pending = []  # (entry, details, future) waiting for the writer's commit
+    
+    def settle(wait=False):
+        # Finish the frontier bookkeeping for committed rows in one update
+        nonlocal pending
+        waiting, completed = [], []
+        for entry, details, future in pending:
+            if not wait and not future.done():
+                waiting.append((entry, details, future))
+            elif future.exception() is None:
+                stats.items_saved += 1
+                completed.append(entry.id)
+                icon_urls.append(details["icon_url"])
+            else:
+                stats.items_failed += 1
+                frontier.fail(entry, "database write failed")
+        if completed:
+            frontier.complete(*completed)
+        pending = waiting
+    
+    def fetch(entry):
+        throttle.wait()
+        return scrape_item_details(entry.name, entry.url, callback, profile)
+    
+    own_writer = writer is None
+    if own_writer:
+        writer = GroupCommitWriter(db.db_path)
+    refused = False
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        while True:
+            if refused or breaker.state == OPEN:
+                # Leave the rest queued for a later run and move on to healthy domains
+                if callback:
+                    callback(f"{domain} is failing; pausing its crawl")
+                break
+            batch = frontier.claim(worker_id, limit=max(1, concurrency), domain=domain)
+            if not batch:
+                # Anything still pending is backing off; a later run picks it up
+                break
+            if robots:
+                disallowed = [entry for entry in batch if not robots.can_fetch(entry.url)]
+                for entry in disallowed:
+                    frontier.fail(entry, "disallowed by robots.txt", permanent=True)
+                batch = [entry for entry in batch if entry not in disallowed]
+            
+            for entry, details in zip(batch, pool.map(fetch, batch)):
+                if details is CIRCUIT_OPEN:
+                    # Refused without being tried: no attempt used, no backoff
+                    frontier.release(entry)
+                    refused = True
+                elif details is PAGE_GONE:
+                    frontier.fail(entry, "client error", permanent=True)
+                elif details is None:
+                    frontier.fail(entry, "fetch failed")
+                else:
+                    pending.append((entry, details, writer.submit(
+                        details["name"], details["description"], details["category"],
+                        details["icon_url"], details["attributes"], details["url"])))
+            settle()
+    settle(wait=True)
+    if own_writer:
+        writer.close()
+    
+    if assets is not None and any(icon_urls):
+        assets.fetch(icon_urls, concurrency, callback)
+    
+    counts = frontier.counts(domain)
+    if counts['failed'] or refused or breaker.state == OPEN or (stats.items_saved == saved_before and not counts['done']):
+        stats.failed_domains.append(domain)
+    if callback:
+        callback(f"Frontier for {domain}: {counts['done']} done, {counts['failed']} failed")
+    return stats
+
+def crawl(db, domains=None, concurrency=4, callback=None, frontier=None, worker_id=None,
+          max_depth=0, max_pages=None, backend='html', changed_since=None, discovery='links',
+          profile=None, assets=None):
+    """
+    Scrape every domain and write the results straight to the database
+    
+    Args:
+        db (DatabaseManager): Database holding the domains list and items
+        domains (list): Domains to crawl; defaults to db.get_domains()
+        concurrency (int): Item pages fetched in parallel per domain
+        callback (function): Optional callback for progress updates
+        frontier (CrawlFrontier): Resume from and record progress in this frontier
+        worker_id (str): Name recorded on frontier claims
+        max_depth (int): Category levels to descend from each domain
+        max_pages (int): Limit on listing pages crawled per domain
+        backend (str): Item detail backend, see scrape_item_records
+        changed_since (str): Only scrape pages edited since this timestamp;
+            'last' uses each domain's previous crawl time
+        discovery (str): 'links' or 'sitemap', see scrape_item_records
+        profile (ExtractionProfile): Used instead of each domain's stored
+            extraction profile
+        assets (AssetStore): Download item icons and render their thumbnails
+        
+    Returns:
+        CrawlStats: Totals for the run
+    """
+    if frontier is not None and backend != 'html':
+        raise ValueError(f"Frontier crawls only support the html backend, not {backend}")
+    stats = CrawlStats()
+    # Every domain's items go through one writer thread and commit in groups
+    with GroupCommitWriter(db.db_path) as writer:
+        for domain in domains if domains is not None else db.get_domains():
+            stats.domains += 1
+            if frontier is not None:
+                crawl_frontier(frontier, db, domain, worker_id, concurrency, callback, stats,
+                               max_depth, max_pages, discovery, profile, assets, writer)
+                continue
+            _crawl_domain(db, writer, domain, stats, concurrency, callback, max_depth, max_pages,
+                          backend, changed_since, discovery, profile, assets)
+    return stats.finish()
+
+def _crawl_domain(db, writer, domain, stats, concurrency, callback, max_depth, max_pages,
+                  backend, changed_since, discovery, profile, assets):
+    """Scrape one domain in a single pass and queue its items with the writer"""
+    from core.mediawiki import utc_timestamp
+    
+    since = db.get_last_crawled(domain) if changed_since == 'last' else changed_since
+    started = utc_timestamp()
+    items = scrape_item_records(domain, callback, concurrency, max_depth, max_pages, backend, since,
+                                discovery, profile or domain_profile(db, domain, callback))
+    if not items and not since:
+        stats.failed_domains.append(domain)
+    futures = [writer.submit(item["name"], item["description"], item["category"],
+                             item["icon_url"], item["attributes"], item["url"]) for item in items]
+    saved = sum(1 for future in futures if future.exception() is None)
+    stats.items_failed += len(items) - saved
+    stats.items_saved += saved
+    if assets is not None and items:
+        assets.fetch([item["icon_url"] for item in items], concurrency, callback)
+    if saved == len(items) and (items or since):
+        db.set_last_crawled(domain, started)
+
+def main(argv=None):
+    """Headless crawler: python -m core.scraper [options]
+    
+    Exit status is 0 when every domain yielded items, 1 when any domain
+    failed or a write failed, and 2 when there was nothing to crawl.
+    """
+    import argparse
+    import socket
+    from core.database.frontier import CrawlFrontier
+    from core.database.manager import DatabaseManager
+    from core.logger import configure_logging
+    from core import profiling
+    
+    parser = argparse.ArgumentParser(
+        prog='questvault-crawl',
+        description='Scrape registered wiki domains into a QuestVault database without the GUI.'
+    )
+    parser.add_argument('--db', default='questvault.db', help='Database file (default: %(default)s)')
+    parser.add_argument('--domain', action='append', dest='domains',
+                        help='Domain to crawl instead of the database list (repeatable)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Pages fetched in parallel (default: %(default)s)')
+    parser.add_argument('--connect-timeout', type=float, default=network.TIMEOUT[0],
+                        help='Seconds to wait for a connection (default: %(default)s)')
+    parser.add_argument('--read-timeout', type=float, default=network.TIMEOUT[1],
+                        help='Seconds to wait for response data (default: %(default)s)')
+    parser.add_argument('--breaker-threshold', type=int, default=5,
+                        help='Consecutive failures before a domain is paused (default: %(default)s)')
+    parser.add_argument('--breaker-cooldown', type=float, default=30.0,
+                        help='Seconds a paused domain waits before a probe request (default: %(default)s)')
+    parser.add_argument('--max-depth', type=int, default=0,
+                        help='Category levels to descend from each domain (default: %(default)s)')
+    parser.add_argument('--max-pages', type=int,
+                        help='Stop after this many listing pages per domain')
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help='Item details from HTML pages or the MediaWiki API '
+                             '(default: auto, or html with --frontier)')
+    parser.add_argument('--discovery', choices=DISCOVERY, default='links',
+                        help='Find items by walking listing pages or from sitemap.xml (default: %(default)s)')
+    parser.add_argument('--changed-since', metavar='TIMESTAMP',
+                        help="Only scrape pages edited since an ISO 8601 UTC time, or 'last' "
+                             "for each domain's previous crawl (MediaWiki API or sitemap discovery)")
+    parser.add_argument('--extraction-profile', metavar='SPEC',
+                        help='Built-in profile name or JSON selectors for item pages; '
+                             'saved for the crawled domains')
+    parser.add_argument('--assets', metavar='DIR',
+                        help='Download item icons here and render thumbnails into --cache-dir')
+    parser.add_argument('--cache-dir', default='cache',
+                        help='Thumbnail cache used by the app (default: %(default)s)')
+    parser.add_argument('--archive', metavar='DIR',
+                        help='Keep compressed copies of item pages here for offline reparsing')
+    parser.add_argument('--profile', choices=profiling.MODES, help='Profile the crawl')
+    parser.add_argument('--metrics-dir', help='Write metrics.prom/metrics.json here when done')
+    parser.add_argument('--frontier', metavar='PATH',
+                        help='Resumable crawl: queue URLs in this SQLite file (may be the --db file)')
+    parser.add_argument('--worker-id', default=f'{socket.gethostname()}-{os.getpid()}',
+                        help='Name for this worker\'s frontier claims (default: host-pid)')
+    parser.add_argument('--restart', action='store_true',
+                        help='Forget frontier progress for the crawled domains and start over')
+    parser.add_argument('--verbose', action='store_true', help='Print per-item progress')
+    args = parser.parse_args(argv)
+    if args.frontier and args.backend not in (None, 'html'):
+        parser.error('--frontier fetches item pages one at a time and only supports --backend html')
+    args.backend = args.backend or ('html' if args.frontier else 'auto')
+    if args.changed_since and (args.frontier or (args.backend == 'html' and args.discovery != 'sitemap')):
+        parser.error('--changed-since needs the MediaWiki API backend or --discovery sitemap, '
+                     'and no --frontier')
+    
+    profile = None
+    if args.extraction_profile:
+        try:
+            profile = load_profile(args.extraction_profile)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    network.configure(args.connect_timeout, args.read_timeout, args.breaker_threshold, args.breaker_cooldown)
+    
+    configure_logging(use_queue=True)
+    logger = setup_logger('crawl')
+    if args.profile:
+        profiling.enable(args.profile)
+    if args.archive:
+        page_archive.enable(args.archive)
+    
+    db = DatabaseManager(args.db)
+    db.initialize_database()
+    domains = args.domains or db.get_domains()
+    if not domains:
+        print(f"No domains to crawl in {args.db}; add some or pass --domain", file=sys.stderr)
+        return 2
+    
+    frontier = None
+    if profile is not None:
+        for domain in domains:
+            db.set_profile(domain, args.extraction_profile)
+    
+    assets = None
+    if args.assets:
+        from core.assets import AssetStore
+        from core.cache_manager import CacheManager
+        assets = AssetStore(args.assets, CacheManager(args.cache_dir))
+    
+    if args.frontier:
+        frontier = CrawlFrontier(args.frontier)
+        frontier.initialize()
+        if args.restart:
+            for domain in domains:
+                frontier.clear(domain)
+    
+    logger.info("Crawling %d domain(s) into %s as %s", len(domains), args.db, args.worker_id)
+    stats = crawl(db, domains, concurrency=args.concurrency,
+                  callback=print if args.verbose else None,
+                  frontier=frontier, worker_id=args.worker_id,
+                  max_depth=args.max_depth, max_pages=args.max_pages,
+                  backend=args.backend, changed_since=args.changed_since,
+                  discovery=args.discovery, profile=profile, assets=assets)
+    print(stats.summary())
+    paused = BREAKERS.open_domains()
+    if paused:
+        print(f"Circuit open for: {', '.join(paused)}")
+    
+    if args.metrics_dir:
+        REGISTRY.export(args.metrics_dir)
+    return 1 if stats.failed_domains or stats.items_failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
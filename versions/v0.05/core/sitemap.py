@@ -0,0 +1,255 @@
+"""Sitemap and robots.txt driven URL discovery
+
+Walking listing pages finds items one HTML page at a time. Most wikis
+publish sitemap.xml, usually an index of gzipped shards that together list
+every page with its lastmod, so the full URL set arrives in a handful of
+requests and unchanged pages can be skipped before they are fetched.
+"""
+import gzip
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib import robotparser
+from urllib.parse import urljoin
+from core import network
+from core.circuit_breaker import BREAKERS, CircuitOpenError
+from core.lazy import lazy_import
+from core.logger import setup_logger, span
+from core.metrics import REGISTRY
+
+requests = lazy_import('requests')
+
+SITEMAPS_FETCHED = REGISTRY.counter('questvault_sitemaps_fetched_total', 'Sitemap files fetched, by result')
+SITEMAP_URLS = REGISTRY.counter('questvault_sitemap_urls_total', 'URLs read from sitemaps, by result')
+
+USER_AGENT = 'QuestVault'
+
+# Namespaces whose pages are never items
+SKIP_NAMESPACES = frozenset((
+    'category', 'file', 'image', 'template', 'special', 'talk', 'user', 'user talk',
+    'help', 'mediawiki', 'module', 'project', 'portal', 'forum', 'blog', 'message wall',
+))
+
+SitemapEntry = namedtuple('SitemapEntry', 'url lastmod')
+
+class Throttle:
+    """Spaces calls at least ``delay`` seconds apart across threads"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay or 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.delay:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+class RobotsRules:
+    """Parsed robots.txt for one site"""
+
+    def __init__(self, base_url, text='', user_agent=USER_AGENT):
+        self.base_url = base_url
+        self.user_agent = user_agent
+        self._parser = robotparser.RobotFileParser(urljoin(base_url, '/robots.txt'))
+        self._parser.parse(text.splitlines())
+        self._crawl_delay = self._parse_crawl_delay(text)
+        # Shared by every fetch from this site so the delay holds across phases
+        self.throttle = Throttle(self._crawl_delay)
+
+    @classmethod
+    def fetch(cls, base_url, user_agent=USER_AGENT, timeout=None):
+        """Load robots.txt; a missing or unreachable file allows everything
+
+        Uses the scraper's fetch, timeouts and per-domain circuit breaker.
+        """
+        from core.scraper import fetch_page_content
+
+        text = fetch_page_content(urljoin(base_url, '/robots.txt'), timeout=timeout,
+                                  headers={'User-Agent': user_agent})
+        return cls(base_url, text or '', user_agent)
+
+    def _parse_crawl_delay(self, text):
+        # robotparser only understands whole seconds; sites also use "0.5"
+        delays = {}
+        agents, in_rules = [], False
+        for line in text.splitlines():
+            field, _, value = line.split('#', 1)[0].partition(':')
+            field, value = field.strip().lower(), value.strip()
+            if field == 'user-agent':
+                if in_rules:
+                    agents, in_rules = [], False
+                agents.append(value.lower())
+            elif field:
+                in_rules = True
+                if field == 'crawl-delay':
+                    try:
+                        delay = float(value)
+                    except ValueError:
+                        continue
+                    for agent in agents:
+                        delays.setdefault(agent, delay)
+        own = self.user_agent.lower()
+        for agent, delay in delays.items():
+            if agent != '*' and agent in own:
+                return delay
+        return delays.get('*')
+
+    @property
+    def crawl_delay(self):
+        return self._crawl_delay
+
+    @property
+    def sitemaps(self):
+        return self._parser.site_maps() or [urljoin(self.base_url, '/sitemap.xml')]
+
+    def can_fetch(self, url):
+        return self._parser.can_fetch(self.user_agent, url)
+
+def parse_lastmod(value):
+    """Parse a W3C datetime (2024-01-31 or 2024-01-31T10:00:00+00:00) as UTC"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def _open_sitemap(url, timeout, breaker):
+    try:
+        response = requests.get(url, timeout=timeout or network.TIMEOUT, stream=True,
+                                headers={'User-Agent': USER_AGENT})
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+    breaker.record_response(response.status_code)
+    response.raise_for_status()
+    # Undo Content-Encoding; a .gz file served as-is still needs gunzip
+    response.raw.decode_content = True
+    content_type = response.headers.get('Content-Type', '')
+    if url.endswith('.gz') or 'gzip' in content_type:
+        return response, gzip.GzipFile(fileobj=response.raw)
+    return response, response.raw
+
+def read_sitemap(url, timeout=None):
+    """
+    Stream one sitemap or sitemap index
+
+    Goes through the domain's circuit breaker, raising CircuitOpenError
+    while it is open, and defaults to network.TIMEOUT.
+
+    Returns:
+        tuple: (child sitemap entries, page entries)
+    """
+    breaker = BREAKERS.for_url(url)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{breaker.name} is paused")
+    children, pages = [], []
+    with span('sitemap', url=url) as s:
+        response, source = _open_sitemap(url, timeout, breaker)
+        with response:
+            for _, elem in ET.iterparse(source):
+                tag = elem.tag.rsplit('}', 1)[-1]
+                if tag not in ('url', 'sitemap'):
+                    continue
+                loc = lastmod = None
+                for child in elem:
+                    name = child.tag.rsplit('}', 1)[-1]
+                    if name == 'loc':
+                        loc = (child.text or '').strip()
+                    elif name == 'lastmod':
+                        lastmod = parse_lastmod(child.text)
+                if loc:
+                    (children if tag == 'sitemap' else pages).append(SitemapEntry(loc, lastmod))
+                elem.clear()
+        s['count'] = len(pages)
+    return children, pages
+
+def _is_item(url):
+    from core.mediawiki import title_from_url
+    title = title_from_url(url)
+    namespace, sep, _ = title.partition(':')
+    return not (sep and namespace.strip().lower() in SKIP_NAMESPACES)
+
+def discover_items(base_url, since=None, concurrency=4, callback=None, robots=None):
+    """
+    List item pages from a site's sitemaps
+
+    Sitemap indexes are expanded breadth first with shards fetched
+    concurrently, unless robots.txt sets a crawl-delay, in which case they
+    are fetched one at a time that far apart.
+
+    Args:
+        base_url (str): Any URL on the site
+        since (str|datetime): Skip pages (and whole shards) whose lastmod
+            is older than this
+        concurrency (int): Sitemaps fetched in parallel
+        callback (function): Optional callback for progress updates
+        robots (RobotsRules): Already fetched robots.txt rules
+
+    Returns:
+        list: (name, url) tuples, the same shape parse_item_list returns
+    """
+    from core.mediawiki import title_from_url
+
+    logger = setup_logger('sitemap')
+    robots = robots or RobotsRules.fetch(base_url)
+    throttle = robots.throttle
+    if isinstance(since, str):
+        since = parse_lastmod(since)
+    workers = 1 if throttle.delay else max(1, concurrency)
+
+    def fetch(url):
+        throttle.wait()
+        try:
+            result = read_sitemap(url)
+            SITEMAPS_FETCHED.inc(result='ok')
+            return result
+        except (requests.exceptions.RequestException, CircuitOpenError, ET.ParseError, OSError, EOFError) as e:
+            SITEMAPS_FETCHED.inc(result='circuit_open' if isinstance(e, CircuitOpenError) else 'error')
+            logger.warning("Failed to read sitemap %s: %s", url, e)
+            if callback:
+                callback(f"Failed to read sitemap {url}")
+            return [], []
+
+    seen = set()
+    level = list(dict.fromkeys(robots.sitemaps))
+    items = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while level:
+            seen.update(level)
+            next_level = []
+            for children, pages in pool.map(fetch, level):
+                for child in children:
+                    if child.url in seen:
+                        continue
+                    if since and child.lastmod and child.lastmod < since:
+                        continue
+                    next_level.append(child.url)
+                for page in pages:
+                    if since and page.lastmod and page.lastmod < since:
+                        SITEMAP_URLS.inc(result='unchanged')
+                    elif not robots.can_fetch(page.url) or not _is_item(page.url):
+                        SITEMAP_URLS.inc(result='skipped')
+                    else:
+                        SITEMAP_URLS.inc(result='ok')
+                        items.append((title_from_url(page.url), page.url))
+            level = list(dict.fromkeys(next_level))
+
+    if callback:
+        callback(f"Found {len(items)} items in {len(seen)} sitemaps")
+    return items
@@ -0,0 +1,105 @@
+"""Process-wide GPU texture cache"""
+import os
+import threading
+from collections import OrderedDict
+
+
+def _load_texture(path, size=None):
+    """Decode an image file and upload it as a Kivy texture"""
+    from kivy.core.image import Image as CoreImage
+
+    if size is None:
+        return CoreImage(path).texture
+
+    from io import BytesIO
+    from PIL import Image
+
+    with Image.open(path) as img:
+        data = BytesIO()
+        img.convert('RGBA').resize(size, Image.Resampling.LANCZOS).save(data, 'PNG')
+    data.seek(0)
+    return CoreImage(data, ext='png').texture
+
+
+def _texture_bytes(texture):
+    """Approximate GPU memory used by a texture (RGBA, 4 bytes per pixel)"""
+    width, height = texture.size
+    return int(width) * int(height) * 4
+
+
+class TextureCache:
+    """LRU cache of decoded textures keyed by (path, size)
+
+    Textures are evicted least-recently-used first once the combined
+    footprint exceeds ``max_bytes``. A single texture larger than the
+    budget is still returned, it just isn't kept.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, loader=None):
+        self.max_bytes = max_bytes
+        self._loader = loader or _load_texture
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, path, size):
+        return (os.path.abspath(path), tuple(size) if size else None)
+
+    def get(self, path, size=None):
+        """
+        Get texture for an image, loading it on first use
+
+        Args:
+            path (str): Path to the image file
+            size (tuple): Optional (width, height) to pre-scale to
+
+        Returns:
+            Texture: Cached texture
+        """
+        key = self._key(path, size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        texture = self._loader(key[0], key[1])
+        nbytes = _texture_bytes(texture)
+
+        with self._lock:
+            if key not in self._entries and nbytes <= self.max_bytes:
+                self._entries[key] = (texture, nbytes)
+                self.current_bytes += nbytes
+                self._evict()
+        return texture
+
+    def _evict(self):
+        """Drop least recently used textures until under budget"""
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+
+    def invalidate(self, path=None):
+        """Remove cached textures for one image, or everything"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.current_bytes = 0
+                return
+            path = os.path.abspath(path)
+            for key in [k for k in self._entries if k[0] == path]:
+                self.current_bytes -= self._entries.pop(key)[1]
+
+    def __contains__(self, key):
+        return self._key(*key) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared instance used by the app and resource manager
+texture_cache = TextureCache()
@@ -1,5 +1,11 @@
 """UI package initialization"""
-from .components import UIFactory, FallbackSystem
-from .theme import Theme
+from ..lazy import lazy_attributes
+
+# Components and theme pull in Kivy, so load them on first use
+__getattr__ = lazy_attributes(__name__, {
+    'UIFactory': '.components',
+    'FallbackSystem': '.components',
+    'Theme': '.theme'
+})
 
 __all__ = ['UIFactory', 'FallbackSystem', 'Theme']
@@ -4,19 +4,56 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
 from kivy.animation import Animation
-from kivy.properties import NumericProperty, ColorProperty, ListProperty
+from kivy.properties import NumericProperty, ColorProperty, ListProperty, ReferenceListProperty
 from kivy.uix.widget import Widget
-from kivy.graphics import Color, Rectangle, RoundedRectangle, Ellipse
+from kivy.graphics import Color, Rectangle, RoundedRectangle, Ellipse, InstructionGroup
 from kivy.metrics import dp
 from kivy.clock import Clock
+from copy import copy
 from functools import partial
 from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.scrollview import ScrollView
+
+class WidgetPool:
+    """Free lists of reusable widgets keyed by component type"""
+    
+    def __init__(self, max_per_type=128):
+        self.max_per_type = max_per_type
+        self._free = {}
+        self.reused = 0
+    
+    def acquire(self, component_type):
+        """Pop a free widget of this type, or None if the pool is empty"""
+        free = self._free.get(component_type)
+        if free:
+            self.reused += 1
+            return free.pop()
+        return None
+    
+    def release(self, component_type, widget):
+        """Return a widget for later reuse"""
+        free = self._free.setdefault(component_type, [])
+        if len(free) < self.max_per_type:
+            free.append(widget)
+    
+    def free_count(self, component_type):
+        return len(self._free.get(component_type, ()))
 
 class UIFactory:
     """Centralized UI component creation with theming"""
     
     def __init__(self, theme):
         self.theme = theme
+        self.pool = WidgetPool()
+    
+    @property
+    def style(self):
+        """Compiled theme snapshot; raises if the theme never loaded"""
+        snapshot = self.theme.snapshot
+        if snapshot is None:
+            raise ValueError("Theme not loaded")
+        return snapshot
     
     def create_component(self, component_type: str, **kwargs) -> Widget:
         """Create themed UI component"""
@@ -31,17 +68,52 @@ class UIFactory:
             return FallbackSystem.get_safe_widget(component_type, **kwargs)
         return creator(**kwargs)
     
-    def create_button(self, text: str, callback=None, **kwargs) -> Button:
-        """Create themed button"""
-        defaults = {
-            'text': text,
+    def _button_style(self) -> dict:
+        style = self.style
+        return {
+            'size_hint_y': None,
+            'height': style.dimensions['button_height'],
+            'background_color': style.colors['primary'],
+            'color': style.colors['text'],
+            'font_name': style.font_name,
+            'font_size': style.font_sizes['button']
+        }
+    
+    def _input_style(self) -> dict:
+        style = self.style
+        return {
+            'multiline': False,
             'size_hint_y': None,
-            'height': self.theme.get_dimension('button_height'),
-            'background_color': self.theme.get_color('primary'),
-            'color': self.theme.get_color('text'),
-            'font_name': self.theme.get_font()[0],
-            'font_size': self.theme.get_font('button')[1]
+            'height': style.dimensions['input_height'],
+            'background_color': style.colors['background'],
+            'foreground_color': style.colors['text'],
+            'font_name': style.font_name,
+            'font_size': style.font_sizes['text'],
+            'padding': [style.dimensions['padding'], 10]
         }
+    
+    def _label_style(self) -> dict:
+        style = self.style
+        return {
+            'color': style.colors['text'],
+            'font_name': style.font_name,
+            'font_size': style.font_sizes['text']
+        }
+    
+    def _popup_style(self) -> dict:
+        style = self.style
+        return {
+            'size_hint': (0.8, None),
+            'height': dp(400),
+            'title_color': style.colors['text'],
+            'title_size': style.font_sizes['title'],
+            'title_font': style.font_name,
+            'separator_color': style.colors['secondary']
+        }
+    
+    def create_button(self, text: str, callback=None, **kwargs) -> Button:
+        """Create themed button"""
+        defaults = {'text': text, **self._button_style()}
         defaults.update(kwargs)
         
         button = RippleButton(**defaults)
@@ -51,54 +123,139 @@ class UIFactory:
     
     def create_input(self, **kwargs) -> TextInput:
         """Create themed input"""
-        defaults = {
-            'multiline': False,
-            'size_hint_y': None,
-            'height': self.theme.get_dimension('input_height'),
-            'background_color': self.theme.get_color('background'),
-            'foreground_color': self.theme.get_color('text'),
-            'font_name': self.theme.get_font()[0],
-            'font_size': self.theme.get_font()[1],
-            'padding': [self.theme.get_dimension('padding'), 10]
-        }
+        defaults = self._input_style()
         defaults.update(kwargs)
         return TextInput(**defaults)
     
     def create_label(self, text: str, **kwargs) -> Label:
         """Create themed label"""
-        defaults = {
-            'text': text,
-            'color': self.theme.get_color('text'),
-            'font_name': self.theme.get_font()[0],
-            'font_size': self.theme.get_font()[1]
-        }
+        defaults = {'text': text, **self._label_style()}
         defaults.update(kwargs)
         return Label(**defaults)
     
     def create_popup(self, title: str, content: Widget, **kwargs) -> Popup:
         """Create themed popup"""
-        defaults = {
-            'title': title,
-            'content': content,
-            'size_hint': (0.8, None),
-            'height': dp(400),
-            'title_color': self.theme.get_color('text'),
-            'title_size': self.theme.get_font('title')[1],
-            'title_font': self.theme.get_font()[0],
-            'separator_color': self.theme.get_color('secondary')
-        }
+        defaults = {'title': title, 'content': content, **self._popup_style()}
         defaults.update(kwargs)
         return AnimatedPopup(**defaults)
+    
+    def checkout(self, component_type: str, callback=None, **kwargs) -> Widget:
+        """
+        Get a pooled button, label or input, re-themed for this use
+        
+        Return it with checkin() once it is no longer displayed.
+        """
+        styles = {
+            'button': self._button_style,
+            'input': self._input_style,
+            'label': self._label_style
+        }
+        style = styles[component_type]()
+        widget = self.pool.acquire(component_type)
+        if widget is None:
+            widget = self.create_component(component_type, **kwargs)
+        else:
+            for name, value in {**style, **kwargs}.items():
+                setattr(widget, name, value)
+        
+        widget.pool_overrides = self._overrides(widget, style, kwargs)
+        widget.pool_type = component_type
+        widget.pool_callback = callback
+        if callback:
+            widget.bind(on_press=callback)
+        return widget
+    
+    def checkin(self, widget: Widget) -> None:
+        """Return a checked out widget to the pool"""
+        if widget.parent:
+            widget.parent.remove_widget(widget)
+        if widget.pool_callback:
+            widget.unbind(on_press=widget.pool_callback)
+            widget.pool_callback = None
+        self._restore(widget)
+        self.pool.release(widget.pool_type, widget)
+    
+    @staticmethod
+    def _overrides(widget, style, kwargs) -> dict:
+        """
+        Class defaults of the properties a checkout set beyond the theme
+        
+        The next checkout re-applies the theme, but anything else (a fixed
+        height, a size hint) would otherwise stay on the pooled widget.
+        """
+        defaults = {}
+        for name in kwargs:
+            prop = widget.property(name, quiet=True)
+            if name in style or prop is None:
+                continue
+            if isinstance(prop, ReferenceListProperty):
+                defaults[name] = [copy(widget.property(part.name).defaultvalue) for part in prop.defaultvalue]
+            else:
+                defaults[name] = copy(prop.defaultvalue)
+        return defaults
+    
+    @staticmethod
+    def _restore(widget) -> None:
+        """Undo the checkout's non-theme properties before pooling the widget"""
+        for name, value in getattr(widget, 'pool_overrides', {}).items():
+            setattr(widget, name, value)
+        widget.pool_overrides = {}
+    
+    def checkout_list_popup(self, title: str, **kwargs) -> Popup:
+        """
+        Get a pooled popup holding a scrollable single-column list
+        
+        Add rows from checkout() to ``popup.rows``; rows and popup return
+        to the pool automatically once the popup is closed.
+        """
+        style = self._popup_style()
+        popup = self.pool.acquire('list_popup')
+        if popup is None:
+            content = BoxLayout(orientation='vertical', spacing=10, padding=10)
+            scroll = ScrollView(size_hint=(1, 1))
+            rows = GridLayout(cols=1, spacing=10, size_hint_y=None)
+            rows.bind(minimum_height=rows.setter('height'))
+            scroll.add_widget(rows)
+            content.add_widget(scroll)
+            
+            popup = self.create_popup(title=title, content=content, **kwargs)
+            popup.rows = rows
+            popup.bind(parent=self._recycle_list_popup)
+        else:
+            # A fade-out still running from the last use must not dismiss it now
+            Animation.cancel_all(popup)
+            for name, value in {'title': title, **style, **kwargs}.items():
+                setattr(popup, name, value)
+        popup.pool_overrides = self._overrides(popup, style, kwargs)
+        return popup
+    
+    def _recycle_list_popup(self, popup, parent):
+        """Check rows and popup back in once the popup leaves the window"""
+        if parent is not None:
+            return
+        for row in list(popup.rows.children):
+            self.checkin(row)
+        self._restore(popup)
+        self.pool.release('list_popup', popup)
 
 class RippleButton(Button):
-    """Button with ripple effect"""
+    """Button with ripple effect
+    
+    Ripples are drawn from a fixed ring of ``max_ripples`` Color/Ellipse
+    pairs in one instruction group, so rapid taps recycle the oldest
+    ripple instead of growing the canvas.
+    """
     ripple_color = ListProperty([1, 1, 1, 0.3])
     ripple_duration = NumericProperty(0.5)
     ripple_scale = NumericProperty(2.0)
+    max_ripples = NumericProperty(3)
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.ripple = None
+        self.ripple_group = InstructionGroup()
+        self.canvas.after.add(self.ripple_group)
+        self._ripples = []
+        self._next_ripple = 0
         
     def on_touch_down(self, touch):
         if self.collide_point(*touch.pos):
@@ -106,23 +263,33 @@ class RippleButton(Button):
         return super().on_touch_down(touch)
     
     def _create_ripple(self, pos):
-        ripple = Ellipse(pos=pos, size=(dp(10), dp(10)))
-        with self.canvas:
-            Color(*self.ripple_color)
-            self.ripple = ripple
-            
-        anim = Animation(
-            size=(dp(100), dp(100)), 
+        if len(self._ripples) < self.max_ripples:
+            color = Color(*self.ripple_color)
+            ellipse = Ellipse(size=(0, 0))
+            self.ripple_group.add(color)
+            self.ripple_group.add(ellipse)
+            self._ripples.append((color, ellipse))
+            # Use the new slot; round-robin only once the ring is full
+            self._next_ripple = len(self._ripples) % self.max_ripples
+        else:
+            color, ellipse = self._ripples[self._next_ripple]
+            self._next_ripple = (self._next_ripple + 1) % len(self._ripples)
+        Animation.cancel_all(color)
+        Animation.cancel_all(ellipse)
+        
+        start, end = dp(10), dp(50) * self.ripple_scale
+        x, y = pos
+        color.rgba = self.ripple_color
+        ellipse.size = (start, start)
+        ellipse.pos = (x - start / 2, y - start / 2)
+        
+        Animation(
+            size=(end, end),
+            pos=(x - end / 2, y - end / 2),
             duration=self.ripple_duration,
             t='out_quad'
-        )
-        anim.bind(on_complete=self._remove_ripple)
-        anim.start(ripple)
-    
-    def _remove_ripple(self, *args):
-        if self.ripple:
-            self.canvas.remove(self.ripple)
-            self.ripple = None
+        ).start(ellipse)
+        Animation(a=0, duration=self.ripple_duration, t='in_quad').start(color)
 
 class AnimatedPopup(Popup):
     """Popup with animation effects"""
@@ -131,13 +298,17 @@ class AnimatedPopup(Popup):
         self.opacity = 0
         
     def open(self, *args):
+        # Cancelled animations don't fire on_complete, so a pending
+        # fade-out can't dismiss the reopened popup
+        Animation.cancel_all(self, 'opacity')
         super().open(*args)
         anim = Animation(opacity=1, duration=0.2)
         anim.start(self)
     
     def dismiss(self, *args, **kwargs):
+        Animation.cancel_all(self, 'opacity')
         anim = Animation(opacity=0, duration=0.2)
-        anim.bind(on_complete=lambda *x: super().dismiss())
+        anim.bind(on_complete=lambda *x: Popup.dismiss(self, *args, **kwargs))
         anim.start(self) 
 
 class FallbackSystem:
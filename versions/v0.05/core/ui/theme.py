@@ -2,10 +2,20 @@
 from kivy.metrics import dp
 from kivy.utils import get_color_from_hex
 from kivy.logger import Logger
+from dataclasses import dataclass
+from types import MappingProxyType
 import json
 import os
 from pathlib import Path
 
+@dataclass(frozen=True)
+class ThemeSnapshot:
+    """Resolved, read-only view of a theme for fast widget creation"""
+    colors: MappingProxyType
+    font_name: str
+    font_sizes: MappingProxyType
+    dimensions: MappingProxyType
+
 class Theme:
     """Combined theme management and repair"""
     
@@ -40,6 +50,7 @@ class Theme:
         self.theme_path = self.root_dir / 'resources' / 'theme.json'
         self.fonts_dir = self.root_dir / 'resources' / 'fonts'
         self.current_theme = self.load_theme()
+        self.snapshot = self.compile() if self.current_theme else None
         
     def load_theme(self):
         """Load theme with automatic repair if needed"""
@@ -100,10 +111,14 @@ class Theme:
             with open(self.theme_path, 'w') as f:
                 json.dump(repaired_theme, f, indent=4)
             
+            self.current_theme = repaired_theme
+            self.snapshot = self.compile()
             return repaired_theme
             
         except Exception as e:
             Logger.error(f"Theme repair failed: {str(e)}")
+            self.current_theme = self.DEFAULT_THEME
+            self.snapshot = self.compile()
             return self.DEFAULT_THEME
     
     def validate_value(self, category, key, value):
@@ -118,6 +133,20 @@ class Theme:
             return isinstance(value, (int, float))
         return False
     
+    def compile(self):
+        """Resolve colors, font path and sizes once into a ThemeSnapshot"""
+        theme = self.current_theme
+        defaults = self.DEFAULT_THEME
+        colors = {**defaults['colors'], **theme['colors']}
+        font_sizes = {**defaults['fonts']['sizes'], **theme['fonts'].get('sizes', {})}
+        dimensions = {**defaults['dimensions'], **theme['dimensions']}
+        return ThemeSnapshot(
+            colors=MappingProxyType({k: tuple(v) for k, v in colors.items()}),
+            font_name=self.get_font()[0],
+            font_sizes=MappingProxyType(font_sizes),
+            dimensions=MappingProxyType(dimensions)
+        )
+    
     # Accessor methods
     def get_color(self, name):
         return self.current_theme['colors'].get(name, self.DEFAULT_THEME['colors'][name])
@@ -0,0 +1,35 @@
+"""URL helpers shared by the scraper and the database layer"""
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonical_url(url):
+    """
+    One spelling of a page URL, so the same page is always the same item
+
+    Lowercases the scheme and host, drops default ports, fragments and
+    user info, rewrites index.php?title=X to /wiki/X, and normalises the
+    title the way MediaWiki does: underscores for spaces, first letter
+    upper case and MediaWiki's own percent-encoding.
+    """
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+
+    path = parts.path or '/'
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    title = dict(query).get('title')
+    if path.endswith('/index.php') and title:
+        path = path[:-len('index.php')].rstrip('/')
+        path = path.rsplit('/', 1)[0] if path.endswith('/w') else path
+        path += '/wiki/' + title
+        query = [(key, value) for key, value in query if key != 'title']
+    prefix, sep, title = path.partition('/wiki/')
+    if sep and title:
+        title = unquote(title).replace(' ', '_').strip('_')
+        path = prefix + sep + quote(title[:1].upper() + title[1:], safe=";:@$!*(),/~'")
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
@@ -8,23 +8,18 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from kivy.app import App
-from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.button import Button
-from kivy.uix.label import Label
-from kivy.uix.textinput import TextInput
-from kivy.uix.image import Image
 from kivy.core.window import Window
 from kivy.metrics import dp
-from kivy.graphics import Color, Rectangle, Line
-from kivy.utils import get_color_from_hex
+from kivy.graphics import Color, Rectangle
 
 # Local imports
 from core.ui.components import UIFactory, FallbackSystem
 from core.ui.theme import Theme
 from core.logger import setup_logger
+from core.metrics import REGISTRY
+from core.profiling import profiled
+from core.texture_cache import texture_cache
 
 class QuestVaultApp(App):
     def __init__(self):
@@ -65,7 +60,7 @@ class QuestVaultApp(App):
             with layout.canvas.before:
                 self.bg_color = Color(1, 1, 1, 1)  # White to not tint the image
                 self.bg_rect = Rectangle(
-                    source=bg_image_path,
+                    texture=texture_cache.get(bg_image_path),
                     pos=(0, 0),  # Start at window origin
                     size=Window.size  # Use window size immediately
                 )
@@ -135,6 +130,15 @@ class QuestVaultApp(App):
             )
             layout.add_widget(search_btn)
             
+            # Optional runtime stats panel
+            if os.environ.get('QUESTVAULT_STATS'):
+                stats_btn = self.ui.create_component(
+                    'button',
+                    text='Stats',
+                    callback=self.show_stats
+                )
+                layout.add_widget(stats_btn)
+            
             # Status label
             self.status_label = self.ui.create_component(
                 'label',
@@ -176,8 +180,8 @@ class QuestVaultApp(App):
             return self._build_themed()
         except Exception as e:
             self.logger.error(f"Theme failed, attempting repair: {str(e)}")
-            # Try to repair theme
-            self.theme = self.theme_repair.repair_and_save()
+            # Try to repair theme (recompiles the snapshot used by self.ui)
+            self.theme_repair.repair_and_save()
             try:
                 # Try again with repaired theme
                 return self._build_themed()
@@ -186,6 +190,53 @@ class QuestVaultApp(App):
                 # Fall back to minimal UI
                 return self._build_fallback()
 
+    def on_stop(self):
+        """Export metrics on exit when QUESTVAULT_METRICS_DIR is set"""
+        metrics_dir = os.environ.get('QUESTVAULT_METRICS_DIR')
+        if metrics_dir:
+            REGISTRY.export(metrics_dir)
+
+    def _stats_lines(self):
+        """Human readable summary of the metrics registry"""
+        def total(name):
+            metric = REGISTRY.get(name)
+            return metric.total() if metric else 0
+
+        def count(name, **labels):
+            metric = REGISTRY.get(name)
+            return metric.value(**labels) if metric else 0
+
+        uptime = max(REGISTRY.uptime(), 1e-9)
+        pages = total('questvault_pages_fetched_total')
+        rows = total('questvault_db_rows_written_total')
+        hits = count('questvault_cache_requests_total', result='hit')
+        misses = count('questvault_cache_requests_total', result='miss')
+        lookups = hits + misses
+        hit_ratio = f"{hits / lookups:.0%}" if lookups else "n/a"
+        return [
+            f"Uptime: {uptime:.0f}s",
+            f"Pages fetched: {pages:.0f} ({pages / uptime:.2f}/sec)",
+            f"Downloaded: {total('questvault_bytes_downloaded_total') / 1024:.1f} KB",
+            f"Cache hit ratio: {hit_ratio} ({hits}/{lookups})",
+            f"DB rows written: {rows:.0f} ({rows / uptime:.2f}/sec)"
+        ]
+
+    def show_stats(self, instance):
+        """Display runtime metrics in a popup"""
+        try:
+            popup = self.ui.checkout_list_popup(title='Stats')
+            for line in self._stats_lines():
+                popup.rows.add_widget(self.ui.checkout(
+                    'label',
+                    text=line,
+                    size_hint_y=None,
+                    height=dp(30)
+                ))
+            popup.open()
+            
+        except Exception as e:
+            self.status_label.text = f"Error showing stats: {str(e)}"
+
     def _update_background(self, instance, value):
         """Update background size and position"""
         if hasattr(self, 'bg_rect'):
@@ -195,36 +246,24 @@ class QuestVaultApp(App):
     def show_domains(self, instance):
         """Display all domains in a popup"""
         try:
-            # Create content for popup
-            content = BoxLayout(orientation='vertical', spacing=10, padding=10)
-            domains_list = ScrollView(size_hint=(1, 1))
-            domains_grid = GridLayout(cols=1, spacing=10, size_hint_y=None)
-            domains_grid.bind(minimum_height=domains_grid.setter('height'))
+            popup = self.ui.checkout_list_popup(title='Domains')
             
             # Add domain buttons
             for domain in self.domains:  # You'll need to initialize self.domains in __init__
-                domain_btn = self.ui.create_component(
+                domain_btn = self.ui.checkout(
                     'button',
                     text=domain,
                     size_hint_y=None,
                     height=dp(40)
                 )
-                domains_grid.add_widget(domain_btn)
+                popup.rows.add_widget(domain_btn)
             
-            domains_list.add_widget(domains_grid)
-            content.add_widget(domains_list)
-            
-            # Create and show popup
-            popup = self.ui.create_component(
-                'popup',
-                title='Domains',
-                content=content
-            )
             popup.open()
             
         except Exception as e:
             self.status_label.text = f"Error showing domains: {str(e)}"
 
+    @profiled('scrape_all')
     def scrape_all(self, instance):
         """Scrape all domains in the list"""
         try:
@@ -241,33 +280,22 @@ class QuestVaultApp(App):
     def select_domain(self, instance):
         """Select a specific domain to scrape"""
         try:
-            content = BoxLayout(orientation='vertical', spacing=10, padding=10)
-            domains_list = ScrollView(size_hint=(1, 1))
-            domains_grid = GridLayout(cols=1, spacing=10, size_hint_y=None)
-            domains_grid.bind(minimum_height=domains_grid.setter('height'))
+            popup = self.ui.checkout_list_popup(title='Select Domain')
             
             def on_domain_select(btn):
                 self.status_label.text = f"Selected domain: {btn.text}"
                 popup.dismiss()
             
             for domain in self.domains:
-                domain_btn = self.ui.create_component(
+                domain_btn = self.ui.checkout(
                     'button',
                     text=domain,
+                    callback=on_domain_select,
                     size_hint_y=None,
                     height=dp(40)
                 )
-                domain_btn.bind(on_press=on_domain_select)
-                domains_grid.add_widget(domain_btn)
+                popup.rows.add_widget(domain_btn)
             
-            domains_list.add_widget(domains_grid)
-            content.add_widget(domains_list)
-            
-            popup = self.ui.create_component(
-                'popup',
-                title='Select Domain',
-                content=content
-            )
             popup.open()
             
         except Exception as e:
@@ -276,29 +304,25 @@ class QuestVaultApp(App):
     def select_database(self, instance):
         """Select or create a database"""
         try:
-            content = BoxLayout(orientation='vertical', spacing=10, padding=10)
+            popup = self.ui.checkout_list_popup(title='Database Options')
             
             # Add database options
             options = ['Create New Database', 'Open Existing Database']
             for option in options:
-                btn = self.ui.create_component(
+                btn = self.ui.checkout(
                     'button',
                     text=option,
                     size_hint_y=None,
                     height=dp(40)
                 )
-                content.add_widget(btn)
+                popup.rows.add_widget(btn)
             
-            popup = self.ui.create_component(
-                'popup',
-                title='Database Options',
-                content=content
-            )
             popup.open()
             
         except Exception as e:
             self.status_label.text = f"Error with database selection: {str(e)}"
 
+    @profiled('search_items')
     def search_items(self, instance):
         """Search for items in the database"""
         try:
@@ -308,27 +332,16 @@ class QuestVaultApp(App):
                 return
                 
             # Create results popup
-            content = BoxLayout(orientation='vertical', spacing=10, padding=10)
-            results_list = ScrollView(size_hint=(1, 1))
-            results_grid = GridLayout(cols=1, spacing=10, size_hint_y=None)
-            results_grid.bind(minimum_height=results_grid.setter('height'))
+            popup = self.ui.checkout_list_popup(title='Search Results')
             
             # Here you would actually search your database
             # For now, just show the search term
-            result_label = self.ui.create_component(
+            result_label = self.ui.checkout(
                 'label',
                 text=f"Search results for: {query}"
             )
-            results_grid.add_widget(result_label)
+            popup.rows.add_widget(result_label)
             
-            results_list.add_widget(results_grid)
-            content.add_widget(results_list)
-            
-            popup = self.ui.create_component(
-                'popup',
-                title='Search Results',
-                content=content
-            )
             popup.open()
             
         except Exception as e:
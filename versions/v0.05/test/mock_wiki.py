@@ -0,0 +1,455 @@
+"""Local stand-in wiki served over real sockets for tests and benchmarks
+
+The generated wiki mimics the parts of a MediaWiki site the scraper
+touches: a main page and category pages that list items in pages of
+``items_per_page`` with a "next page" link, nested categories, and item
+pages with an infobox, a description paragraph and a category link, PNG
+icons shared by every item in a category, plus an api.php
+answering the siteinfo, extracts/categories and recentchanges queries the
+MediaWiki backend makes. Latency, HTTP 429
+rate limiting and page size can be injected to measure the scraper under
+realistic conditions without touching the network.
+"""
+import gzip
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+
+class MockWikiServer:
+    """Serves a generated wiki of ``num_items`` item pages
+
+    Args:
+        num_items (int): Number of item pages
+        categories (dict|tuple): Category tree as {name: [subcategories]}
+            or a flat tuple of names; items are spread over leaf categories
+        items_per_page (int): Links per listing page before paginating
+        latency (float|tuple): Seconds added to every response, or a
+            (min, max) range to draw from
+        rate_limit_every (int): Answer every Nth request with HTTP 429
+        retry_after (int): Retry-After header sent with 429 responses
+        payload_bytes (int): Pad item pages up to roughly this size
+        api (bool): Serve /api.php like a MediaWiki site
+        sitemap_shard_size (int): Item URLs per gzipped sitemap shard; 0
+            serves no sitemap
+        crawl_delay (float): Crawl-delay advertised in robots.txt
+        disallow (tuple): Path prefixes robots.txt disallows
+        content_type (str): Content-Type of HTML pages; None sends no
+            header, leaving clients to detect the encoding
+
+    Usage:
+        with MockWikiServer(num_items=500, latency=0.01) as wiki:
+            items = parse_item_list(wiki.url)
+    """
+
+    def __init__(self, num_items=100, categories=('Resources', 'Tools', 'Creatures'),
+                 items_per_page=200, latency=0.0, rate_limit_every=0, retry_after=1,
+                 payload_bytes=0, api=True, sitemap_shard_size=1000, crawl_delay=None,
+                 disallow=(), content_type='text/html; charset=utf-8', seed=0):
+        if not isinstance(categories, dict):
+            categories = {name: [] for name in categories}
+        self.num_items = num_items
+        self.category_tree = categories
+        self.items_per_page = items_per_page
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.payload_bytes = payload_bytes
+        self.api_enabled = api
+        self.sitemap_shard_size = sitemap_shard_size
+        self.crawl_delay = crawl_delay
+        self.disallow = disallow
+        self.content_type = content_type
+        self.changes = []  # (timestamp, title) edits listed by recentchanges
+        self.leaf_categories = self._leaves(categories)
+        self.request_count = 0
+        self.status_counts = Counter()
+        self.paths = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _leaves(self, tree):
+        leaves = []
+        for name, children in tree.items():
+            if children:
+                leaves.extend(self._leaves(children if isinstance(children, dict)
+                                           else {child: [] for child in children}))
+            else:
+                leaves.append(name)
+        return leaves
+
+    def _children(self, category, tree=None):
+        tree = self.category_tree if tree is None else tree
+        for name, children in tree.items():
+            if not isinstance(children, dict):
+                children = {child: [] for child in children}
+            if name == category:
+                return list(children)
+            found = self._children(category, children)
+            if found is not None:
+                return found
+        return None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    # Generated content
+
+    def item_name(self, index):
+        return f"Item {index}"
+
+    def item_path(self, index):
+        return f"/wiki/Item_{index}"
+
+    def item_category(self, index):
+        return self.leaf_categories[index % len(self.leaf_categories)]
+
+    def category_items(self, category):
+        if category not in self.leaf_categories:
+            return []
+        offset = self.leaf_categories.index(category)
+        return list(range(offset, self.num_items, len(self.leaf_categories)))
+
+    def title_path(self, title):
+        """URL path segment for a page title, MediaWiki style"""
+        return quote(title.replace(' ', '_'))
+
+    def _listing(self, title, entries, page, extra=''):
+        """Render one page of links with a MediaWiki-style next page link"""
+        start = (page - 1) * self.items_per_page
+        chunk = entries[start:start + self.items_per_page]
+        links = ''.join(f'<li><a href="{href}">{escape(text)}</a></li>' for href, text in chunk)
+        nav = ''
+        if start + self.items_per_page < len(entries):
+            nav = (f'<a href="/index.php?title={self.title_path(title)}&amp;page={page + 1}" '
+                   f'title="{escape(title)}">next page</a>')
+        return (f"<html><body><h1>{escape(title)}</h1>{extra}"
+                f"<ul>{links}</ul>{nav}</body></html>")
+
+    def main_page(self, page=1):
+        categories = ''.join(
+            f'<a href="/wiki/Category:{self.title_path(name)}">{escape(name)}</a>'
+            for name in self.category_tree
+        )
+        entries = [(self.item_path(i), self.item_name(i)) for i in range(self.num_items)]
+        return self._listing('Main_Page', entries, page, f'<div class="categories">{categories}</div>')
+
+    def category_page(self, category, page=1):
+        children = self._children(category)
+        if children is None:
+            return None
+        subcategories = ''.join(
+            f'<a href="/wiki/Category:{self.title_path(child)}">{escape(child)}</a>'
+            for child in children
+        )
+        entries = [(self.item_path(i), self.item_name(i)) for i in self.category_items(category)]
+        return self._listing(f'Category:{category}', entries, page,
+                             f'<div class="subcategories">{subcategories}</div>')
+
+    def item_page(self, index):
+        category = self.item_category(index)
+        body = (
+            f'<html><head><meta charset="utf-8"></head><body><h1>{self.item_name(index)}</h1>'
+            '<aside class="portable-infobox">'
+            f'<figure><img src="/images/{self.title_path(self.item_name(index))}.png" alt="icon"></figure>'
+            f'<div class="pi-item pi-data"><h3 class="pi-data-label">Rarity</h3>'
+            f'<div class="pi-data-value">{("Common", "Rare", "Epic")[index % 3]}</div></div>'
+            f'<div class="pi-item pi-data"><h3 class="pi-data-label">Weight</h3>'
+            f'<div class="pi-data-value">{index % 10 + 1} kg</div></div>'
+            '</aside>'
+            f"<p>{self.item_name(index)} is a generated test item.</p>"
+            f'<a href="/wiki/Category:{self.title_path(category)}">{escape(category)}</a>'
+        )
+        filler = "<p>Filler text for payload sizing.</p>"
+        padding = max(0, self.payload_bytes - len(body) - len("</body></html>"))
+        body += filler * (padding // len(filler))
+        return body + "</body></html>"
+
+    def icon(self, index):
+        """PNG icon for an item; every item in a category has the same bytes"""
+        checksum = zlib.crc32(self.item_category(index).encode())
+        return solid_png(((checksum >> 16) & 255, (checksum >> 8) & 255, checksum & 255))
+
+    def item_index(self, title):
+        """Item number for a page title, or None"""
+        name = title.replace('_', ' ')
+        prefix = self.item_name(0)[:-1]
+        if name.startswith(prefix) and name[len(prefix):].isdigit():
+            index = int(name[len(prefix):])
+            if index < self.num_items:
+                return index
+        return None
+
+    def edit(self, index, timestamp=None):
+        """Record an edit to an item for recentchanges"""
+        timestamp = timestamp or time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        self.changes.append((timestamp, self.item_name(index)))
+
+    # robots.txt and sitemaps
+
+    BASE_LASTMOD = '2024-01-01T00:00:00Z'
+
+    def robots_txt(self):
+        lines = ['User-agent: *']
+        if self.crawl_delay:
+            lines.append(f'Crawl-delay: {self.crawl_delay}')
+        lines += [f'Disallow: {prefix}' for prefix in self.disallow]
+        if self.sitemap_shard_size:
+            lines.append(f'Sitemap: {self.url}sitemap.xml')
+        return '\n'.join(lines) + '\n'
+
+    def lastmod(self, index):
+        """Time of an item's latest edit"""
+        name = self.item_name(index)
+        return max([t for t, title in self.changes if title == name], default=self.BASE_LASTMOD)
+
+    def _shards(self):
+        size = self.sitemap_shard_size
+        return [range(start, min(start + size, self.num_items)) for start in range(0, self.num_items, size)]
+
+    def sitemap_index(self):
+        entries = [(f'{self.url}sitemaps/items-{n}.xml.gz', max(self.lastmod(i) for i in shard))
+                   for n, shard in enumerate(self._shards())]
+        entries.append((f'{self.url}sitemaps/categories.xml', self.BASE_LASTMOD))
+        body = ''.join(f'<sitemap><loc>{loc}</loc><lastmod>{lastmod}</lastmod></sitemap>'
+                       for loc, lastmod in entries)
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{body}</sitemapindex>')
+
+    def _urlset(self, entries):
+        body = ''.join(f'<url><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></url>'
+                       for loc, lastmod in entries)
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{body}</urlset>')
+
+    def sitemap_shard(self, number):
+        shards = self._shards()
+        if not 0 <= number < len(shards):
+            return None
+        return self._urlset((self.url + self.item_path(i)[1:], self.lastmod(i)) for i in shards[number])
+
+    def category_sitemap(self):
+        return self._urlset((f'{self.url}wiki/Category:{self.title_path(name)}', self.BASE_LASTMOD)
+                            for name in self.leaf_categories)
+
+    # api.php
+
+    # TextExtracts returns at most this many extracts per request
+    EXTRACT_LIMIT = 20
+
+    def api(self, params):
+        """Answer an action=query api.php request"""
+        if params.get('action') != 'query':
+            return {'error': {'code': 'badvalue', 'info': 'Only action=query is supported'}}
+        result = {}
+        response = {'batchcomplete': True, 'query': result}
+        if 'siteinfo' in params.get('meta', ''):
+            result['general'] = {'sitename': 'Mock Wiki', 'generator': 'MediaWiki 1.39.0'}
+        if 'titles' in params:
+            titles = params['titles'].split('|')
+            if len(titles) > 50:
+                return {'error': {'code': 'toomanyvalues', 'info': 'Too many values for titles'}}
+            normalized = [{'from': t, 'to': t.replace('_', ' ')} for t in titles if '_' in t]
+            if normalized:
+                result['normalized'] = normalized
+            titles = [t.replace('_', ' ') for t in titles]
+            offset = int(params.get('excontinue', 0))
+            pages = []
+            for position, title in enumerate(titles):
+                index = self.item_index(title)
+                if index is None:
+                    pages.append({'ns': 0, 'title': title, 'missing': True})
+                    continue
+                page = {'pageid': index + 1, 'ns': 0, 'title': title,
+                        'categories': [{'ns': 14, 'title': f'Category:{self.item_category(index)}'}]}
+                if offset <= position < offset + self.EXTRACT_LIMIT:
+                    page['extract'] = f"{self.item_name(index)} is a generated test item.\nMore text."
+                pages.append(page)
+            result['pages'] = pages
+            if offset + self.EXTRACT_LIMIT < len(titles):
+                response['continue'] = {'excontinue': offset + self.EXTRACT_LIMIT, 'continue': '||categories'}
+                del response['batchcomplete']
+        if params.get('list') == 'recentchanges':
+            since = params.get('rcend', '')
+            result['recentchanges'] = [
+                {'type': 'edit', 'ns': 0, 'title': title, 'timestamp': timestamp}
+                for timestamp, title in sorted(self.changes, reverse=True) if timestamp >= since
+            ]
+        return response
+
+    # Request handling
+
+    def render(self, path, query):
+        """Return (status, headers, body bytes) for a request"""
+        page = int(query.get('page', ['1'])[0])
+        html = None
+        if path == '/index.php':
+            path = '/wiki/' + query.get('title', [''])[0]
+        if path in ('/', '/wiki/Main_Page'):
+            html = self.main_page(page)
+        elif path.startswith('/wiki/Category:'):
+            category = unquote(path[len('/wiki/Category:'):]).replace('_', ' ')
+            html = self.category_page(category, page)
+        elif path.startswith('/wiki/Item_'):
+            try:
+                index = int(path[len('/wiki/Item_'):])
+            except ValueError:
+                index = -1
+            if 0 <= index < self.num_items:
+                html = self.item_page(index)
+        elif path.startswith('/images/Item_') and path.endswith('.png'):
+            index = self.item_index(unquote(path[len('/images/'):-len('.png')]))
+            if index is not None:
+                return 200, {'Content-Type': 'image/png'}, self.icon(index)
+        elif path == '/robots.txt':
+            return 200, {'Content-Type': 'text/plain'}, self.robots_txt().encode()
+        elif path == '/sitemap.xml' and self.sitemap_shard_size:
+            return 200, {'Content-Type': 'application/xml'}, self.sitemap_index().encode()
+        elif path == '/sitemaps/categories.xml' and self.sitemap_shard_size:
+            return 200, {'Content-Type': 'application/xml'}, self.category_sitemap().encode()
+        elif path.startswith('/sitemaps/items-') and path.endswith('.xml.gz') and self.sitemap_shard_size:
+            number = path[len('/sitemaps/items-'):-len('.xml.gz')]
+            xml = self.sitemap_shard(int(number)) if number.isdigit() else None
+            if xml is not None:
+                return 200, {'Content-Type': 'application/x-gzip'}, gzip.compress(xml.encode())
+        elif path == '/api.php' and self.api_enabled:
+            body = json.dumps(self.api({name: values[0] for name, values in query.items()}))
+            return 200, {'Content-Type': 'application/json; charset=utf-8'}, body.encode()
+
+        headers = {'Content-Type': self.content_type} if self.content_type else {}
+        if html is None:
+            return 404, headers, b"<html><body>Not found</body></html>"
+        return 200, headers, html.encode()
+
+    def _delay(self):
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def handle(self, raw_path):
+        """Apply latency and rate limiting, then render"""
+        with self._lock:
+            self.request_count += 1
+            limited = self.rate_limit_every and self.request_count % self.rate_limit_every == 0
+        self._delay()
+        parts = urlsplit(raw_path)
+        if limited:
+            status, headers, body = 429, {'Retry-After': str(self.retry_after)}, b"Too Many Requests"
+        else:
+            status, headers, body = self.render(parts.path, parse_qs(parts.query))
+        with self._lock:
+            self.status_counts[status] += 1
+            self.paths[parts.path] += 1
+        return status, headers, body
+
+    def _handler(self):
+        wiki = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 with Content-Length keeps connections alive
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, headers, body = wiki.handle(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+DUMP_HEADER = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/" version="0.11" xml:lang="en">
+  <siteinfo>
+    <sitename>Mock Wiki</sitename>
+    <base>https://mock.example/wiki/Main_Page</base>
+    <generator>MediaWiki 1.39.0</generator>
+  </siteinfo>
+"""
+
+DUMP_PAGE = """  <page>
+    <title>{title}</title>
+    <ns>{ns}</ns>
+    <id>{id}</id>{redirect}
+    <revision>
+      <id>{id}</id>
+      <timestamp>2024-01-01T00:00:00Z</timestamp>
+      <text bytes="{size}" xml:space="preserve">{text}</text>
+    </revision>
+  </page>
+"""
+
+def solid_png(rgb, size=16):
+    """A size x size single-colour PNG"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    rows = b''.join(b'\x00' + bytes(rgb) * size for _ in range(size))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+def item_wikitext(name, category):
+    """Wikitext for a generated item with the usual infobox and link clutter"""
+    return (
+        "{{Infobox item\n| name = " + name + "\n| icon = {{Icon|" + name + "}}\n}}\n"
+        "<!-- generated -->\n"
+        f"'''{name}''' is a generated [[Test items|test item]].<ref>Mock source</ref>\n\n"
+        "== Usage ==\n* Used in [[Crafting]]\n\n"
+        f"[[Category:{category}]]\n[[Category:Generated]]\n"
+    )
+
+def write_xml_dump(path, num_items=100, categories=('Resources', 'Tools', 'Creatures'), redirects=0):
+    """Write a MediaWiki XML export of generated items; .bz2/.gz paths are compressed"""
+    import bz2
+    import gzip
+
+    opener = bz2.open if path.endswith('.bz2') else gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        f.write(DUMP_HEADER)
+        for i in range(num_items):
+            text = escape(item_wikitext(f"Item {i}", categories[i % len(categories)]), quote=False)
+            f.write(DUMP_PAGE.format(title=f"Item {i}", ns=0, id=i + 1, redirect='',
+                                     size=len(text), text=text))
+        for i in range(redirects):
+            f.write(DUMP_PAGE.format(title=f"Old Item {i}", ns=0, id=num_items + i + 1,
+                                     redirect=f'\n    <redirect title="Item {i}" />',
+                                     size=0, text=f"#REDIRECT [[Item {i}]]"))
+        f.write(DUMP_PAGE.format(title="Category:Tools", ns=14, id=0, redirect='', size=0,
+                                 text="Tools category"))
+        f.write("</mediawiki>\n")
@@ -0,0 +1,130 @@
+import sqlite3
+import pytest
+from core import archive as page_archive
+from core.archive import PageArchive, reparse
+from core.database.manager import DatabaseManager
+from test.mock_wiki import MockWikiServer
+
+def page(i, filler=40):
+    return (
+        f'<html><head><title>Item {i} - Mock Wiki</title></head><body>'
+        f'<div class="nav">{"<a href=/wiki/Main_Page>Main page</a>" * filler}</div>'
+        f'<p>Item {i} is a generated test item.</p>'
+        f'<a href="/wiki/Category:Tools">Tools</a></body></html>'
+    ).encode()
+
+@pytest.fixture
+def archive(tmp_path):
+    return PageArchive(str(tmp_path / "archive"), train_after=0)
+
+def test_put_and_get_round_trip(archive):
+    """Test pages come back byte for byte with their encoding."""
+    body = "<p>Café</p>".encode("cp1252")
+    archive.put("https://w.example/wiki/Cafe", body, "cp1252", "Cafe")
+    fetched = archive.get("https://w.example/wiki/Cafe")
+    assert fetched.body == body and fetched.encoding == "cp1252"
+    assert archive.get("https://w.example/wiki/Missing") is None
+
+def test_identical_bodies_are_stored_once(archive):
+    """Test content addressing dedupes identical pages."""
+    archive.put("https://w.example/wiki/A", page(1))
+    archive.put("https://w.example/wiki/A_redirect", page(1))
+    stats = archive.stats()
+    assert stats["pages"] == 2 and stats["objects"] == 1
+
+def test_domain_dictionary_improves_compression(tmp_path):
+    """Test a trained dictionary is used for later pages and old pages stay readable."""
+    archive = PageArchive(str(tmp_path / "archive"), train_after=0, dictionary_size=16 * 1024)
+    for i in range(300):
+        archive.put(f"https://w.example/wiki/Item_{i}", page(i))
+    before = archive.stats()
+
+    dict_id = archive.train_dictionary("https://w.example/")
+    assert dict_id
+    for i in range(300, 600):
+        archive.put(f"https://w.example/wiki/Item_{i}", page(i))
+    after = archive.stats()
+
+    plain = before["stored_bytes"] / before["objects"]
+    with_dictionary = (after["stored_bytes"] - before["stored_bytes"]) / (after["objects"] - before["objects"])
+    assert with_dictionary < plain / 2, "Dictionary compression should be much smaller"
+    assert archive.get("https://w.example/wiki/Item_5").body == page(5)
+    assert PageArchive(archive.root).get("https://w.example/wiki/Item_505").body == page(505)
+
+def test_put_opens_one_index_connection(tmp_path, monkeypatch):
+    """Test that archiving a page costs one index connection, including auto-training checks."""
+    archive = PageArchive(str(tmp_path / "archive"), train_after=10_000)
+    archive.put("https://w.example/wiki/Item_0", page(0))
+    connect = archive._connect
+    calls = []
+    monkeypatch.setattr(archive, "_connect", lambda: calls.append(1) or connect())
+    for i in range(1, 51):
+        archive.put(f"https://w.example/wiki/Item_{i}", page(i))
+    assert len(calls) == 50
+
+def test_newest_dictionary_wins(tmp_path):
+    """Test that the latest trained dictionary is used, whatever its id."""
+    archive = PageArchive(str(tmp_path / "archive"), train_after=0, dictionary_size=16 * 1024)
+    for i in range(300):
+        archive.put(f"https://w.example/wiki/Item_{i}", page(i))
+    first = archive.train_dictionary("w.example")
+    with archive._connect() as conn:
+        # An older dictionary with a higher id than any new one
+        conn.execute("UPDATE dictionaries SET dict_id = ?, created_at = 0", (2**32 - 1,))
+    second = archive.train_dictionary("w.example")
+    assert first and second
+    assert archive._domain_dictionary("w.example") == second
+    assert PageArchive(archive.root)._domain_dictionary("w.example") == second, \
+        "A fresh archive should pick the newest dictionary from the index"
+
+def test_zlib_fallback_without_zstandard(tmp_path, monkeypatch):
+    """Test pages are still archived when zstandard is missing."""
+    monkeypatch.setattr(page_archive, "zstandard", None)
+    archive = PageArchive(str(tmp_path / "archive"))
+    archive.put("https://w.example/wiki/A", page(1))
+    assert archive.get("https://w.example/wiki/A").body == page(1)
+    assert archive.train_dictionary("w.example") is None
+
+def test_reparse_updates_items_offline(tmp_path):
+    """Test crawling into an archive, then re-extracting with no server running."""
+    from core.scraper import scrape_items
+
+    root = str(tmp_path / "archive")
+    page_archive.enable(root)
+    try:
+        with MockWikiServer(num_items=30) as wiki:
+            scraped = scrape_items(wiki.url)
+    finally:
+        page_archive.disable()
+
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    db.add_items([(name, "stale description", None) for name, _, _ in scraped[:10]])
+
+    assert reparse(root, db, workers=2, chunk_size=7) == 30
+    rows = db.search_items()
+    assert sorted(rows) == sorted(scraped), "Reparse should reproduce the crawl and update stale rows"
+    assert len(rows) == 30
+
+def test_reparse_uses_each_domains_profile(tmp_path, monkeypatch):
+    """Test that a reparse of every domain picks up each one's stored profile, and fails when rows are dropped."""
+    root = str(tmp_path / "archive")
+    archive = PageArchive(root, train_after=0)
+    for host in ("a.example", "b.example"):
+        for i in range(3):
+            archive.put(f"https://{host}/wiki/Item_{i}", page(i), "utf-8", f"Item {i}")
+
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    db.add_domain("https://a.example/")
+    db.set_profile("https://a.example/", '{"description": "p.missing", "category": "a"}')
+
+    assert reparse(root, db, workers=1) == 6
+    with sqlite3.connect(db.db_path) as conn:
+        rows = dict(conn.execute("SELECT domain, COUNT(description) FROM items GROUP BY domain"))
+    assert rows == {"a.example": 0, "b.example": 3}, "Only a.example's pages should use its profile"
+
+    monkeypatch.setattr(DatabaseManager, "upsert_items", lambda self, rows: 0)
+    with pytest.raises(page_archive.ReparseIncomplete):
+        reparse(root, db, workers=1)
+    assert page_archive.main(["reparse", "--archive", root, "--db", db.db_path]) == 1
@@ -0,0 +1,79 @@
+import os
+import pytest
+from PIL import Image
+from core.assets import AssetStore
+from core.cache_manager import CacheManager
+from core.database.manager import DatabaseManager
+from core.scraper import crawl
+from test.mock_wiki import MockWikiServer, solid_png
+
+@pytest.fixture
+def store(tmp_path):
+    return AssetStore(str(tmp_path / "assets"), CacheManager(str(tmp_path / "cache")))
+
+def icon_urls(wiki):
+    return [f"{wiki.url}images/Item_{i}.png" for i in range(wiki.num_items)]
+
+def count_objects(store):
+    return sum(len(files) for _, _, files in os.walk(os.path.join(store.root, "objects")))
+
+def test_shared_icons_are_stored_once(store):
+    """Test that icons with the same bytes share one object and one thumbnail."""
+    with MockWikiServer(num_items=30) as wiki:
+        urls = icon_urls(wiki)
+        stored = store.fetch(urls + urls[:5] + [None], concurrency=8, workers=2)
+        requests_made = sum(wiki.paths.values())
+        again = store.fetch(urls)
+        requests_after = sum(wiki.paths.values())
+
+    assert len(stored) == 30, "Every icon URL should be stored"
+    assert len(set(stored.values())) == 3, "One digest per category icon"
+    assert count_objects(store) == 3, "Identical icons should be written once"
+    assert requests_made == 30, "Duplicate URLs should be downloaded once"
+    assert again == stored and requests_after == requests_made, "Stored icons should not be fetched again"
+
+def test_thumbnails_lookup(store):
+    """Test that thumbnails are rendered ahead of time and looked up without rendering."""
+    with MockWikiServer(num_items=3) as wiki:
+        urls = icon_urls(wiki)
+        store.fetch(urls[:2])
+
+    paths = store.thumbnails(urls + ["https://example.com/unknown.png"])
+
+    assert paths[urls[0]] and paths[urls[1]], "Fetched icons should have thumbnails"
+    assert paths[urls[2]] is None, "Icons not fetched yet should map to None"
+    assert paths["https://example.com/unknown.png"] is None
+    with Image.open(paths[urls[0]]) as img:
+        assert img.size == store.thumbnail_size
+
+def test_non_images_are_skipped(store):
+    """Test that pages served where an icon was expected are not stored."""
+    with MockWikiServer(num_items=3) as wiki:
+        stored = store.fetch([wiki.url + "wiki/Item_1", wiki.url + "images/Missing.png"])
+    assert stored == {}
+    assert count_objects(store) == 0
+
+def test_cache_manager_thumbnails(tmp_path):
+    """Test that thumbnail lookups only render when given a source, within the size limit."""
+    cache = CacheManager(str(tmp_path / "cache"))
+    source = tmp_path / "icon.png"
+    source.write_bytes(solid_png((200, 10, 10), size=64))
+
+    assert cache.get_cached_thumbnail("abc", (32, 32)) is None, "A miss without a source should not block"
+    path = cache.get_cached_thumbnail("abc", (32, 32), str(source))
+    assert path and cache.get_cached_thumbnail("abc", (32, 32)) == path
+
+    cache.max_size = os.path.getsize(path)
+    cache.get_cached_thumbnail("def", (32, 32), str(source))
+    assert len(cache.get_cached_thumbnails(["abc", "def"], (32, 32))) == 1, "Size limit should evict the oldest"
+
+def test_crawl_downloads_icons(tmp_path, store):
+    """Test that a crawl with an asset store fetches every item's icon."""
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    with MockWikiServer(num_items=12) as wiki:
+        stats = crawl(db, [wiki.url], backend="html", assets=store)
+        urls = icon_urls(wiki)
+
+    assert stats.items_saved == 12
+    assert all(store.thumbnails(urls).values()), "Every item's icon should have a thumbnail"
@@ -0,0 +1,26 @@
+import pytest
+from core.bloom import BloomFilter
+
+def test_bloom_filter_membership():
+    """Test that added items are always found and new items report as added."""
+    bloom = BloomFilter(capacity=1000)
+    urls = [f"https://example.com/wiki/Item_{i}" for i in range(1000)]
+    assert all(bloom.add(url) for url in urls), "First add of each URL should succeed"
+    assert all(url in bloom for url in urls), "Bloom filters never give false negatives"
+    assert not bloom.add(urls[0]), "Re-adding should report the URL as seen"
+    assert len(bloom) == 1000
+
+def test_bloom_filter_false_positive_rate():
+    """Test the false positive rate stays near the configured target."""
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.add(f"seen-{i}")
+    false_positives = sum(f"unseen-{i}" in bloom for i in range(10000))
+    assert false_positives < 200, f"Expected ~1% false positives, got {false_positives / 100:.1f}%"
+
+def test_bloom_filter_memory_is_fixed():
+    """Test that memory is sized from capacity, not from what is added."""
+    bloom = BloomFilter(capacity=1_000_000)
+    assert bloom.nbytes < 3 * 1024 * 1024
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=0)
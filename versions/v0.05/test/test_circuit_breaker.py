@@ -0,0 +1,160 @@
+import socket
+import time
+import pytest
+from core import scraper
+from core.circuit_breaker import BREAKERS, CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from core.database.frontier import CrawlFrontier
+from core.database.manager import DatabaseManager
+from test.mock_wiki import MockWikiServer
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    BREAKERS.reset()
+    yield
+    BREAKERS.configure(failure_threshold=5, cooldown=30.0)
+
+def dead_url():
+    # A port nothing listens on refuses connections immediately
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/wiki/Item_0"
+
+def test_breaker_state_transitions():
+    """Test that a breaker opens, probes after the cool-down and closes again."""
+    clock = FakeClock()
+    breaker = CircuitBreaker("example.com", failure_threshold=3, cooldown=10, clock=clock)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED, "Should stay closed below the threshold"
+    breaker.record_failure()
+    assert breaker.state == OPEN, "Should open at the threshold"
+    assert not breaker.allow(), "Open breaker should refuse requests"
+
+    clock.now = 10
+    assert breaker.state == HALF_OPEN, "Should half-open once the cool-down passes"
+    assert breaker.allow(), "First probe should go through"
+    assert not breaker.allow(), "Only one probe at a time"
+    breaker.record_failure()
+    assert breaker.state == OPEN, "A failed probe should reopen the breaker"
+    assert breaker.retry_in() == 10
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED, "A successful probe should close the breaker"
+
+def test_success_resets_failure_count():
+    """Test that only consecutive failures trip the breaker."""
+    breaker = CircuitBreaker("example.com", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED, "Failures separated by a success should not trip it"
+
+def test_dead_domain_fails_fast():
+    """Test that requests to a dead host are refused once its breaker opens."""
+    BREAKERS.configure(failure_threshold=2, cooldown=60)
+    url = dead_url()
+    for _ in range(2):
+        assert scraper.fetch_page_content(url) is None
+    assert BREAKERS.for_url(url).state == OPEN, "Refused connections should trip the breaker"
+
+    start = time.perf_counter()
+    for _ in range(50):
+        assert scraper.fetch_page_content(url) is scraper.CIRCUIT_OPEN, "Refusals should be told apart"
+    assert time.perf_counter() - start < 0.5, "Open breaker should not touch the network"
+    assert BREAKERS.open_domains() == [url.split("/")[2]]
+
+def test_missing_pages_do_not_trip_breaker():
+    """Test that 404s count as answers, not as an unhealthy host."""
+    BREAKERS.configure(failure_threshold=2)
+    with MockWikiServer(num_items=5) as wiki:
+        for i in range(5):
+            assert scraper.fetch_page_content(f"{wiki.url}wiki/No_such_page_{i}") is scraper.PAGE_GONE
+        assert BREAKERS.for_url(wiki.url).state == CLOSED
+        assert scraper.fetch_page_content(f"{wiki.url}wiki/Item_0") is not None
+
+def test_frontier_crawl_pauses_dead_domain(tmp_path):
+    """Test that a crawl leaves a dead domain's URLs queued without burning attempts."""
+    BREAKERS.configure(failure_threshold=2, cooldown=60)
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    frontier = CrawlFrontier(str(tmp_path / "frontier.db"), max_attempts=3, base_delay=0)
+    frontier.initialize()
+    url = dead_url()
+    domain = url.split("/wiki/")[0] + "/"
+    frontier.add(domain, [(f"Item {i}", f"{domain}wiki/Item_{i}") for i in range(20)])
+
+    stats = scraper.crawl_frontier(frontier, db, domain, "worker", concurrency=2)
+
+    counts = frontier.counts(domain)
+    assert stats.failed_domains == [domain]
+    assert counts["failed"] == 0, "Nothing should be given up on while the domain is paused"
+    assert counts["pending"] == 20, "Every URL should stay queued for a later run"
+
+def test_half_open_refusals_are_released(tmp_path):
+    """Test that URLs refused while a probe is in flight are released, not failed."""
+    BREAKERS.configure(failure_threshold=1, cooldown=0, half_open_max=1)
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    frontier = CrawlFrontier(str(tmp_path / "frontier.db"), max_attempts=3, base_delay=0)
+    frontier.initialize()
+    with MockWikiServer(num_items=8) as wiki:
+        frontier.add(wiki.url, [(f"Item {i}", f"{wiki.url}wiki/Item_{i}") for i in range(8)])
+        breaker = BREAKERS.for_url(wiki.url)
+        breaker.record_failure()
+        assert breaker.allow(), "Take the half-open probe, as another request would"
+
+        domain = wiki.url
+        stats = scraper.crawl_frontier(frontier, db, domain, "worker", concurrency=4)
+
+    counts = frontier.counts(domain)
+    assert breaker.state == HALF_OPEN
+    assert counts["failed"] == 0, "Refused URLs should not use up attempts"
+    assert counts["pending"] == 8 and stats.failed_domains == [domain]
+
+def test_detection_uses_breaker():
+    """Test that api.php and robots.txt probes go through the domain's breaker."""
+    from core import mediawiki
+    from core.sitemap import RobotsRules
+    BREAKERS.configure(failure_threshold=1, cooldown=60)
+    mediawiki._detected.clear()
+    url = dead_url()
+    assert mediawiki.detect_api(url) is None
+    assert BREAKERS.for_url(url).state == OPEN, "A failed probe should count against the domain"
+
+    start = time.perf_counter()
+    assert mediawiki.detect_api(url) is None
+    assert RobotsRules.fetch(url).can_fetch(url), "Unreachable robots.txt should allow everything"
+    assert time.perf_counter() - start < 0.5, "Open breaker should skip the probes"
+    assert mediawiki._detected == {}, "An unreachable site should not be cached as non-MediaWiki"
+
+def test_api_and_sitemap_requests_use_breaker_and_timeout(monkeypatch):
+    """Test that api.php queries and sitemap reads share the breaker and configured timeouts."""
+    from core import mediawiki, network, sitemap
+    from core.circuit_breaker import CircuitOpenError
+    monkeypatch.setattr(network, "TIMEOUT", network.TIMEOUT)
+    network.configure(connect_timeout=0.5, read_timeout=2, breaker_threshold=1, breaker_cooldown=60)
+    url = dead_url()
+    site = url.split("/wiki/")[0]
+
+    client = mediawiki.MediaWikiClient(site + "/api.php")
+    seen = []
+    real_get = client.session.get
+    client.session.get = lambda *args, **kwargs: seen.append(kwargs["timeout"]) or real_get(*args, **kwargs)
+    assert client._get({"meta": "siteinfo"}, "siteinfo") is None
+    assert seen == [(0.5, 2)], "api.php queries should use the configured timeouts"
+    assert BREAKERS.for_url(url).state == OPEN, "A failed query should count against the domain"
+    assert client._get({"meta": "siteinfo"}, "siteinfo") is None
+    assert len(seen) == 1, "Open breaker should skip the query"
+
+    with pytest.raises(CircuitOpenError):
+        sitemap.read_sitemap(site + "/sitemap.xml")
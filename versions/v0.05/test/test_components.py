@@ -0,0 +1,105 @@
+import time
+import pytest
+from kivy.uix.popup import Popup
+from core.ui.theme import Theme
+from core.ui.components import UIFactory
+
+@pytest.fixture
+def factory():
+    return UIFactory(Theme())
+
+def close(popup):
+    """Close a popup immediately, skipping the fade animations."""
+    Popup.dismiss(popup, animation=False)
+
+def test_checkin_reuses_button(factory):
+    """Test that a returned button is handed out again, re-themed."""
+    clicks = []
+    first = factory.checkout('button', text="One", callback=lambda b: clicks.append("one"))
+    first.color = (1, 0, 0, 1)
+    factory.checkin(first)
+
+    second = factory.checkout('button', text="Two", callback=lambda b: clicks.append("two"))
+    assert second is first, "Pooled button should be reused"
+    assert second.text == "Two", "Checkout should apply new properties"
+    assert list(second.color) == list(factory.style.colors['text']), "Checkout should re-theme"
+
+    second.dispatch('on_press')
+    assert clicks == ["two"], "Old callback should be unbound on checkin"
+
+def test_list_popup_recycled_on_close(factory):
+    """Test that closing a list popup returns it and its rows to the pool."""
+    popup = factory.checkout_list_popup(title="Domains")
+    for name in ("a", "b", "c"):
+        popup.rows.add_widget(factory.checkout('button', text=name))
+    popup.open()
+    close(popup)
+
+    assert popup.rows.children == [], "Rows should be detached from the popup"
+    assert factory.pool.free_count('button') == 3
+    assert factory.checkout_list_popup(title="Search Results") is popup
+    assert popup.title == "Search Results"
+
+def test_checkout_overrides_do_not_leak(factory):
+    """Test that properties set by one checkout are gone at the next."""
+    first = factory.checkout('label', text="Stat", size_hint_y=None, height=30, pos_hint={'x': 0})
+    factory.checkin(first)
+
+    second = factory.checkout('label', text="Result")
+    assert second is first
+    assert second.size_hint_y == 1 and second.height == 100, "Size from the last checkout should be undone"
+    assert second.pos_hint == {}
+
+    popup = factory.checkout_list_popup(title="Stats", auto_dismiss=False)
+    popup.open()
+    close(popup)
+    assert factory.checkout_list_popup(title="Search") is popup
+    assert popup.auto_dismiss is True, "Popup options should be undone too"
+
+def test_stale_fade_out_cannot_close_reused_popup(factory):
+    """Test that reopening a popup cancels a fade-out still running from its last use."""
+    from kivy.clock import Clock
+    popup = factory.checkout_list_popup(title="Domains")
+    popup.open()
+    popup.dismiss()  # Popup.dismiss only runs once the fade-out completes
+    popup.open()
+
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:
+        Clock.tick()
+    assert popup._window is not None, "The old fade-out should not close the reopened popup"
+    close(popup)
+
+def test_reopening_popup_allocates_nothing(factory):
+    """Test that reopening a dialog reuses every widget."""
+    def open_dialog():
+        popup = factory.checkout_list_popup(title="Domains")
+        rows = [factory.checkout('button', text=str(i)) for i in range(5)]
+        for row in rows:
+            popup.rows.add_widget(row)
+        popup.open()
+        close(popup)
+        return {id(popup)} | {id(row) for row in rows}
+
+    first = open_dialog()
+    assert open_dialog() == first, "Second open should reuse the same widgets"
+
+def test_ripples_are_bounded(factory):
+    """Test that rapid taps reuse a fixed set of canvas instructions."""
+    button = factory.create_button(text="Tap")
+    for i in range(50):
+        button._create_ripple((i, i))
+    assert len(button._ripples) == button.max_ripples, "Ripple slots should be capped"
+    count = len(button.ripple_group.children)
+    for i in range(50):
+        button._create_ripple((i, i))
+    assert len(button.ripple_group.children) == count, "Canvas should not grow with taps"
+
+def test_quick_taps_use_separate_ripples(factory):
+    """Test that two quick taps animate two different ellipses."""
+    button = factory.create_button(text="Tap")
+    button._create_ripple((0, 0))
+    button._create_ripple((100, 100))
+    (_, first), (_, second) = button._ripples
+    assert first.pos[0] < 50 < second.pos[0], "The second tap should not restart the first ripple"
+    assert second.size[0] > 0, "The second slot should be animating"
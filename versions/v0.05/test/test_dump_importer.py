@@ -0,0 +1,85 @@
+import pytest
+from core.database.manager import DatabaseManager
+from core.dump_importer import ImportIncomplete, import_dump, iter_pages, main, open_dump, parse_wikitext
+from test.mock_wiki import write_xml_dump
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    return db
+
+def test_parse_wikitext_matches_html_scraper():
+    """Test wikitext reduces to the same description and category as the rendered page."""
+    text = (
+        "{{Infobox|name={{Nested|x}}}}\n"
+        "[[File:Ore.png|thumb|An [[ore]]]]\n"
+        "'''Copper Ore''' is a [[Resources|resource]] found near [https://example.com vents].<ref>x</ref>\n"
+        "Second paragraph.\n"
+        "[[Category:Raw Materials|Copper]]\n[[Category:Ores]]\n"
+    )
+    assert parse_wikitext(text) == (
+        "Copper Ore is a resource found near vents.", "Raw Materials"
+    )
+    assert parse_wikitext("") == (None, None)
+
+@pytest.mark.parametrize("suffix", [".xml", ".xml.gz", ".xml.bz2"])
+def test_import_dump(db, tmp_path, suffix):
+    """Test importing plain and compressed dumps in batches."""
+    path = str(tmp_path / f"dump{suffix}")
+    write_xml_dump(path, num_items=250, redirects=5)
+
+    messages = []
+    assert import_dump(path, db, batch_size=100, callback=messages.append) == 250
+    assert len(messages) == 3, "Rows should be written in three batches"
+
+    rows = db.search_items(keyword="Item 7")
+    assert ("Item 7", "Item 7 is a generated test item.", "Tools") in rows
+    assert not db.search_items(keyword="Old Item"), "Redirects should be skipped"
+
+def test_iter_pages_filters_namespaces(tmp_path):
+    """Test namespace selection."""
+    path = str(tmp_path / "dump.xml")
+    write_xml_dump(path, num_items=3)
+    with open_dump(path) as f:
+        assert [title for title, _ in iter_pages(f, namespaces=(14,))] == ["Category:Tools"]
+
+def test_reimport_with_base_url(db, tmp_path):
+    """Test that items imported with their page URLs are updated, not duplicated, on re-import."""
+    path = str(tmp_path / "dump.xml")
+    write_xml_dump(path, num_items=50)
+    for _ in range(2):
+        import_dump(path, db, base_url="https://w.example/")
+    assert len(db.search_items()) == 50
+
+def test_reimport_uses_siteinfo_base(db, tmp_path):
+    """Test that without a base URL the dump's siteinfo gives items their URLs."""
+    import sqlite3
+    path = str(tmp_path / "dump.xml")
+    write_xml_dump(path, num_items=50)
+    for _ in range(2):
+        import_dump(path, db)
+    assert len(db.search_items()) == 50, "A re-import should update the same rows"
+    with sqlite3.connect(db.db_path) as conn:
+        (url,) = conn.execute("SELECT url FROM items WHERE name = 'Item 7'").fetchone()
+    assert url == "https://mock.example/wiki/Item_7"
+
+def test_failed_batches_are_reported(db, tmp_path, monkeypatch):
+    """Test that rows the database drops make the import and the CLI fail."""
+    path = str(tmp_path / "dump.xml")
+    write_xml_dump(path, num_items=250)
+    add_items = db.add_items
+    calls = []
+
+    def flaky_add_items(rows):
+        calls.append(rows)
+        return 0 if len(calls) == 2 else add_items(rows)
+
+    monkeypatch.setattr(db, "add_items", flaky_add_items)
+    with pytest.raises(ImportIncomplete) as error:
+        import_dump(path, db, batch_size=100)
+    assert (error.value.written, error.value.dropped) == (150, 100)
+    assert len(db.search_items()) == 150, "Later batches should still be imported"
+
+    monkeypatch.setattr(DatabaseManager, "add_items", lambda self, rows: 0)
+    assert main([path, "--db", str(tmp_path / "cli.db")]) == 1
@@ -0,0 +1,97 @@
+import json
+import sqlite3
+import pytest
+from bs4 import BeautifulSoup
+from core.database.manager import DatabaseManager
+from core.extraction import ExtractionProfile, compile_selector, load_profile
+from core.scraper import crawl, extract_item_details, scrape_item_details
+from test.mock_wiki import MockWikiServer
+
+TABLE_INFOBOX_PAGE = """
+<html><body>
+    <table class="infobox">
+        <tr><td colspan="2"><img src="/images/Sword.png"></td></tr>
+        <tr><th>Damage</th><td>12</td></tr>
+        <tr><th>Type</th><td>Melee <b>weapon</b></td></tr>
+    </table>
+    <p>A plain sword.</p>
+    <span class="rarity">Common</span>
+    <a href="https://wiki.example.com/wiki/Category:Weapons">Weapons</a>
+</body></html>
+"""
+
+class CountingSelector:
+    def __init__(self, selector, calls):
+        self.selector = selector
+        self.calls = calls
+
+    def match(self, element):
+        self.calls.append(element)
+        return self.selector.match(element)
+
+def test_default_profile_reads_table_infobox():
+    """Test that the built-in profile reads description, category, icon and infobox rows."""
+    details = extract_item_details(TABLE_INFOBOX_PAGE, url="https://wiki.example.com/wiki/Sword")
+
+    assert details["description"] == "A plain sword."
+    assert details["category"] == "Weapons", "Absolute category links should match"
+    assert details["icon_url"] == "https://wiki.example.com/images/Sword.png", "Icon URL should be absolute"
+    assert details["attributes"] == {"Damage": "12", "Type": "Melee weapon"}
+
+def test_custom_profile_from_json():
+    """Test that a stored JSON profile extends the default with extra fields."""
+    spec = json.dumps({"extends": "default", "description": "p", "fields": {"rarity": ".rarity"},
+                       "icon": "img@alt"})
+    details = extract_item_details(TABLE_INFOBOX_PAGE, spec)
+
+    assert details["attributes"]["rarity"] == "Common"
+    assert details["attributes"]["Damage"] == "12", "Infobox selectors should come from the default"
+    assert details["icon_url"] is None, "Missing attributes should read as None"
+
+def test_single_walk_stops_when_all_fields_found():
+    """Test that extraction stops walking the page once every field is found."""
+    profile = ExtractionProfile(description="p", category="span")
+    filler = "<div>filler</div>" * 1000
+    soup = BeautifulSoup(f"<p>First</p><span>Cat</span>{filler}", "html.parser")
+    matched = []
+    original = profile._targets
+    profile._targets = [(key, CountingSelector(selector, matched), attr) for key, selector, attr in original]
+
+    details = profile.extract(soup)
+
+    assert details["description"] == "First" and details["category"] == "Cat"
+    assert len(matched) < 10, "Walk should end as soon as every field matched"
+
+def test_selectors_are_compiled_once():
+    """Test that profiles share cached compiled selectors."""
+    assert compile_selector("p") is compile_selector("p")
+    assert load_profile("default") is load_profile("default")
+
+def test_invalid_profiles_are_rejected():
+    """Test that bad specs fail with ValueError instead of at scrape time."""
+    with pytest.raises(ValueError):
+        load_profile("no-such-profile")
+    with pytest.raises(ValueError):
+        load_profile(json.dumps({"description": "p[["}))
+    with pytest.raises(ValueError):
+        load_profile(json.dumps({"descripton": "p"}))
+
+def test_crawl_stores_profile_fields(tmp_path):
+    """Test that a crawl saves icons and infobox attributes with each item."""
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    with MockWikiServer(num_items=5) as wiki:
+        db.add_domain(wiki.url)
+        assert db.set_profile(wiki.url, "default")
+        assert db.get_profile(wiki.url) == "default"
+        details = scrape_item_details("Item 2", wiki.url + "wiki/Item_2")
+        stats = crawl(db, [wiki.url], backend="html")
+        icon = wiki.url + "images/Item_2.png"
+
+    assert details["icon_url"] == icon
+    assert details["attributes"] == {"Rarity": "Epic", "Weight": "3 kg"}
+    assert stats.items_saved == 5
+    with sqlite3.connect(db.db_path) as conn:
+        row = conn.execute("SELECT icon_url, attributes FROM items WHERE name = 'Item 2'").fetchone()
+    assert row[0] == icon
+    assert json.loads(row[1])["Rarity"] == "Epic"
@@ -0,0 +1,153 @@
+import threading
+import pytest
+from core.database.frontier import CrawlFrontier
+from core.database.manager import DatabaseManager
+
+DOMAIN = "https://example.com/"
+
+@pytest.fixture
+def frontier(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "frontier.db"), max_attempts=3, base_delay=0)
+    frontier.initialize()
+    return frontier
+
+def links(count):
+    return [(f"Item {i}", f"{DOMAIN}wiki/Item_{i}") for i in range(count)]
+
+def test_add_ignores_known_urls(frontier):
+    """Test that reseeding a domain does not duplicate URLs."""
+    assert frontier.add(DOMAIN, links(5)) == 5
+    assert frontier.add(DOMAIN, links(8)) == 3, "Only new URLs should be queued"
+    assert frontier.counts(DOMAIN)["pending"] == 8
+
+def test_concurrent_claims_are_exclusive(frontier):
+    """Test that workers sharing a frontier never claim the same URL."""
+    frontier.add(DOMAIN, links(200))
+    claimed = {}
+
+    def worker(worker_id):
+        mine = claimed.setdefault(worker_id, [])
+        while True:
+            batch = CrawlFrontier(frontier.db_path).claim(worker_id, limit=7)
+            if not batch:
+                return
+            mine.extend(entry.url for entry in batch)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    urls = [url for batch in claimed.values() for url in batch]
+    assert len(urls) == 200
+    assert len(set(urls)) == 200, "Each URL should be claimed exactly once"
+    assert frontier.counts()["claimed"] == 200
+
+def test_failures_back_off_then_give_up(frontier):
+    """Test retry scheduling and the attempt limit."""
+    frontier.base_delay = 10
+    assert [frontier.backoff(n) for n in (1, 2, 3)] == [10, 20, 40]
+
+    frontier.add(DOMAIN, links(1))
+    entry, = frontier.claim("w1")
+    frontier.fail(entry, "timeout")
+    assert frontier.claim("w1") == [], "A failed URL should wait out its backoff"
+    assert 9 < frontier.next_due(DOMAIN) <= 10
+
+    frontier.base_delay = 0
+    for _ in range(2):
+        frontier._execute("UPDATE frontier SET next_attempt_at = 0")
+        entry, = frontier.claim("w1")
+        frontier.fail(entry, "timeout")
+
+    assert entry.attempts == 3
+    assert frontier.counts(DOMAIN)["failed"] == 1, "URL should be parked after max_attempts"
+    assert frontier.next_due(DOMAIN) is None
+    assert frontier.retry_failed(DOMAIN) == 1
+
+def test_stale_claims_are_released(frontier):
+    """Test that URLs held by a dead worker are handed out again."""
+    frontier.add(DOMAIN, links(3))
+    assert len(frontier.claim("dead-worker", limit=3)) == 3
+    frontier.claim_timeout = -1
+    assert frontier.release_stale() == 3
+    assert len(frontier.claim("w2", limit=3)) == 3
+
+def test_crawl_resumes_from_frontier(tmp_path):
+    """Test that a second crawl only scrapes what the first left unfinished."""
+    from core.scraper import crawl
+    from test.mock_wiki import MockWikiServer
+
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    frontier = CrawlFrontier(str(tmp_path / "items.db"), base_delay=0)
+    frontier.initialize()
+
+    with MockWikiServer(num_items=20, rate_limit_every=4) as wiki:
+        # Simulate a crawl that died after finishing five URLs
+        frontier.add(wiki.url, [(wiki.item_name(i), wiki.url + wiki.item_path(i)[1:]) for i in range(20)])
+        for entry in frontier.claim("first-run", limit=5):
+            frontier.complete(entry.id)
+
+        stats = crawl(db, [wiki.url], concurrency=3, frontier=frontier, worker_id="second-run")
+        done = frontier.counts(wiki.url)["done"]
+        item_requests = sum(count for path, count in wiki.paths.items() if path.startswith("/wiki/Item_"))
+
+    assert stats.items_saved == 15, "Only unfinished URLs should be scraped"
+    assert not stats.failed_domains
+    assert wiki.status_counts[429] > 0, "Rate limited fetches should have been retried"
+    assert item_requests == 15 + wiki.status_counts[429]
+    assert done == 20
+
+def test_crawl_gives_up_on_missing_pages_and_skips_backoff(tmp_path):
+    """Test that 404s fail at once and URLs backing off are left for the next run."""
+    import time
+    from core.scraper import crawl_frontier
+    from test.mock_wiki import MockWikiServer
+
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    frontier = CrawlFrontier(str(tmp_path / "frontier.db"), max_attempts=5, base_delay=600)
+    frontier.initialize()
+
+    with MockWikiServer(num_items=5, rate_limit_every=2) as wiki:
+        domain = wiki.url
+        # Claimed first, so it is the request the rate limit lets through
+        frontier.add(domain, [("Missing", wiki.url + "wiki/No_such_page")])
+        frontier.add(domain, [(wiki.item_name(i), wiki.url + wiki.item_path(i)[1:]) for i in range(5)])
+        start = time.perf_counter()
+        crawl_frontier(frontier, db, domain, "worker", concurrency=1)
+        elapsed = time.perf_counter() - start
+
+    conn = frontier._connect()
+    state, attempts = conn.execute("SELECT state, attempts FROM frontier WHERE name = 'Missing'").fetchone()
+    conn.close()
+    counts = frontier.counts(domain)
+    assert (state, attempts) == ("failed", 1), "A 404 should not be retried"
+    assert counts["pending"] > 0, "Rate limited URLs should stay queued with their backoff"
+    assert elapsed < 5, "The crawl should not wait for backoffs to come due"
+
+def test_resumed_sitemap_crawl_follows_robots(tmp_path):
+    """Test that a resumed frontier crawl still honours robots.txt disallow and crawl-delay."""
+    import time
+    from core.scraper import crawl_frontier
+    from test.mock_wiki import MockWikiServer
+
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    frontier = CrawlFrontier(str(tmp_path / "frontier.db"), base_delay=0)
+    frontier.initialize()
+
+    with MockWikiServer(num_items=4, crawl_delay=0.2, disallow=("/wiki/Item_3",)) as wiki:
+        domain = wiki.url
+        frontier.add(domain, [(wiki.item_name(i), wiki.url + wiki.item_path(i)[1:]) for i in range(4)])
+        start = time.perf_counter()
+        crawl_frontier(frontier, db, domain, "worker", concurrency=4, discovery="sitemap")
+        elapsed = time.perf_counter() - start
+        disallowed_requests = wiki.paths.get("/wiki/Item_3", 0)
+
+    counts = frontier.counts(domain)
+    assert disallowed_requests == 0, "Disallowed URLs should not be fetched"
+    assert (counts["done"], counts["failed"]) == (3, 1)
+    assert elapsed >= 0.4, "Fetches should be spaced by the crawl-delay"
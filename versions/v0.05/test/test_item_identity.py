@@ -0,0 +1,99 @@
+import sqlite3
+import pytest
+from core.database.manager import DatabaseManager
+from core.scraper import crawl
+from test.mock_wiki import MockWikiServer
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    return db
+
+def item_rows(db):
+    with sqlite3.connect(db.db_path) as conn:
+        return conn.execute("SELECT name, url, content_hash, updated_at FROM items ORDER BY name").fetchall()
+
+def test_same_url_is_one_item(db):
+    """Test that spellings of one page URL update a single row."""
+    db.add_item("Copper Ore", "Old", "Ores", url="https://w.example/wiki/Copper_Ore")
+    db.add_item("Copper Ore", "New", "Ores", url="https://W.example/w/index.php?title=Copper_Ore")
+    db.add_items([("Copper Ore", "Newer", "Ores", None, None, "https://w.example/wiki/Copper%20Ore#Uses")])
+
+    assert db.search_items() == [("Copper Ore", "Newer", "Ores")]
+    assert item_rows(db)[0][1] == "https://w.example/wiki/Copper_Ore"
+
+def test_recrawl_skips_unchanged_items(db):
+    """Test that crawling twice keeps one row per page and only rewrites changed content."""
+    with MockWikiServer(num_items=20) as wiki:
+        assert crawl(db, [wiki.url], backend="html").items_saved == 20
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute("UPDATE items SET updated_at = '2000-01-01 00:00:00'")
+            conn.execute("UPDATE items SET content_hash = 'stale' WHERE name = 'Item 3'")
+        assert crawl(db, [wiki.url], backend="html").items_saved == 20
+
+    rows = item_rows(db)
+    assert len(rows) == 20, "A re-crawl should not duplicate items"
+    assert len({url for _, url, _, _ in rows}) == 20
+    changed = [name for name, _, _, updated_at in rows if updated_at != '2000-01-01 00:00:00']
+    assert changed == ["Item 3"], "Only the row whose content hash differs should be rewritten"
+
+def test_dedupe_migration(tmp_path):
+    """Test that opening a legacy database collapses its duplicate items once."""
+    path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                     "description TEXT, category TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.executemany("INSERT INTO items (name, description, category) VALUES (?, ?, ?)",
+                         [(f"Item {i % 50}", f"Version {i}", "Tools") for i in range(200)])
+
+    db = DatabaseManager(path)
+    db.initialize_database()
+    rows = db.search_items()
+    assert len(rows) == 50, "One row per legacy item should remain"
+    assert ("Item 7", "Version 157", "Tools") in rows, "The newest copy should be kept"
+
+    db.add_items([("Item 7", "Legacy again", "Tools")] * 2)
+    db.initialize_database()
+    assert len(db.search_items(keyword="Item 7")) == 3, "The migration should only run once"
+
+def test_crawl_keeps_items_without_url(db, tmp_path):
+    """Test that a crawl never deletes url-less items, which may belong to another game."""
+    db.add_items([("Item 3", "From another game's dump", "Ores"), ("Item 5", "Saved by hand", None)])
+    with MockWikiServer(num_items=8) as wiki:
+        assert crawl(db, [wiki.url], backend="html").items_saved == 8
+
+    rows = db.search_items()
+    assert len(rows) == 10
+    assert ("Item 3", "From another game's dump", "Ores") in rows
+    assert ("Item 5", "Saved by hand", None) in rows
+
+def test_fresh_database_needs_no_migration(tmp_path):
+    """Test that a new database is created with every column instead of altered into shape."""
+    import logging
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("questvault.database")
+    logger.addHandler(handler)
+    try:
+        DatabaseManager(str(tmp_path / "fresh.db")).initialize_database()
+    finally:
+        logger.removeHandler(handler)
+    assert not [r for r in records if "Added column" in r.getMessage()]
+
+def test_items_are_only_matched_within_their_domain(db):
+    """Test that url-less rows and the legacy cleanup never touch another wiki's item."""
+    db.add_items([("Copper Ore", "Game A", "Ores", None, None, "https://a.example/wiki/Copper_Ore")])
+    assert db.upsert_items([("Copper Ore", "Hand written", "Ores")]) == 1
+    assert sorted(db.search_items()) == [("Copper Ore", "Game A", "Ores"), ("Copper Ore", "Hand written", "Ores")]
+
+    with sqlite3.connect(db.db_path) as conn:
+        conn.executemany("INSERT INTO items (name, description, domain) VALUES (?, ?, ?)",
+                         [("Copper Ore", "Old copy from A", "a.example"),
+                          ("Copper Ore", "Game B", "b.example")])
+        conn.execute("PRAGMA user_version = 0")
+    db.initialize_database()
+    descriptions = sorted(description for _, description, _ in db.search_items())
+    assert descriptions == ["Game A", "Game B", "Hand written"], \
+        "Only the url-less copy from the same domain should be removed"
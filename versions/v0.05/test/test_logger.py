@@ -0,0 +1,114 @@
+import glob
+import json
+import logging
+import os
+import pytest
+from core.logger import (ColoredFormatter, DeferredQueueHandler, LazyRotatingFileHandler,
+                         configure_logging, setup_logger, shutdown_logging,
+                         log_scraping_status, span, summarize_spans)
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    """Run each test with its own dev/dev-debug directory."""
+    shutdown_logging()
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path / 'dev' / 'dev-debug'
+    shutdown_logging()
+
+def read_logs(log_dir):
+    return ''.join(open(path).read() for path in glob.glob(str(log_dir / '*.log')))
+
+def test_queue_mode_writes_on_listener_thread(log_dir):
+    """Test that queued records reach the log file once drained."""
+    configure_logging(use_queue=True, file_level=logging.DEBUG)
+    logger = setup_logger('test.queue', use_queue=True)
+    log_scraping_status(logger, 'Titanium Ingot')
+    log_scraping_status(logger, 'Quartz', success=False)
+    shutdown_logging()
+
+    contents = read_logs(log_dir)
+    assert 'Found item: Titanium Ingot' in contents
+    assert 'Failed to fetch details for Quartz' in contents
+
+def test_queue_handler_defers_formatting(log_dir):
+    """Test that records are queued with their arguments unmerged."""
+    logger = setup_logger('test.deferred', use_queue=True)
+    handler, = [h for h in logger.parent.handlers if isinstance(h, DeferredQueueHandler)]
+    record = logger.makeRecord('test', logging.DEBUG, __file__, 1, 'Found %s', ('x',), None)
+    assert handler.prepare(record).args == ('x',), "Args should be formatted later"
+
+def test_subsystems_share_one_configuration(log_dir):
+    """Test that repeated setup_logger calls reuse the same handlers."""
+    database = setup_logger('database')
+    resources = setup_logger('resources')
+    assert database.name == 'questvault.database'
+    assert not database.handlers and not resources.handlers, "Children should propagate"
+    file_handlers = [h for h in logging.getLogger('questvault').handlers
+                     if isinstance(h, LazyRotatingFileHandler)]
+    assert len(file_handlers) == 1, "Handlers should be added once"
+
+    database.info('opened')
+    resources.info('loaded')
+    assert len(glob.glob(str(log_dir / '*.log'))) == 1, "One log file should be shared"
+
+def test_no_log_file_until_first_record(log_dir):
+    """Test that configuring logging doesn't touch the filesystem."""
+    logger = setup_logger('quiet')
+    assert not log_dir.exists(), "Log directory should be created lazily"
+    logger.info('first record')
+    assert read_logs(log_dir).count('first record') == 1
+
+def test_disabled_level_skips_formatting(log_dir):
+    """Test that filtered calls never format their arguments."""
+    class Explosive:
+        def __str__(self):
+            raise AssertionError("Message should not be formatted")
+    logger = setup_logger('quiet')
+    logger.setLevel(logging.WARNING)
+    try:
+        logger.info("value %s", Explosive())
+    finally:
+        logger.setLevel(logging.NOTSET)
+
+def test_spans_off_by_default(log_dir):
+    """Test that the default file level leaves DEBUG spans disabled."""
+    configure_logging()
+    with span('fetch'):
+        pass
+    setup_logger('spans').info('written')
+    contents = read_logs(log_dir)
+    assert 'written' in contents and 'span fetch' not in contents
+
+def test_colored_formatter_leaves_record_plain():
+    """Test that console colouring doesn't leak into other handlers."""
+    record = logging.makeLogRecord({'msg': 'Found %s', 'args': ('item',), 'levelname': 'INFO'})
+    colored = ColoredFormatter('%(levelname)s %(message)s').format(record)
+    assert '\x1b[' in colored, "Console output should be coloured"
+    assert record.levelname == 'INFO' and record.msg == 'Found %s', "Record should be restored"
+
+def test_spans_written_as_json_lines(log_dir):
+    """Test that spans land in the JSONL sink and can be summarized."""
+    jsonl = log_dir.parent / 'spans.jsonl'
+    configure_logging(jsonl_path=str(jsonl))
+    for count in (1, 2, 3):
+        with span('parse', url='https://example.com') as s:
+            s['count'] = count
+    with pytest.raises(ValueError):
+        with span('fetch'):
+            raise ValueError("timeout")
+    shutdown_logging()
+
+    entries = [json.loads(line) for line in open(jsonl)]
+    assert {e['stage'] for e in entries} == {'parse', 'fetch'}
+    assert entries[-1]['status'] == 'error', "Failed spans should be marked"
+
+    summary = summarize_spans(jsonl)
+    assert summary['parse']['spans'] == 3
+    assert summary['parse']['count'] == 6, "Counts should be summed"
+    assert summary['parse']['p50_ms'] <= summary['parse']['p95_ms']
+
+def test_span_is_noop_when_logging_disabled(log_dir):
+    """Test that spans emit nothing before logging is configured."""
+    with span('fetch') as s:
+        s['bytes'] = 10
+    assert not log_dir.exists()
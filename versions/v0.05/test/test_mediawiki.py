@@ -0,0 +1,74 @@
+import pytest
+from core import mediawiki
+from core.scraper import scrape_items
+from test.mock_wiki import MockWikiServer
+
+@pytest.fixture
+def wiki():
+    mediawiki._detected.clear()
+    with MockWikiServer(num_items=120, items_per_page=500) as server:
+        yield server
+    mediawiki._detected.clear()
+
+def test_detect_api(wiki):
+    """Test api.php discovery and the HTML-only fallback."""
+    assert mediawiki.detect_api(wiki.url) == wiki.url + "api.php"
+    with MockWikiServer(api=False) as plain:
+        assert mediawiki.detect_api(plain.url) is None
+
+def test_title_from_url():
+    """Test that item URLs map to MediaWiki page titles."""
+    assert mediawiki.title_from_url("https://w.example/wiki/Copper_Ore") == "Copper Ore"
+    assert mediawiki.title_from_url("https://w.example/wiki/Caf%C3%A9") == "Café"
+
+def test_api_backend_matches_html_backend(wiki):
+    """Test that batching through api.php returns the same items with far fewer requests."""
+    html_items = scrape_items(wiki.url, backend="html")
+    html_requests = wiki.request_count
+
+    api_items = scrape_items(wiki.url, backend="api")
+    api_requests = wiki.request_count - html_requests
+
+    assert api_items == html_items
+    assert len(api_items) == 120
+    # 1 listing + 1 detection probe + 3 batches of 50 titles, each needing 3 extract continuations
+    assert api_requests <= 2 + 3 * 3, f"Expected batched queries, made {api_requests} requests"
+    assert html_requests > 100
+
+def test_missing_titles_are_skipped(wiki):
+    """Test that titles the API doesn't know are reported and left out."""
+    client = mediawiki.MediaWikiClient(wiki.url + "api.php")
+    links = [("Item 1", wiki.url + "wiki/Item_1"), ("Ghost", wiki.url + "wiki/Ghost_Page")]
+    messages = []
+    items = client.scrape(links, messages.append)
+    assert items == [("Item 1", "Item 1 is a generated test item.", wiki.item_category(1))]
+    assert "Failed to fetch details for Ghost" in messages
+
+def test_changed_since_uses_recentchanges(wiki):
+    """Test that only recently edited pages are scraped."""
+    wiki.edit(3, "2024-01-01T00:00:00Z")
+    wiki.edit(7, "2024-03-01T00:00:00Z")
+    wiki.edit(9, "2024-03-02T00:00:00Z")
+    wiki.edit(7, "2024-03-03T00:00:00Z")
+
+    items = scrape_items(wiki.url, backend="api", changed_since="2024-02-01T00:00:00Z")
+    assert sorted(name for name, _, _ in items) == ["Item 7", "Item 9"]
+    assert wiki.paths["/"] == 0, "The listing should not be crawled"
+
+def test_crawl_since_last_run(wiki, tmp_path):
+    """Test that crawl(changed_since='last') picks up from the previous run."""
+    from core.database.manager import DatabaseManager
+    from core.scraper import crawl
+
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    db.add_domain(wiki.url)
+
+    first = crawl(db, backend="api", changed_since="last")
+    assert first.items_saved == 120, "With no previous run the whole listing is crawled"
+    assert db.get_last_crawled(wiki.url)
+
+    wiki.edit(5)
+    second = crawl(db, backend="api", changed_since="last")
+    assert second.items_saved == 1
+    assert not second.failed_domains
@@ -0,0 +1,54 @@
+import json
+import pytest
+from core.metrics import MetricsRegistry
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+def test_counter_labels(registry):
+    """Test counting per label set and in total."""
+    pages = registry.counter('pages_total', 'Pages fetched')
+    pages.inc(result='ok')
+    pages.inc(2, result='ok')
+    pages.inc(result='error')
+    assert pages.value(result='ok') == 3
+    assert pages.total() == 4
+    assert registry.counter('pages_total') is pages, "Lookups should return the same metric"
+
+def test_metric_type_conflict(registry):
+    """Test that a name can't be reused for a different metric type."""
+    registry.counter('items')
+    with pytest.raises(ValueError):
+        registry.gauge('items')
+
+def test_histogram_prometheus_exposition(registry):
+    """Test cumulative bucket output in the Prometheus text format."""
+    latency = registry.histogram('fetch_seconds', 'Fetch latency', buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = registry.to_prometheus()
+    assert '# TYPE fetch_seconds histogram' in text
+    assert 'fetch_seconds_bucket{le="0.1"} 1' in text
+    assert 'fetch_seconds_bucket{le="1.0"} 2' in text
+    assert 'fetch_seconds_bucket{le="+Inf"} 3' in text
+    assert 'fetch_seconds_count 3' in text
+
+def test_export_writes_both_formats(registry, tmp_path):
+    """Test writing Prometheus and JSON snapshots to disk."""
+    registry.gauge('queue_depth').set(7)
+    registry.export(tmp_path)
+
+    assert 'queue_depth 7' in (tmp_path / 'metrics.prom').read_text()
+    snapshot = json.loads((tmp_path / 'metrics.json').read_text())
+    assert snapshot['metrics']['queue_depth'] == {'': 7}
+    assert 'uptime_seconds' in snapshot
+
+def test_reset_keeps_metric_objects(registry):
+    """Test that reset zeroes values without detaching module-level metrics."""
+    rows = registry.counter('rows')
+    rows.inc(5)
+    registry.reset()
+    rows.inc()
+    assert registry.get('rows').total() == 1
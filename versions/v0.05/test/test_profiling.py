@@ -0,0 +1,84 @@
+import glob
+import logging
+import os
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from core import profiling
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    yield tmp_path
+    profiling.disable()
+
+@profiling.profiled('busy_run')
+def busy(seconds=0.05):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+    return 'done'
+
+def test_disabled_writes_nothing(profile_dir):
+    """Test that profiled functions run untouched when profiling is off."""
+    profiling.disable()
+    assert busy(0) == 'done'
+    assert not os.listdir(profile_dir)
+
+def test_cprofile_mode_writes_prof(profile_dir):
+    """Test that cProfile mode writes a loadable .prof file per run."""
+    profiling.enable('cprofile', str(profile_dir))
+    assert busy() == 'done'
+    paths = glob.glob(str(profile_dir / 'busy_run_*.prof'))
+    assert len(paths) == 1
+    import pstats
+    assert pstats.Stats(paths[0]).total_calls > 0
+
+def test_sample_mode_writes_folded_stacks(profile_dir):
+    """Test that the sampler writes flamegraph-ready collapsed stacks."""
+    profiling.enable('sample', str(profile_dir))
+    busy(0.2)
+    path, = glob.glob(str(profile_dir / 'busy_run_*.folded'))
+    lines = open(path).read().splitlines()
+    assert lines, "Sampler should record stacks"
+    assert any('busy (' in line for line in lines), "Profiled function should appear in stacks"
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        profiling.enable('perf')
+
+def test_env_mode_validated(monkeypatch):
+    """Test that an unknown QUESTVAULT_PROFILE value is ignored with a warning."""
+    warnings = []
+    handler = logging.Handler(logging.WARNING)
+    handler.emit = warnings.append
+    logger = logging.getLogger('questvault.profiling')
+    logger.addHandler(handler)
+    try:
+        monkeypatch.setenv('QUESTVAULT_PROFILE', '1')
+        assert profiling._mode_from_env() is None
+    finally:
+        logger.removeHandler(handler)
+    assert warnings and 'QUESTVAULT_PROFILE' in warnings[0].getMessage()
+    monkeypatch.setenv('QUESTVAULT_PROFILE', 'sample')
+    assert profiling._mode_from_env() == 'sample'
+
+def test_runs_in_same_second_get_own_files(profile_dir):
+    """Test that back-to-back runs don't overwrite each other's output."""
+    profiling.enable('cprofile', str(profile_dir))
+    for _ in range(3):
+        busy(0)
+    assert len(glob.glob(str(profile_dir / 'busy_run_*.prof'))) == 3
+
+@profiling.profiled('pool_run', threaded=True)
+def busy_in_threads():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        return list(pool.map(busy, [0.2, 0.2]))
+
+def test_threaded_runs_are_sampled(profile_dir):
+    """Test that cprofile mode samples runs whose work happens in worker threads."""
+    profiling.enable('cprofile', str(profile_dir))
+    busy_in_threads()
+    assert not glob.glob(str(profile_dir / 'pool_run_*.prof'))
+    path, = glob.glob(str(profile_dir / 'pool_run_*.folded'))
+    assert 'busy (' in open(path).read(), "Worker thread stacks should be recorded"
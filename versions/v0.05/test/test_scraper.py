@@ -23,8 +23,10 @@ MOCK_ITEM_PAGE = """
 @patch("core.scraper.requests.get")
 def test_fetch_page_content(mock_get):
     """Test fetching page content."""
-    mock_get.return_value.status_code = 200
-    mock_get.return_value.text = MOCK_PAGE_CONTENT
+    response = mock_get.return_value.__enter__.return_value
+    response.status_code = 200
+    response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    response.iter_content.return_value = [MOCK_PAGE_CONTENT.encode()]
 
     content = fetch_page_content("https://example.com")
     assert content == MOCK_PAGE_CONTENT, "Should return mock page content"
@@ -53,3 +55,131 @@ def test_fetch_page_content_failure(mock_get):
     """Test handling of failed page fetch."""
     content = fetch_page_content("https://example.com")
     assert content is None, "Should return None on failure"
+
+@pytest.fixture
+def wiki():
+    from test.mock_wiki import MockWikiServer
+    with MockWikiServer(num_items=30, items_per_page=10, rate_limit_every=5) as server:
+        yield server
+
+def test_scrape_against_mock_wiki(wiki):
+    """Test scraping real HTTP responses from the local stand-in wiki."""
+    items = parse_item_list(wiki.url)
+    assert [name for name, _ in items] == [f"Item {i}" for i in range(30)], \
+        "Every listing page should be followed"
+    assert wiki.paths["/index.php"] == 2
+
+    details = scrape_item_details(*items[1])
+    assert details["description"] == "Item 1 is a generated test item."
+    assert details["category"] == wiki.item_category(1)
+
+def test_parse_item_list_max_pages(wiki):
+    """Test that pagination stops at the page limit."""
+    items = parse_item_list(wiki.url, max_pages=2)
+    assert len(items) == 20
+
+def test_parse_item_list_category_depth():
+    """Test breadth-first descent into nested categories."""
+    from test.mock_wiki import MockWikiServer
+    tree = {"Resources": {"Ores": [], "Plants": ["Flowers", "Trees"]}, "Tools": []}
+    with MockWikiServer(num_items=40, categories=tree, items_per_page=3) as wiki:
+        start = wiki.url + "wiki/Category:Resources"
+        assert parse_item_list(start) == [], "Resources only has subcategories"
+
+        depth_one = {name for name, _ in parse_item_list(start, max_depth=1)}
+        assert depth_one == {wiki.item_name(i) for i in wiki.category_items("Ores")}
+
+        depth_two = parse_item_list(start, max_depth=2, concurrency=2)
+        expected = [i for leaf in ("Ores", "Flowers", "Trees") for i in wiki.category_items(leaf)]
+        assert sorted(url for _, url in depth_two) == \
+            sorted(wiki.url + wiki.item_path(i)[1:] for i in expected)
+
+        everything = parse_item_list(wiki.url, max_depth=3, visited=set())
+        assert len(everything) == 40, "Items reachable several ways should be listed once"
+
+def test_mock_wiki_rate_limits(wiki):
+    """Test that every Nth request is answered with HTTP 429."""
+    results = [fetch_page_content(wiki.url + "wiki/Item_0") for _ in range(10)]
+    assert results.count(None) == 2, "Rate limited requests should fail"
+    assert wiki.status_counts[429] == 2
+
+CRAWL_SCRIPT = """
+import sys
+from core.scraper import main
+status = main(sys.argv[1:])
+sys.exit(3 if 'kivy' in sys.modules else status)
+"""
+
+def test_headless_crawl_cli(tmp_path):
+    """Test the crawler CLI writes items to the database without importing Kivy."""
+    import os
+    import subprocess
+    import sys
+    from core.database.manager import DatabaseManager
+    from test.mock_wiki import MockWikiServer
+
+    db_path = str(tmp_path / "crawl.db")
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with MockWikiServer(num_items=12) as server:
+        db = DatabaseManager(db_path)
+        db.initialize_database()
+        db.add_domain(server.url)
+        result = subprocess.run(
+            [sys.executable, "-c", CRAWL_SCRIPT, "--db", db_path, "--concurrency", "3"],
+            cwd=project_root, capture_output=True, text=True, timeout=60,
+        )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "12 items saved" in result.stdout
+    assert len(db.search_items()) == 12, "Every item should be written to the database"
+
+def test_headless_crawl_cli_without_domains(tmp_path):
+    """Test the crawler CLI exits with status 2 when there is nothing to crawl."""
+    from core.scraper import main
+    from core.logger import shutdown_logging
+    try:
+        assert main(["--db", str(tmp_path / "empty.db")]) == 2
+    finally:
+        shutdown_logging()
+
+def test_frontier_cli_rejects_api_backend(tmp_path):
+    """Test that --frontier refuses the API backends instead of silently ignoring them."""
+    from core.scraper import main
+    for backend in ("api", "auto"):
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--db", str(tmp_path / "items.db"), "--frontier", str(tmp_path / "f.db"), "--backend", backend])
+        assert exit_info.value.code == 2
+
+def test_detect_encoding():
+    """Test encoding comes from the header, then BOM, then meta tag, else UTF-8."""
+    from core.scraper import detect_encoding
+    assert detect_encoding("text/html; charset=ISO-8859-1", b"<html>") == "iso8859-1"
+    assert detect_encoding("text/html", b'<head><meta charset="windows-1252">') == "cp1252"
+    assert detect_encoding(None, b'<meta http-equiv="Content-Type" content="text/html; charset=koi8-r">') == "koi8-r"
+    assert detect_encoding("text/html; charset=bogus", b"\xef\xbb\xbf<html>") == "utf-8"
+    assert detect_encoding(None, b"<html>") == "utf-8"
+
+def test_fetch_page_content_raw_bytes():
+    """Test raw fetches hand undecoded bytes and their encoding to the parser."""
+    from test.mock_wiki import MockWikiServer
+    with MockWikiServer(num_items=3, content_type=None) as server:
+        page = fetch_page_content(server.url + "wiki/Item_2", raw=True)
+        details = scrape_item_details("Item 2", server.url + "wiki/Item_2")
+    assert isinstance(page.body, bytes)
+    assert page.encoding == "utf-8", "Encoding should come from the meta tag"
+    assert details["description"] == "Item 2 is a generated test item."
+
+def test_fetch_page_content_size_cap():
+    """Test downloads over the limit are abandoned, by header or while streaming."""
+    from test.mock_wiki import MockWikiServer
+    with MockWikiServer(num_items=1, payload_bytes=200_000) as server:
+        assert fetch_page_content(server.url + "wiki/Item_0", max_bytes=100_000) is None
+        assert fetch_page_content(server.url + "wiki/Item_0", max_bytes=300_000)
+
+    with patch("core.scraper.requests.get") as mock_get:
+        response = mock_get.return_value.__enter__.return_value
+        response.headers = {}
+        response.iter_content.return_value = iter([b"x" * 1000] * 10)
+        assert fetch_page_content("https://example.com", max_bytes=4500) is None
+        assert next(response.iter_content.return_value) == b"x" * 1000, \
+            "Streaming should stop at the first chunk over the limit"
@@ -0,0 +1,80 @@
+import time
+import pytest
+from core.scraper import parse_item_list, scrape_items
+from core.sitemap import RobotsRules, Throttle, discover_items, parse_lastmod
+from test.mock_wiki import MockWikiServer
+
+@pytest.fixture
+def wiki():
+    with MockWikiServer(num_items=250, sitemap_shard_size=100, disallow=("/wiki/Item_249",)) as server:
+        yield server
+
+def test_robots_rules(wiki):
+    """Test robots.txt parsing and the missing-file default."""
+    robots = RobotsRules.fetch(wiki.url)
+    assert robots.sitemaps == [wiki.url + "sitemap.xml"]
+    assert not robots.can_fetch(wiki.url + "wiki/Item_249")
+    assert robots.crawl_delay is None
+
+    allow_all = RobotsRules("https://example.com/")
+    assert allow_all.can_fetch("https://example.com/anything")
+    assert allow_all.sitemaps == ["https://example.com/sitemap.xml"]
+
+def test_discover_items_from_sitemap_index(wiki):
+    """Test that gzipped shards are expanded and non-item pages dropped."""
+    items = discover_items(wiki.url)
+    expected = {wiki.url + wiki.item_path(i)[1:] for i in range(249)}
+    assert {url for _, url in items} == expected, "Categories and disallowed URLs should be skipped"
+    assert ("Item 5", wiki.url + "wiki/Item_5") in items
+    assert wiki.paths["/sitemap.xml"] == 1
+    assert sum(count for path, count in wiki.paths.items() if path.startswith("/sitemaps/")) == 4
+    assert wiki.paths["/"] == 0, "No listing pages should be walked"
+
+def test_lastmod_skips_unchanged_pages_and_shards(wiki):
+    """Test that pages and whole shards older than `since` are skipped."""
+    wiki.edit(42, "2024-05-01T12:00:00Z")
+    wiki.edit(43, "2024-04-01T00:00:00Z")
+
+    items = discover_items(wiki.url, since="2024-04-15")
+    assert items == [("Item 42", wiki.url + "wiki/Item_42")]
+    assert wiki.paths["/sitemaps/items-1.xml.gz"] == 0, "Unchanged shards should not be fetched"
+
+def test_parse_lastmod():
+    """Test W3C datetime forms found in sitemaps."""
+    assert parse_lastmod("2024-01-31") < parse_lastmod("2024-01-31T00:00:01Z")
+    assert parse_lastmod("2024-01-31T02:00:00+02:00") == parse_lastmod("2024-01-31T00:00:00Z")
+    assert parse_lastmod("yesterday") is None
+
+def test_crawl_delay_spaces_requests():
+    """Test that robots.txt crawl-delay throttles sitemap and item fetches."""
+    with MockWikiServer(num_items=4, sitemap_shard_size=2, crawl_delay=0.05) as wiki:
+        started = time.perf_counter()
+        items = scrape_items(wiki.url, discovery="sitemap", concurrency=8)
+        elapsed = time.perf_counter() - started
+    assert len(items) == 4
+    # robots.txt is unthrottled; 4 sitemap files + 4 item pages go 0.05s apart
+    assert elapsed >= 7 * 0.05
+
+def test_throttle_is_shared_across_threads():
+    """Test the throttle spaces calls from several threads."""
+    from concurrent.futures import ThreadPoolExecutor
+    throttle = Throttle(0.02)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda _: throttle.wait(), range(6)))
+    assert time.perf_counter() - started >= 5 * 0.02
+
+def test_sitemap_discovery_falls_back_to_links():
+    """Test that a site without a sitemap is still crawled."""
+    with MockWikiServer(num_items=10, sitemap_shard_size=0) as wiki:
+        items = scrape_items(wiki.url, discovery="sitemap")
+    assert len(items) == 10
+
+def test_crawl_delay_for_our_user_agent():
+    """Test that a group naming our crawler wins over the wildcard group."""
+    robots = RobotsRules("https://example.com/", (
+        "User-agent: *\nCrawl-delay: 10\n\n"
+        "User-agent: Googlebot\nUser-agent: QuestVault\nCrawl-delay: 0.5\nDisallow: /private\n"
+    ))
+    assert robots.crawl_delay == 0.5
+    assert not robots.can_fetch("https://example.com/private/page")
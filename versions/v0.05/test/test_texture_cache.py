@@ -0,0 +1,57 @@
+import pytest
+from core.texture_cache import TextureCache
+
+class FakeTexture:
+    def __init__(self, size):
+        self.size = size
+
+@pytest.fixture
+def loads():
+    return []
+
+@pytest.fixture
+def cache(loads):
+    def loader(path, size):
+        loads.append((path, size))
+        return FakeTexture(size or (10, 10))
+    # 10x10 RGBA textures are 400 bytes each
+    return TextureCache(max_bytes=1000, loader=loader)
+
+def test_texture_reused_for_same_key(cache, loads):
+    """Test that repeated lookups don't reload the image."""
+    first = cache.get("bg.png")
+    second = cache.get("bg.png")
+    assert first is second, "Same texture should be returned"
+    assert len(loads) == 1, "Image should only be decoded once"
+    assert cache.hits == 1 and cache.misses == 1
+
+def test_size_is_part_of_key(cache, loads):
+    """Test that different target sizes are cached separately."""
+    cache.get("bg.png", (10, 10))
+    cache.get("bg.png", (5, 5))
+    assert len(loads) == 2, "Each size should be loaded once"
+    assert ("bg.png", (5, 5)) in cache
+
+def test_lru_eviction_respects_budget(cache):
+    """Test that least recently used textures are evicted first."""
+    cache.get("a.png")
+    cache.get("b.png")
+    cache.get("a.png")  # a is now most recently used
+    cache.get("c.png")
+    assert cache.current_bytes <= cache.max_bytes, "Cache should stay within budget"
+    assert ("a.png", None) in cache, "Recently used texture should survive"
+    assert ("b.png", None) not in cache, "Least recently used texture should be evicted"
+
+def test_oversized_texture_not_cached(cache):
+    """Test that textures larger than the budget are returned but not kept."""
+    texture = cache.get("huge.png", (100, 100))
+    assert texture.size == (100, 100)
+    assert len(cache) == 0, "Oversized texture should not be cached"
+
+def test_invalidate_path(cache):
+    """Test invalidating all sizes of one image."""
+    cache.get("bg.png")
+    cache.get("bg.png", (5, 5))
+    cache.invalidate("bg.png")
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
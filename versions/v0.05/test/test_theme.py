@@ -0,0 +1,46 @@
+import os
+import pytest
+from unittest.mock import patch
+from core.ui.theme import Theme
+from core.ui.components import UIFactory
+
+@pytest.fixture
+def theme():
+    return Theme()
+
+def test_snapshot_resolves_theme(theme):
+    """Test that the snapshot holds resolved values from theme.json."""
+    snapshot = theme.snapshot
+    assert snapshot is not None, "Snapshot should be compiled on load"
+    assert snapshot.colors['primary'] == tuple(theme.get_color('primary'))
+    assert snapshot.font_name == theme.get_font()[0], "Font path should be resolved"
+    assert snapshot.font_sizes['button'] == theme.get_font('button')[1]
+    assert snapshot.dimensions['button_height'] == theme.get_dimension('button_height')
+
+def test_snapshot_is_immutable(theme):
+    """Test that the snapshot can't be modified after compiling."""
+    with pytest.raises(TypeError):
+        theme.snapshot.colors['primary'] = (0, 0, 0, 1)
+    with pytest.raises(AttributeError):
+        theme.snapshot.font_name = 'Roboto'
+
+def test_widget_creation_skips_font_lookup(theme):
+    """Test that creating widgets doesn't stat font files."""
+    factory = UIFactory(theme)
+    with patch('core.ui.theme.os.path.exists') as mock_exists:
+        for i in range(10):
+            factory.create_button(text=f"Item {i}")
+        factory.create_label(text="Status")
+    mock_exists.assert_not_called()
+
+def test_missing_theme_raises_until_repaired(theme, tmp_path):
+    """Test that an unloaded theme fails loudly and repair recompiles."""
+    theme.theme_path = tmp_path / 'theme.json'
+    theme.current_theme = theme.load_theme()
+    theme.snapshot = None
+    factory = UIFactory(theme)
+    with pytest.raises(ValueError):
+        factory.create_label(text="Status")
+
+    theme.repair_and_save()
+    assert factory.create_label(text="Status").font_name == theme.snapshot.font_name
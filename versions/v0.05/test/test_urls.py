@@ -0,0 +1,12 @@
+from core.urls import canonical_url
+
+def test_canonical_url():
+    """Test that every spelling of a page URL canonicalises to one item identity."""
+    expected = "https://w.example/wiki/Copper_Ore"
+    for url in ("https://W.Example:443/wiki/Copper_Ore#Uses",
+                "https://w.example/wiki/copper%20Ore",
+                "https://w.example/w/index.php?title=Copper_Ore",
+                "https://w.example/index.php?title=Copper Ore"):
+        assert canonical_url(url) == expected, url
+    assert canonical_url("http://w.example:8080/wiki/Caf%C3%A9") == "http://w.example:8080/wiki/Caf%C3%A9"
+    assert canonical_url(None) is None
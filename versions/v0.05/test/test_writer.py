@@ -0,0 +1,107 @@
+import queue
+import sqlite3
+import threading
+import time
+import pytest
+from core.database.manager import DatabaseManager
+from core.database.writer import GroupCommitWriter, WriterClosed
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "items.db"))
+    db.initialize_database()
+    return db
+
+def count_items(db):
+    with sqlite3.connect(db.db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+def test_many_producers_share_group_commits(db):
+    """Test that rows from many threads are all committed, in far fewer transactions."""
+    futures = []
+    lock = threading.Lock()
+
+    def produce(worker):
+        for i in range(250):
+            future = writer.submit(f"Item {worker}-{i}", "Description", "Tools", attributes={"n": i})
+            with lock:
+                futures.append(future)
+
+    with GroupCommitWriter(db.db_path, batch_size=200) as writer:
+        threads = [threading.Thread(target=produce, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert all(future.result() is True for future in futures), "Every row should be acknowledged"
+    assert count_items(db) == 2000
+    assert writer.rows_written == 2000
+    assert writer.commits < 100, "Rows should be committed in groups"
+
+def test_flush_and_delay(db):
+    """Test that flush waits for the commit and lone rows commit after max_delay."""
+    with GroupCommitWriter(db.db_path, batch_size=1000, max_delay=10) as writer:
+        for i in range(5):
+            writer.submit(f"Item {i}", None, None)
+        writer.flush(timeout=5)
+        assert count_items(db) == 5, "Flushed rows should be visible to other connections"
+
+    with GroupCommitWriter(db.db_path, max_delay=0.01) as writer:
+        start = time.monotonic()
+        assert writer.submit("Late item", None, None).result(timeout=5)
+        assert time.monotonic() - start < 1, "A partial group should commit once max_delay passes"
+
+def test_failed_group_reports_error(tmp_path):
+    """Test that a commit error reaches every row's future instead of being lost."""
+    with GroupCommitWriter(str(tmp_path / "empty.db")) as writer:
+        future = writer.submit("Item", None, None)
+        with pytest.raises(sqlite3.OperationalError):
+            future.result(timeout=5)
+
+def test_bad_row_fails_alone(db):
+    """Test that one bad row fails by itself instead of taking its whole group down."""
+    with GroupCommitWriter(db.db_path, batch_size=1000, max_delay=10) as writer:
+        futures = [writer.submit(f"Item {i}", None, None) for i in range(5)]
+        bad = writer.submit(None, None, None)
+        futures += [writer.submit(f"Item {i}", None, None) for i in range(5, 10)]
+        writer.flush(timeout=5)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result()
+    assert all(future.result() is True for future in futures), "Good rows should still be committed"
+    assert count_items(db) == 10
+
+def test_full_queue_honours_timeouts(db):
+    """Test that a producer blocked on a full queue doesn't hold up another's timeout."""
+    writer = GroupCommitWriter(db.db_path, batch_size=1, queue_size=1)
+    writer.flush(timeout=5)
+    blocker = sqlite3.connect(db.db_path, isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+    try:
+        writer.submit("Committing", None, None)
+        time.sleep(0.2)  # Writer takes it and waits for the database lock
+        writer.submit("Queued", None, None)
+        blocked = threading.Thread(target=writer.submit, args=("Blocked", None, None))
+        blocked.start()
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        with pytest.raises(queue.Full):
+            writer.submit("Impatient", None, None, timeout=0.2)
+        assert time.monotonic() - start < 2, "The timeout should be honoured"
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+    blocked.join(timeout=5)
+    writer.close(timeout=5)
+    assert count_items(db) == 3, "Rows queued before close should all be committed"
+
+def test_submit_after_close(db):
+    """Test that a closed writer refuses new rows."""
+    writer = GroupCommitWriter(db.db_path)
+    writer.close()
+    writer.close()
+    writer.flush()
+    with pytest.raises(WriterClosed):
+        writer.submit("Item", None, None)